@@ -11,4 +11,4 @@ __author__ = "Bank Client Team"
 __all__ = ["BankClient", "cli"]
 
 DEFAULT_SERVER_URL = "http://localhost:8000"
-COMMANDS = ["create", "info", "list", "deposit", "withdraw", "transfer", "demo"]
\ No newline at end of file
+COMMANDS = ["create", "info", "list", "deposit", "withdraw", "transfer", "import-accounts", "export", "demo"]
\ No newline at end of file
@@ -4,11 +4,14 @@ import json
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
+import os
 import time
 import sys
 
 console = Console()
 BASE_URL = "http://server:8000"  # В Docker Compose
+UPLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 # Для локального тестирования: "http://localhost:8000"
@@ -254,6 +257,89 @@ class BankClient:
             console.print(f"[red]Транзакция не найдена[/red]")
             return None
 
+    def import_accounts(self, path, fmt=None, output=None):
+        """Массовый импорт счетов из CSV/NDJSON файла"""
+        url = f"{self.base_url}/accounts/import"
+        fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+        content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+        total_bytes = os.path.getsize(path)
+
+        with Progress(console=console) as progress:
+            task = progress.add_task("Загрузка файла...", total=total_bytes)
+
+            def read_chunks():
+                with open(path, "rb") as f:
+                    while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                        progress.update(task, advance=len(chunk))
+                        yield chunk
+
+            response = self.session.post(
+                url, data=read_chunks(), headers={"Content-Type": content_type}, stream=True
+            )
+
+        if response.status_code != 200:
+            console.print(f"[red]Ошибка импорта: {response.status_code}[/red]")
+            return None
+
+        summary = None
+        errors = []
+        stream_error = None
+        out = open(output, "w", encoding="utf-8") if output else None
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                if "summary" in record:
+                    summary = record["summary"]
+                elif "error" in record and "line" not in record:
+                    # The server failed while sending results; the status was already 200
+                    stream_error = record["error"]
+                elif "error" in record:
+                    errors.append(record)
+                elif out:
+                    out.write(f"{record['line']},{record['account_number']}\n")
+        finally:
+            if out:
+                out.close()
+
+        for record in errors[:10]:
+            console.print(f"[red]Строка {record['line']}: {record['error']}[/red]")
+        if len(errors) > 10:
+            console.print(f"[red]... и ещё {len(errors) - 10} ошибок[/red]")
+
+        if summary is None:
+            console.print(f"[red]Ответ сервера оборван: {stream_error or 'нет итоговой строки'}[/red]")
+            return None
+
+        if summary:
+            console.print(f"[green]✓ Импортировано счетов: {summary['imported']}[/green]")
+            console.print(f"Ошибок: {summary['failed']}")
+            console.print(f"Скорость: {summary['rows_per_sec']:.0f} строк/с")
+        return summary
+
+    def export_transactions(self, start, end, output, fmt="csv"):
+        """Выгрузить транзакции за период в CSV/Arrow файл"""
+        url = f"{self.base_url}/transactions/export"
+        params = {"start": start, "end": end, "format": fmt}
+
+        with self.session.get(url, params=params, stream=True) as response:
+            if response.status_code != 200:
+                console.print(f"[red]Ошибка выгрузки: {response.status_code}[/red]")
+                return None
+
+            written = 0
+            with Progress(SpinnerColumn(), TextColumn("{task.description}"), console=console) as progress:
+                task = progress.add_task("Выгрузка транзакций...")
+                with open(output, "wb") as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        written += len(chunk)
+                        progress.update(task, description=f"Выгружено {written / 1024 / 1024:.1f} МБ")
+
+        console.print(f"[green]✓ Транзакции сохранены в {output} ({written} байт)[/green]")
+        return written
+
     def get_metrics(self):
         """Получить метрики Prometheus"""
         url = f"{self.base_url}/metrics"
@@ -350,6 +436,28 @@ def transaction(ctx, transaction_id):
     ctx.obj['client'].get_transaction(transaction_id)
 
 
+@cli.command(name="import-accounts")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Формат файла (по умолчанию по расширению)')
+@click.option('--output', default=None, help='Файл для номеров созданных счетов')
+@click.pass_context
+def import_accounts(ctx, path, fmt, output):
+    """Массовый импорт счетов из файла"""
+    ctx.obj['client'].import_accounts(path, fmt, output)
+
+
+@cli.command()
+@click.option('--start', required=True, help='Начало периода (ISO 8601, включительно)')
+@click.option('--end', required=True, help='Конец периода (ISO 8601, не включительно)')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'arrow']), default='csv', help='Формат выгрузки')
+@click.option('--output', required=True, help='Файл для сохранения')
+@click.pass_context
+def export(ctx, start, end, fmt, output):
+    """Выгрузить транзакции за период"""
+    ctx.obj['client'].export_transactions(start, end, output, fmt)
+
+
 @cli.command()
 @click.pass_context
 def metrics(ctx):
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 from app import BankClient
 
 
@@ -62,4 +62,68 @@ def test_health_check_success():
         client = BankClient("http://test-server")
         result = client.health_check()
 
-        assert result is True
\ No newline at end of file
+        assert result is True
+
+
+def test_import_accounts_success(tmp_path):
+    source = tmp_path / "accounts.csv"
+    source.write_text("owner_name,initial_balance\nAlice,10\nB,1\n")
+    output = tmp_path / "numbers.csv"
+
+    with patch('requests.Session.post') as mock_post:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_lines.return_value = [
+            b'{"line": 2, "account_number": "0000000018"}',
+            b'{"line": 3, "error": "owner_name: too short"}',
+            b'{"summary": {"imported": 1, "failed": 1, "seconds": 0.1, "rows_per_sec": 10.0}}',
+        ]
+
+        def consume_body(url, data, headers, stream):
+            assert headers["Content-Type"] == "text/csv"
+            assert b"".join(data) == source.read_bytes()
+            return mock_response
+
+        mock_post.side_effect = consume_body
+
+        client = BankClient("http://test-server")
+        summary = client.import_accounts(str(source), output=str(output))
+
+    assert summary["imported"] == 1
+    assert output.read_text() == "2,0000000018\n"
+
+
+def test_import_accounts_reports_truncated_results(tmp_path):
+    source = tmp_path / "accounts.ndjson"
+    source.write_text('{"owner_name": "Alice"}\n')
+
+    with patch('requests.Session.post') as mock_post:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_lines.return_value = [
+            b'{"line": 1, "account_number": "0000000018"}',
+            b'{"error": "import results truncated: disk gone"}',
+        ]
+        mock_post.return_value = mock_response
+
+        client = BankClient("http://test-server")
+        assert client.import_accounts(str(source)) is None
+
+
+def test_export_transactions_streams_to_file(tmp_path):
+    output = tmp_path / "tx.csv"
+
+    with patch('requests.Session.get') as mock_get:
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = [b"id,amount\n", b"1,10.0\n"]
+        mock_response.__enter__.return_value = mock_response
+        mock_get.return_value = mock_response
+
+        client = BankClient("http://test-server")
+        written = client.export_transactions("2024-01-01", "2024-02-01", str(output))
+
+    assert written == 17
+    assert output.read_bytes() == b"id,amount\n1,10.0\n"
+    assert mock_get.call_args.kwargs["params"]["format"] == "csv"
+    assert mock_get.call_args.kwargs["stream"] is True
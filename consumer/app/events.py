@@ -0,0 +1,59 @@
+"""Decoding of transaction events: a compact versioned binary layout, or JSON.
+
+Binary events start with a format version byte and JSON events with ``{``,
+so the consumer reads both and the server can switch EVENT_FORMAT without
+draining the topic first. The encoder lives in the server's app/events.py.
+"""
+import struct
+from datetime import datetime, timedelta
+
+from .serialization import loads
+
+FORMAT_VERSION = 1
+TRANSACTION_TYPES = ("DEPOSIT", "WITHDRAW", "TRANSFER")
+
+# version, transaction type code, flags, transaction_id, amount,
+# created_at in microseconds since the epoch (UTC); then to_account and
+# from_account (when flagged), each a length byte and UTF-8 bytes
+_V1 = struct.Struct("<BBBqdq")
+_HAS_FROM_ACCOUNT = 1
+_HAS_CREATED_AT = 2
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _unpack_str(raw: bytes, offset: int) -> tuple[str, int]:
+    end = offset + 1 + raw[offset]
+    if end > len(raw):
+        raise ValueError("Truncated string field")
+    return raw[offset + 1:end].decode(), end
+
+
+def _decode_v1(raw: bytes) -> dict:
+    _, type_code, flags, transaction_id, amount, created_at = _V1.unpack_from(raw)
+    to_account, offset = _unpack_str(raw, _V1.size)
+    from_account = _unpack_str(raw, offset)[0] if flags & _HAS_FROM_ACCOUNT else None
+    return {
+        "transaction_id": transaction_id,
+        "from_account": from_account,
+        "to_account": to_account,
+        "amount": amount,
+        "transaction_type": TRANSACTION_TYPES[type_code],
+        "created_at": (_EPOCH + created_at * _MICROSECOND).isoformat() if flags & _HAS_CREATED_AT else None,
+    }
+
+
+_DECODERS = {FORMAT_VERSION: _decode_v1}
+
+
+def decode_event(raw: bytes) -> dict:
+    """Parse an event in any format this version knows; raises ValueError otherwise"""
+    if raw[:1] == b"{":
+        return loads(raw)
+    decoder = _DECODERS.get(raw[0]) if raw else None
+    if decoder is None:
+        raise ValueError(f"Unsupported event format version: {raw[:1]!r}")
+    try:
+        return decoder(raw)
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Truncated or corrupt event: {e}") from e
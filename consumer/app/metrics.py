@@ -0,0 +1,77 @@
+"""Consumer metrics: pipeline latency from Kafka header timestamps and event-loop lag."""
+import asyncio
+import os
+import time
+
+from prometheus_client import Histogram, start_http_server
+
+# 0 disables the /metrics listener
+CONSUMER_METRICS_PORT = int(os.getenv("CONSUMER_METRICS_PORT", "8001"))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.1"))
+
+# Set by the server's send_transaction_event, epoch seconds
+ACCEPTED_AT_HEADER = "accepted_at"
+PUBLISHED_AT_HEADER = "published_at"
+TRACE_HEADERS = (ACCEPTED_AT_HEADER, PUBLISHED_AT_HEADER)
+
+# Same buckets as the server's half of bank_transaction_pipeline_seconds
+PIPELINE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float('inf'))
+
+pipeline_latency_histogram = Histogram(
+    'bank_transaction_pipeline_seconds',
+    'Transaction pipeline stage latency (queue: published to picked up, '
+    'process: picked up to committed, total: accepted to COMPLETED)',
+    ['stage'],
+    buckets=PIPELINE_BUCKETS
+)
+
+event_loop_lag_histogram = Histogram(
+    'bank_event_loop_lag_seconds',
+    'How late a scheduled event-loop wakeup ran (time the loop was blocked)',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, float('inf'))
+)
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL) -> None:
+    """Background task: record how late each of its own sleeps wakes up"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag_histogram.observe(max(0.0, loop.time() - started - interval))
+
+
+def trace_from_headers(headers, received_at: float | None = None) -> dict[str, float]:
+    """Stage timestamps from a message's headers, plus when it was picked up.
+
+    Missing or malformed headers (events from an older producer) are left
+    out; the stages that need them are then not observed.
+    """
+    trace = {"received_at": received_at if received_at is not None else time.time()}
+    for key, value in headers or ():
+        if key in TRACE_HEADERS:
+            try:
+                trace[key] = float(value)
+            except (TypeError, ValueError):
+                pass
+    return trace
+
+
+def observe_completed(trace: dict[str, float], completed_at: float | None = None) -> None:
+    """Record the consumer's stages for a transaction that reached COMPLETED.
+
+    Durations that cross hosts are clamped at zero, since the server's and
+    consumer's clocks are only as close as NTP keeps them.
+    """
+    completed_at = completed_at if completed_at is not None else time.time()
+    received_at = trace["received_at"]
+    if PUBLISHED_AT_HEADER in trace:
+        pipeline_latency_histogram.labels(stage="queue").observe(max(received_at - trace[PUBLISHED_AT_HEADER], 0.0))
+    pipeline_latency_histogram.labels(stage="process").observe(completed_at - received_at)
+    if ACCEPTED_AT_HEADER in trace:
+        pipeline_latency_histogram.labels(stage="total").observe(max(completed_at - trace[ACCEPTED_AT_HEADER], 0.0))
+
+
+def start_metrics_server(port: int = CONSUMER_METRICS_PORT) -> None:
+    if port:
+        start_http_server(port)
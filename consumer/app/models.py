@@ -1,10 +1,10 @@
 """SQLAlchemy models for consumer (same schema as server for DB updates)."""
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, func
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
-__all__ = ["Base", "Account", "Transaction"]
+__all__ = ["Base", "Account", "Transaction", "TransactionRollup", "BalanceSnapshot"]
 
 
 class Account(Base):
@@ -14,6 +14,7 @@ class Account(Base):
     account_number = Column(String, unique=True, index=True, nullable=False)
     owner_name = Column(String, nullable=False)
     balance = Column(Float, default=0.0)
+    opening_balance = Column(Float, default=0.0)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -30,3 +31,25 @@ class Transaction(Base):
     status = Column(String, default="PENDING")
     created_at = Column(DateTime, server_default=func.now())
     processed_at = Column(DateTime)
+    republished_at = Column(DateTime)
+
+
+class TransactionRollup(Base):
+    """Per time bucket, type and status totals, upserted by the consumer"""
+    __tablename__ = "transaction_rollups"
+
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    transaction_type = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+
+
+class BalanceSnapshot(Base):
+    """Balance after the last transaction processed on a day"""
+    __tablename__ = "balance_snapshots"
+
+    account_number = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    closing_balance = Column(Float, nullable=False)
@@ -0,0 +1,49 @@
+"""Pre-aggregated transaction rollups, upserted inside the processing transaction."""
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import TransactionRollup
+
+GRANULARITIES = {
+    "minute": lambda ts: ts.replace(second=0, microsecond=0),
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+}
+KEY_COLUMNS = ("granularity", "bucket_start", "transaction_type", "status")
+
+
+def rollup_upsert(dialect: str, rows: list[dict]):
+    """One INSERT ... ON CONFLICT adding ``rows`` to their buckets"""
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert(TransactionRollup).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={
+            "count": TransactionRollup.count + stmt.excluded.count,
+            "amount": TransactionRollup.amount + stmt.excluded.amount,
+        },
+    )
+
+
+async def record_rollup(
+        session: AsyncSession,
+        processed_at: datetime,
+        transaction_type: str,
+        status: str,
+        amount: float,
+) -> None:
+    """Add one transaction to its minute and hour buckets.
+
+    Runs in the transaction that sets the status, so a rollup is counted
+    exactly when the status change commits. Every transaction updates the
+    same few rows, so call it last, right before the commit: the row locks
+    it takes are then held only for the commit itself.
+    """
+    rows = [
+        dict(zip(KEY_COLUMNS, (granularity, truncate(processed_at), transaction_type, status)),
+             count=1, amount=amount)
+        for granularity, truncate in GRANULARITIES.items()
+    ]
+    await session.execute(rollup_upsert(session.bind.dialect.name, rows))
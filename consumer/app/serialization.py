@@ -0,0 +1,40 @@
+"""JSON for transaction events: orjson when installed, else the stdlib."""
+import json
+import os
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# "auto" picks orjson when it is installed; "stdlib" forces the json module
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode()
+
+
+BACKENDS = {"stdlib": (_stdlib_dumps, json.loads)}
+if orjson is not None:
+    BACKENDS["orjson"] = (lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+
+
+def _choose(name: str) -> str:
+    if name == "auto":
+        return "orjson" if "orjson" in BACKENDS else "stdlib"
+    if name not in BACKENDS:
+        raise RuntimeError(f"JSON_BACKEND={name} is not available (is the package installed?)")
+    return name
+
+
+backend = _choose(JSON_BACKEND)
+dumps, loads = BACKENDS[backend]
+
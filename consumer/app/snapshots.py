@@ -0,0 +1,24 @@
+"""Daily closing balance snapshots, upserted inside the processing transaction."""
+from datetime import date
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import BalanceSnapshot
+
+
+async def record_balance_snapshots(session: AsyncSession, day: date, balances: dict[str, float]) -> None:
+    """Store the new balances as the accounts' closing balances for the day"""
+    if not balances:
+        return
+    insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(BalanceSnapshot).values([
+        {"account_number": account_number, "day": day, "closing_balance": balance}
+        for account_number, balance in balances.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["account_number", "day"],
+        set_={"closing_balance": stmt.excluded.closing_balance},
+    )
+    await session.execute(stmt)
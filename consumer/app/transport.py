@@ -0,0 +1,177 @@
+"""Message transport between the server and the consumer: Kafka, or in-process queues."""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from kafka import KafkaConsumer, KafkaProducer
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# "kafka", or "memory" for tests and benchmarks (publisher and poller in one process)
+MESSAGE_TRANSPORT = os.getenv("MESSAGE_TRANSPORT", "kafka")
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+# Producer batching: "none", "gzip", "lz4" or "zstd"; lz4 and zstd need their packages
+KAFKA_COMPRESSION_TYPE = os.getenv("KAFKA_COMPRESSION_TYPE", "lz4")
+# How long a send may wait for more records to share its batch, and the batch size in bytes
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "5"))
+KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "16384"))
+PUBLISH_TIMEOUT_SECONDS = 10
+
+
+class Record:
+    """One message: a value for the serializer and Kafka-style (name, bytes) headers"""
+    __slots__ = ("value", "headers")
+
+    def __init__(self, value, headers=None):
+        self.value = value
+        self.headers = headers or []
+
+
+class KafkaTransport:
+    """kafka-python behind the transport interface.
+
+    The producer and consumer are created on first use, so a publish-only
+    process never joins a consumer group. Offsets are committed only by
+    ``commit``, after the polled records have been processed. Values are
+    JSON unless other (de)serializers are given, such as the event codec
+    in app/events.py.
+    """
+
+    def __init__(
+            self,
+            topics=(),
+            group_id: str | None = None,
+            bootstrap_servers: str = KAFKA_BOOTSTRAP_SERVERS,
+            value_serializer=dumps,
+            value_deserializer=loads,
+    ):
+        self.topics = list(topics)
+        self.group_id = group_id
+        self.bootstrap_servers = bootstrap_servers
+        self.value_serializer = value_serializer
+        self.value_deserializer = value_deserializer
+        self._producer = None
+        self._consumer = None
+        self._lock = threading.Lock()
+
+    @property
+    def producer(self):
+        with self._lock:
+            if self._producer is None:
+                try:
+                    self._producer = KafkaProducer(
+                        bootstrap_servers=self.bootstrap_servers,
+                        value_serializer=self.value_serializer,
+                        acks='all',
+                        retries=3,
+                        compression_type=None if KAFKA_COMPRESSION_TYPE == "none" else KAFKA_COMPRESSION_TYPE,
+                        linger_ms=KAFKA_LINGER_MS,
+                        batch_size=KAFKA_BATCH_SIZE,
+                    )
+                    logger.info("Connected to Kafka at %s", self.bootstrap_servers)
+                except Exception as e:
+                    logger.error("Failed to connect to Kafka: %s", e)
+                    raise
+            return self._producer
+
+    @property
+    def consumer(self):
+        with self._lock:
+            if self._consumer is None:
+                self._consumer = KafkaConsumer(
+                    *self.topics,
+                    bootstrap_servers=self.bootstrap_servers,
+                    value_deserializer=self.value_deserializer,
+                    group_id=self.group_id,
+                    auto_offset_reset="earliest",
+                    enable_auto_commit=False,
+                )
+            return self._consumer
+
+    def publish_batch(self, topic: str, records: list[Record], timeout: float = PUBLISH_TIMEOUT_SECONDS) -> list:
+        """Send all records, then wait for every acknowledgement; returns their metadata"""
+        producer = self.producer
+        futures = [producer.send(topic, value=record.value, headers=record.headers) for record in records]
+        return [future.get(timeout=timeout) for future in futures]
+
+    def poll_batch(self, max_records: int, timeout_ms: int) -> list[Record]:
+        batches = self.consumer.poll(timeout_ms=timeout_ms, max_records=max_records)
+        return [Record(message.value, message.headers) for messages in batches.values() for message in messages]
+
+    def commit(self) -> None:
+        if self._consumer is not None:
+            self._consumer.commit()
+
+    def close(self) -> None:
+        if self._producer is not None:
+            self._producer.flush()
+            self._producer.close()
+        if self._consumer is not None:
+            self._consumer.close()
+
+
+class MemoryTransport:
+    """Topics are in-process queues; records are delivered in publish order.
+
+    Nothing leaves the process, so it only connects a publisher and a
+    poller that share this object (tests, benchmarks, the soak test).
+    ``committed`` counts the records acknowledged with ``commit``.
+    """
+
+    def __init__(self, topics=()):
+        self.topics = list(topics)
+        self._queues: dict[str, deque] = defaultdict(deque)
+        self._ready = threading.Condition()
+        self.delivered = 0
+        self.committed = 0
+
+    def publish_batch(self, topic: str, records: list[Record], timeout: float = PUBLISH_TIMEOUT_SECONDS) -> list:
+        with self._ready:
+            self._queues[topic].extend(records)
+            self._ready.notify_all()
+        return [None] * len(records)
+
+    def pending(self, topic: str) -> int:
+        return len(self._queues[topic])
+
+    def poll_batch(self, max_records: int, timeout_ms: int) -> list[Record]:
+        deadline = time.monotonic() + timeout_ms / 1000
+        with self._ready:
+            while not any(self._queues[topic] for topic in self.topics):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._ready.wait(remaining):
+                    return []
+            batch = []
+            for topic in self.topics:
+                queue = self._queues[topic]
+                while queue and len(batch) < max_records:
+                    batch.append(queue.popleft())
+            self.delivered += len(batch)
+            return batch
+
+    def commit(self) -> None:
+        self.committed = self.delivered
+
+    def close(self) -> None:
+        pass
+
+
+def create_transport(
+        topics=(),
+        group_id: str | None = None,
+        kind: str = MESSAGE_TRANSPORT,
+        value_serializer=dumps,
+        value_deserializer=loads,
+):
+    """The transport for ``kind``; the in-process one passes values through unserialized"""
+    if kind == "memory":
+        return MemoryTransport(topics)
+    if kind == "kafka":
+        return KafkaTransport(
+            topics, group_id, value_serializer=value_serializer, value_deserializer=value_deserializer
+        )
+    raise ValueError(f"Unknown MESSAGE_TRANSPORT: {kind}")
@@ -1,10 +1,13 @@
 """Tests for Kafka consumer: process_transaction and consume_transactions."""
+import asyncio
 import pytest
 from unittest.mock import Mock, MagicMock, patch, AsyncMock
 from sqlalchemy import select
 
-from app.consumer import process_transaction, consume_transactions, AsyncSessionLocal
+from app.consumer import process_transaction, consume_loop, consume_transactions, AsyncSessionLocal
+from app.events import decode_event
 from app.models import Account, Transaction
+from app.transport import MemoryTransport, Record
 
 
 @pytest.fixture
@@ -87,6 +90,33 @@ async def test_process_withdraw(sample_transaction_data):
         assert tx.status == "COMPLETED"
 
 
+@pytest.mark.asyncio
+async def test_process_transfer_fails_when_funds_were_spent():
+    """A debit accepted by the API fails if earlier debits left too little."""
+    async with AsyncSessionLocal() as session:
+        session.add(Account(account_number="ACC001", owner_name="Alice", balance=150.0))
+        session.add(Account(account_number="ACC002", owner_name="Bob", balance=0.0))
+        session.add(Transaction(
+            id=1, from_account="ACC001", to_account="ACC002", amount=200.0,
+            transaction_type="TRANSFER", status="PENDING",
+        ))
+        await session.commit()
+
+    await process_transaction({
+        "transaction_id": 1,
+        "from_account": "ACC001",
+        "to_account": "ACC002",
+        "amount": 200.0,
+        "transaction_type": "TRANSFER",
+    })
+
+    async with AsyncSessionLocal() as session:
+        balances = dict((await session.execute(select(Account.account_number, Account.balance))).all())
+        assert balances == {"ACC001": 150.0, "ACC002": 0.0}
+        tx = (await session.execute(select(Transaction).where(Transaction.id == 1))).scalar_one()
+        assert tx.status == "FAILED"
+
+
 @pytest.mark.asyncio
 async def test_process_transfer(sample_transaction_data):
     async with AsyncSessionLocal() as session:
@@ -118,6 +148,38 @@ async def test_process_transfer(sample_transaction_data):
         assert tx.status == "COMPLETED"
 
 
+@pytest.mark.asyncio
+async def test_process_duplicate_event_is_noop():
+    """A re-published event for an already completed transaction changes nothing."""
+    async with AsyncSessionLocal() as session:
+        session.add(Account(account_number="ACC002", owner_name="Bob", balance=50.0))
+        session.add(
+            Transaction(
+                id=1,
+                from_account=None,
+                to_account="ACC002",
+                amount=100.0,
+                transaction_type="DEPOSIT",
+                status="PENDING",
+            )
+        )
+        await session.commit()
+
+    deposit_data = {
+        "transaction_id": 1,
+        "from_account": None,
+        "to_account": "ACC002",
+        "amount": 100.0,
+        "transaction_type": "DEPOSIT",
+    }
+    await process_transaction(deposit_data)
+    await process_transaction(deposit_data)
+
+    async with AsyncSessionLocal() as session:
+        r = await session.execute(select(Account).where(Account.account_number == "ACC002"))
+        assert r.scalar_one().balance == 150.0
+
+
 @pytest.mark.asyncio
 async def test_process_transaction_failure_sets_failed():
     """When an error occurs, transaction status is set to FAILED."""
@@ -148,25 +210,82 @@ async def test_process_transaction_failure_sets_failed():
     mock_session2.commit.assert_called_once()
 
 
-def test_consume_transactions_calls_process():
-    """consume_transactions iterates messages and calls process_transaction."""
-    mock_message = Mock()
-    mock_message.value = {
+@pytest.mark.asyncio
+async def test_consume_loop_calls_process():
+    """consume_loop polls batches and calls process_transaction for each message."""
+    value = {
         "transaction_id": 1,
         "from_account": "A",
         "to_account": "B",
         "amount": 10.0,
         "transaction_type": "DEPOSIT",
     }
-    mock_consumer = MagicMock()
-    mock_consumer.__iter__.return_value = iter([mock_message])
-
-    with patch("app.consumer.KafkaConsumer", return_value=mock_consumer):
-        with patch("app.consumer.process_transaction") as mock_process:
-            with patch("app.consumer.asyncio.run") as mock_run:
-                consume_transactions()
-                assert mock_run.call_count == 1
-                mock_process.assert_called_once_with(mock_message.value)
+    transport = MemoryTransport(["bank-transactions"])
+    transport.publish_batch("bank-transactions", [
+        Record(value, [("accepted_at", b"100.0"), ("published_at", b"100.5")])
+    ])
+    stop = asyncio.Event()
+
+    with patch("app.consumer.process_transaction", new_callable=AsyncMock) as mock_process:
+        mock_process.side_effect = lambda *args: stop.set()
+        await consume_loop(transport, stop)
+
+    data, trace = mock_process.call_args[0]
+    assert data == value
+    assert trace["accepted_at"] == 100.0
+    assert trace["published_at"] == 100.5
+    assert "received_at" in trace
+    assert transport.committed == 1
+
+
+@pytest.mark.asyncio
+async def test_consume_loop_survives_processing_errors():
+    transport = MemoryTransport(["bank-transactions"])
+    transport.publish_batch("bank-transactions", [Record({"transaction_id": i}) for i in (1, 2)])
+    stop = asyncio.Event()
+    calls = []
+
+    async def process(data, trace):
+        calls.append(data["transaction_id"])
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        stop.set()
+
+    with patch("app.consumer.process_transaction", side_effect=process):
+        await consume_loop(transport, stop)
+    assert calls == [1, 2]
+    assert transport.committed == 2
+
+
+@pytest.mark.asyncio
+async def test_consume_loop_decodes_records_and_skips_corrupt_ones():
+    good = b'{"transaction_id":3,"to_account":"B","amount":1.0,"transaction_type":"DEPOSIT"}'
+    transport = MemoryTransport(["bank-transactions"])
+    transport.publish_batch("bank-transactions", [Record(b"\x01\x00"), Record(b"{oops"), Record(good)])
+    stop = asyncio.Event()
+
+    with patch("app.consumer.process_transaction", new_callable=AsyncMock) as mock_process:
+        mock_process.side_effect = lambda *args: stop.set()
+        await consume_loop(transport, stop)
+
+    mock_process.assert_awaited_once()
+    assert mock_process.call_args[0][0] == decode_event(good)
+    assert transport.committed == 3
+
+
+def test_consume_transactions_runs_loop():
+    transport = MagicMock()
+    with patch("app.consumer.create_transport", return_value=transport) as create, \
+            patch("app.consumer.start_metrics_server") as mock_server, \
+            patch("app.consumer.setup_logging"), \
+            patch("app.consumer.consume_loop", new_callable=AsyncMock) as mock_loop:
+        consume_transactions()
+    mock_server.assert_called_once()
+    create.assert_called_once_with(
+        ["bank-transactions"], "bank-transaction-consumers", value_deserializer=None
+    )
+    mock_loop.assert_awaited_once_with(transport)
+    transport.close.assert_called_once()
 
 
 @pytest.mark.asyncio
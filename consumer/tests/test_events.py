@@ -0,0 +1,36 @@
+"""Tests for decoding transaction events in every supported format."""
+import pytest
+
+from app.events import decode_event
+
+DEPOSIT = {
+    "transaction_id": 7,
+    "from_account": None,
+    "to_account": "ACC000000002",
+    "amount": 10.0,
+    "transaction_type": "DEPOSIT",
+    "created_at": "2024-01-01T00:00:00",
+}
+# Version 1 as the server encodes it; changing these bytes breaks deployed producers
+DEPOSIT_V1 = bytes.fromhex("0100020700000000000000000000000000244000202110d70d06000c414343303030303030303032")
+
+
+def test_decodes_binary_v1():
+    assert decode_event(DEPOSIT_V1) == DEPOSIT
+
+
+def test_decodes_json():
+    raw = b'{"transaction_id":7,"from_account":null,"to_account":"ACC000000002","amount":10.0,' \
+          b'"transaction_type":"DEPOSIT","created_at":"2024-01-01T00:00:00"}'
+    assert decode_event(raw) == DEPOSIT
+
+
+def test_rejects_unknown_version():
+    with pytest.raises(ValueError):
+        decode_event(b"\x09" + DEPOSIT_V1[1:])
+
+
+@pytest.mark.parametrize("raw", [DEPOSIT_V1[:10], DEPOSIT_V1[:-3], DEPOSIT_V1[:26], b"{not json"])
+def test_rejects_corrupt_events_with_value_error(raw):
+    with pytest.raises(ValueError):
+        decode_event(raw)
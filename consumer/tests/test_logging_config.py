@@ -0,0 +1,33 @@
+"""Tests for the consumer's queue-based JSON logging."""
+import atexit
+import io
+import json
+import logging
+
+from app.logging_config import SamplingFilter, setup_logging
+
+
+def test_sampling_filter_thins_info_lines():
+    sampler = SamplingFilter({"app.consumer": 0.1})
+    records = [logging.LogRecord("app.consumer", logging.INFO, __file__, 1, "m", None, None) for _ in range(50)]
+    assert sum(sampler.filter(record) for record in records) == 5
+
+
+def test_setup_logging_json_lines():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    stream = io.StringIO()
+    try:
+        listener = setup_logging(level="INFO", fmt="json", sampling="", stream=stream)
+        logging.getLogger("app.consumer").info("Transaction %s completed", 5, extra={"transaction_id": 5})
+        listener.stop()
+        atexit.unregister(listener.stop)
+    finally:
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "Transaction 5 completed"
+    assert entry["transaction_id"] == 5
@@ -0,0 +1,86 @@
+"""Tests for pipeline latency tracing from Kafka headers."""
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+
+from app.consumer import process_transaction, AsyncSessionLocal
+from app.metrics import monitor_loop_lag, observe_completed, trace_from_headers
+from app.models import Account, Transaction
+
+
+def stage_count(stage: str) -> float:
+    return REGISTRY.get_sample_value("bank_transaction_pipeline_seconds_count", {"stage": stage}) or 0.0
+
+
+def stage_sum(stage: str) -> float:
+    return REGISTRY.get_sample_value("bank_transaction_pipeline_seconds_sum", {"stage": stage}) or 0.0
+
+
+def test_trace_from_headers():
+    trace = trace_from_headers(
+        [("accepted_at", b"10.5"), ("published_at", b"11.25"), ("other", b"x")],
+        received_at=12.0,
+    )
+    assert trace == {"accepted_at": 10.5, "published_at": 11.25, "received_at": 12.0}
+
+
+def test_trace_from_headers_ignores_missing_and_malformed():
+    assert trace_from_headers(None, received_at=1.0) == {"received_at": 1.0}
+    assert trace_from_headers([("accepted_at", b"soon")], received_at=1.0) == {"received_at": 1.0}
+
+
+def test_observe_completed_stages():
+    before = {stage: (stage_count(stage), stage_sum(stage)) for stage in ("queue", "process", "total")}
+    observe_completed({"accepted_at": 10.0, "published_at": 10.5, "received_at": 12.0}, completed_at=12.25)
+    assert stage_sum("queue") - before["queue"][1] == 1.5
+    assert stage_sum("process") - before["process"][1] == 0.25
+    assert stage_sum("total") - before["total"][1] == 2.25
+    for stage, (count, _) in before.items():
+        assert stage_count(stage) == count + 1
+
+
+def test_observe_completed_clamps_clock_skew_and_skips_missing():
+    before_queue, before_total = stage_count("queue"), stage_sum("total")
+    observe_completed({"accepted_at": 20.0, "received_at": 10.0}, completed_at=11.0)
+    assert stage_count("queue") == before_queue
+    assert stage_sum("total") == before_total
+
+
+@pytest.mark.asyncio
+async def test_process_transaction_records_pipeline_latency():
+    async with AsyncSessionLocal() as session:
+        session.add(Account(account_number="T1", owner_name="T", balance=0.0))
+        session.add(Transaction(id=1, to_account="T1", amount=5.0, transaction_type="DEPOSIT", status="PENDING"))
+        await session.commit()
+    before = stage_count("total")
+    now = time.time()
+    await process_transaction(
+        {"transaction_id": 1, "to_account": "T1", "amount": 5.0, "transaction_type": "DEPOSIT"},
+        {"accepted_at": now - 1, "published_at": now - 0.5, "received_at": now},
+    )
+    assert stage_count("total") == before + 1
+
+    # A duplicate delivery is skipped and not counted again
+    await process_transaction(
+        {"transaction_id": 1, "to_account": "T1", "amount": 5.0, "transaction_type": "DEPOSIT"},
+        {"accepted_at": now - 1, "received_at": now},
+    )
+    assert stage_count("total") == before + 1
+    async with AsyncSessionLocal() as session:
+        status = (await session.execute(select(Transaction.status).where(Transaction.id == 1))).scalar_one()
+    assert status == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_monitor_loop_lag_records_blocking():
+    before = REGISTRY.get_sample_value("bank_event_loop_lag_seconds_sum")
+    task = asyncio.create_task(monitor_loop_lag(interval=0.01))
+    await asyncio.sleep(0.005)
+    # Block the loop so the monitor's sleep wakes up late.
+    time.sleep(0.05)
+    await asyncio.sleep(0.001)
+    task.cancel()
+    assert REGISTRY.get_sample_value("bank_event_loop_lag_seconds_sum") - before > 0.02
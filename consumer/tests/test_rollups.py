@@ -0,0 +1,86 @@
+"""Tests for transaction rollups maintained by the consumer."""
+import pytest
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.consumer import process_transaction, AsyncSessionLocal
+from app.models import Account, Transaction, TransactionRollup
+from app.rollups import record_rollup, rollup_upsert
+
+
+@pytest.mark.asyncio
+async def test_process_transaction_updates_rollups():
+    async with AsyncSessionLocal() as session:
+        session.add(Account(account_number="ACC1", owner_name="Ann", balance=0.0))
+        session.add_all([
+            Transaction(id=i, to_account="ACC1", amount=10.0 * i, transaction_type="DEPOSIT", status="PENDING")
+            for i in (1, 2)
+        ])
+        await session.commit()
+
+    for i in (1, 2):
+        await process_transaction({
+            "transaction_id": i,
+            "from_account": None,
+            "to_account": "ACC1",
+            "amount": 10.0 * i,
+            "transaction_type": "DEPOSIT",
+        })
+
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(TransactionRollup))).scalars().all()
+    by_granularity = {row.granularity: row for row in rows}
+    assert set(by_granularity) == {"minute", "hour"}
+    minute = by_granularity["minute"]
+    assert (minute.transaction_type, minute.status, minute.count, minute.amount) == ("DEPOSIT", "COMPLETED", 2, 30.0)
+    assert minute.bucket_start.second == 0
+    assert by_granularity["hour"].bucket_start.minute == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_transaction_rollup_commits_with_status():
+    async with AsyncSessionLocal() as session:
+        session.add(Account(account_number="ACC1", owner_name="Ann", balance=5.0))
+        session.add(Transaction(id=1, from_account="ACC1", to_account="ACC1", amount=50.0,
+                                transaction_type="WITHDRAW", status="PENDING"))
+        await session.commit()
+
+    await process_transaction({
+        "transaction_id": 1,
+        "from_account": "ACC1",
+        "to_account": "ACC1",
+        "amount": 50.0,
+        "transaction_type": "WITHDRAW",
+    })
+
+    async with AsyncSessionLocal() as session:
+        status = (await session.execute(select(Transaction.status))).scalar_one()
+        rows = (await session.execute(select(TransactionRollup))).scalars().all()
+    assert status == "FAILED"
+    assert {(row.granularity, row.status, row.count, row.amount) for row in rows} == {
+        ("minute", "FAILED", 1, 50.0), ("hour", "FAILED", 1, 50.0)
+    }
+
+
+@pytest.mark.asyncio
+async def test_record_rollup_adds_to_existing_buckets():
+    at = datetime(2024, 1, 1, 10, 15, 42)
+    async with AsyncSessionLocal() as session:
+        await record_rollup(session, at, "TRANSFER", "COMPLETED", 5.0)
+        await record_rollup(session, at.replace(second=1), "TRANSFER", "COMPLETED", 7.0)
+        await record_rollup(session, at.replace(minute=50), "TRANSFER", "COMPLETED", 2.0)
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(TransactionRollup))).scalars().all()
+    totals = {(row.granularity, row.bucket_start.minute): (row.count, row.amount) for row in rows}
+    assert totals == {("minute", 15): (2, 12.0), ("minute", 50): (1, 2.0), ("hour", 0): (3, 14.0)}
+
+
+def test_rollup_upsert_postgres():
+    row = {"granularity": "minute", "bucket_start": datetime(2024, 1, 1, 10, 15), "transaction_type": "TRANSFER",
+           "status": "FAILED", "count": 1, "amount": 5.0}
+    sql = str(rollup_upsert("postgresql", [row]).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (granularity, bucket_start, transaction_type, status) DO UPDATE" in sql
+    assert "count = (transaction_rollups.count + excluded.count)" in sql
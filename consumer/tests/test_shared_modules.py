@@ -0,0 +1,48 @@
+"""Modules the consumer copies from the server must not drift apart.
+
+The consumer image is built from consumer/ alone, so these modules are
+copies rather than imports. Every top-level definition in a consumer copy
+must match the server's; the server may define more (FastJSONResponse, the
+event encoder). Imports, comments and the module docstring may differ.
+"""
+import ast
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+SHARED = [
+    ("server/app/logging_config.py", "consumer/app/logging_config.py"),
+    ("server/app/serialization.py", "consumer/app/serialization.py"),
+    ("server/app/services/transport.py", "consumer/app/transport.py"),
+    ("server/app/events.py", "consumer/app/events.py"),
+]
+
+
+def _definitions(path: Path) -> dict[str, str]:
+    """ast.dump of each top-level function, class and assignment, by name"""
+    definitions = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names = [node.name]
+        elif isinstance(node, ast.Assign):
+            names = [ast.unparse(target) for target in node.targets]
+        elif isinstance(node, ast.AnnAssign):
+            names = [ast.unparse(node.target)]
+        else:
+            continue
+        for name in names:
+            definitions[name] = ast.dump(node)
+    return definitions
+
+
+@pytest.mark.parametrize("server_path,consumer_path", SHARED)
+def test_consumer_copy_matches_server(server_path, consumer_path):
+    if not (ROOT / server_path).exists():
+        pytest.skip("server sources are not available")
+    server = _definitions(ROOT / server_path)
+    consumer = _definitions(ROOT / consumer_path)
+    assert consumer
+    assert sorted(name for name in consumer if name not in server) == []
+    drifted = sorted(name for name, definition in consumer.items() if server[name] != definition)
+    assert drifted == [], f"{consumer_path} differs from {server_path} in {drifted}"
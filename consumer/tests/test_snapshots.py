@@ -0,0 +1,55 @@
+"""Tests for daily balance snapshots maintained by the consumer."""
+import pytest
+from datetime import date
+from sqlalchemy import select
+
+from app.consumer import process_transaction, AsyncSessionLocal
+from app.models import Account, BalanceSnapshot, Transaction
+from app.snapshots import record_balance_snapshots
+
+
+@pytest.mark.asyncio
+async def test_process_transaction_records_closing_balances():
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            Account(account_number="ACC1", owner_name="Ann", balance=100.0),
+            Account(account_number="ACC2", owner_name="Bob", balance=0.0),
+            Transaction(id=1, to_account="ACC1", amount=50.0, transaction_type="DEPOSIT", status="PENDING"),
+            Transaction(id=2, from_account="ACC1", to_account="ACC2", amount=30.0,
+                        transaction_type="TRANSFER", status="PENDING"),
+        ])
+        await session.commit()
+
+    for tx_id, tx_type, from_account, amount in ((1, "DEPOSIT", None, 50.0), (2, "TRANSFER", "ACC1", 30.0)):
+        await process_transaction({
+            "transaction_id": tx_id,
+            "from_account": from_account,
+            "to_account": "ACC1" if tx_id == 1 else "ACC2",
+            "amount": amount,
+            "transaction_type": tx_type,
+        })
+
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(
+            select(BalanceSnapshot.account_number, BalanceSnapshot.closing_balance)
+            .order_by(BalanceSnapshot.account_number)
+        )).all()
+        tx = (await session.execute(select(Transaction).where(Transaction.id == 2))).scalar_one()
+        day = (await session.execute(select(BalanceSnapshot.day).limit(1))).scalar_one()
+    assert rows == [("ACC1", 120.0), ("ACC2", 30.0)]
+    assert day == tx.processed_at.date()
+
+
+@pytest.mark.asyncio
+async def test_record_balance_snapshots_overwrites_same_day():
+    async with AsyncSessionLocal() as session:
+        await record_balance_snapshots(session, date(2024, 1, 1), {"ACC1": 10.0})
+        await record_balance_snapshots(session, date(2024, 1, 1), {"ACC1": 25.0})
+        await record_balance_snapshots(session, date(2024, 1, 2), {"ACC1": 5.0})
+        await record_balance_snapshots(session, date(2024, 1, 2), {})
+        await session.commit()
+
+        rows = (await session.execute(
+            select(BalanceSnapshot.day, BalanceSnapshot.closing_balance).order_by(BalanceSnapshot.day)
+        )).all()
+    assert rows == [(date(2024, 1, 1), 25.0), (date(2024, 1, 2), 5.0)]
@@ -0,0 +1,104 @@
+"""Tests for the consumer's message transport."""
+import threading
+import time
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from app.transport import KafkaTransport, MemoryTransport, Record, create_transport
+
+
+def test_memory_poll_times_out_when_empty():
+    transport = MemoryTransport(["t"])
+    started = time.monotonic()
+    assert transport.poll_batch(10, 50) == []
+    assert time.monotonic() - started >= 0.04
+
+
+def test_memory_poll_wakes_on_publish():
+    transport = MemoryTransport(["t"])
+    timer = threading.Timer(0.02, transport.publish_batch, args=("t", [Record({"id": 1})]))
+    timer.start()
+    records = transport.poll_batch(10, 2000)
+    timer.join()
+    assert [record.value for record in records] == [{"id": 1}]
+    assert transport.delivered == 1
+    assert transport.committed == 0
+
+
+def test_kafka_transport_publish_batch_waits_for_acks():
+    producer = MagicMock()
+    producer.send.return_value.get.return_value = Mock(partition=0, offset=7)
+    with patch("app.transport.KafkaProducer", return_value=producer) as kafka:
+        transport = KafkaTransport()
+        results = transport.publish_batch("topic", [Record({"a": 1}, [("h", b"1")]), Record({"a": 2})])
+        transport.publish_batch("topic", [Record({"a": 3})])
+    kafka.assert_called_once()
+    assert kafka.call_args.kwargs["compression_type"] == "lz4"
+    assert [call.kwargs["value"] for call in producer.send.call_args_list] == [{"a": 1}, {"a": 2}, {"a": 3}]
+    assert producer.send.call_args_list[0].kwargs["headers"] == [("h", b"1")]
+    assert [r.offset for r in results] == [7, 7]
+
+
+def test_kafka_transport_raises_when_kafka_unavailable():
+    with patch("app.transport.KafkaProducer", side_effect=Exception("Connection refused")):
+        with pytest.raises(Exception, match="Connection refused"):
+            KafkaTransport().publish_batch("topic", [Record({})])
+
+
+def test_kafka_transport_poll_and_commit():
+    consumer = MagicMock()
+    consumer.poll.return_value = {"tp": [Mock(value=b"raw", headers=[("h", b"1")])]}
+    with patch("app.transport.KafkaConsumer", return_value=consumer) as kafka:
+        transport = KafkaTransport(["topic"], group_id="group", value_deserializer=None)
+        records = transport.poll_batch(10, 100)
+        transport.poll_batch(10, 100)
+        transport.commit()
+    kafka.assert_called_once()
+    assert kafka.call_args.args == ("topic",)
+    assert kafka.call_args.kwargs["group_id"] == "group"
+    assert kafka.call_args.kwargs["value_deserializer"] is None
+    assert kafka.call_args.kwargs["enable_auto_commit"] is False
+    consumer.poll.assert_called_with(timeout_ms=100, max_records=10)
+    assert [(r.value, r.headers) for r in records] == [(b"raw", [("h", b"1")])]
+    consumer.commit.assert_called_once()
+
+
+def test_kafka_transport_close_flushes_producer_and_closes_consumer():
+    producer, consumer = MagicMock(), MagicMock()
+    with patch("app.transport.KafkaProducer", return_value=producer), \
+            patch("app.transport.KafkaConsumer", return_value=consumer):
+        transport = KafkaTransport(["topic"])
+        transport.producer
+        transport.consumer
+        transport.close()
+    producer.flush.assert_called_once()
+    producer.close.assert_called_once()
+    consumer.close.assert_called_once()
+
+
+def test_kafka_transport_unused_clients_are_never_created():
+    with patch("app.transport.KafkaProducer") as producer, patch("app.transport.KafkaConsumer") as consumer:
+        transport = KafkaTransport(["topic"])
+        transport.commit()
+        transport.close()
+    producer.assert_not_called()
+    consumer.assert_not_called()
+
+
+def test_create_transport():
+    memory = create_transport(["t"], kind="memory")
+    assert isinstance(memory, MemoryTransport)
+    assert memory.topics == ["t"]
+    kafka = create_transport(["t"], "group", kind="kafka", value_deserializer=None)
+    assert isinstance(kafka, KafkaTransport)
+    assert (kafka.topics, kafka.group_id, kafka.value_deserializer) == (["t"], "group", None)
+    with pytest.raises(ValueError):
+        create_transport(kind="carrier-pigeon")
+
+
+def test_memory_transport_pending_and_close():
+    transport = MemoryTransport(["t"])
+    transport.publish_batch("t", [Record(1), Record(2)])
+    assert transport.pending("t") == 2
+    transport.close()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""Consumer throughput benchmark with an in-process stand-in for Kafka.
+
+Seeds accounts and PENDING transactions, then feeds their events through
+the consumer's own ``consume_loop`` from the in-process transport, so the
+same poll / process_transaction / commit path runs as in production,
+minus the network. Reports messages per second, time per stage and the
+SQL statements issued per message.
+
+Uses a scratch SQLite database unless DATABASE_URL points elsewhere (for
+example a local PostgreSQL; its tables are created if missing). Seeding
+empties the accounts and transactions tables first, so a database from
+DATABASE_URL is only used with --reset.
+
+    python scripts/bench_consumer.py --workload transfer-heavy --messages 5000
+    python scripts/bench_consumer.py --workload all --save consumer.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "consumer"))
+
+SCRATCH_DATABASE = "DATABASE_URL" not in os.environ
+if SCRATCH_DATABASE:
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="bench-consumer-"), "bench.db"
+    )
+
+from sqlalchemy import delete, event, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.consumer import TRANSACTIONS_TOPIC, AsyncSessionLocal, consume_loop, engine  # noqa: E402
+from app.models import Account, Base, BalanceSnapshot, Transaction, TransactionRollup  # noqa: E402
+from app.transport import MemoryTransport, Record  # noqa: E402
+
+# type -> (share of DEPOSIT, WITHDRAW, TRANSFER), hot-account skew
+WORKLOADS = {
+    "deposit-heavy": ((0.8, 0.1, 0.1), 0.0),
+    "transfer-heavy": ((0.1, 0.1, 0.8), 0.0),
+    "hot-accounts": ((0.1, 0.1, 0.8), 0.5),
+}
+HOT_ACCOUNT_SHARE = 0.01
+STATEMENT_KIND = re.compile(r"^\s*(\w+)\s+(?:INTO\s+|FROM\s+)?(\w+)", re.IGNORECASE)
+
+
+class LocalBroker(MemoryTransport):
+    """The in-process transport, timing its polls and stopping the consume
+    loop once every published record has been handed out."""
+
+    def __init__(self, stop: asyncio.Event, max_records: int):
+        super().__init__([TRANSACTIONS_TOPIC])
+        self.stop = stop
+        self.max_records = max_records
+        self.loop = asyncio.get_running_loop()
+        self.poll_seconds = 0.0
+
+    def poll_batch(self, max_records: int, timeout_ms: int) -> list[Record]:
+        started = time.perf_counter()
+        batch = super().poll_batch(min(max_records, self.max_records), 0)
+        if not self.pending(TRANSACTIONS_TOPIC):
+            self.loop.call_soon_threadsafe(self.stop.set)
+        self.poll_seconds += time.perf_counter() - started
+        return batch
+
+
+class StatementStats:
+    """Counts and times SQL statements by kind (verb and table), and commits"""
+
+    def __init__(self, sync_engine):
+        self.counts = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self._commit_started = None
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        event.listen(sync_engine, "commit", self._before_commit)
+        event.listen(Session, "after_commit", self._after_commit)
+
+    def _before_commit(self, conn):
+        self._commit_started = time.perf_counter()
+
+    def _after_commit(self, session):
+        if self._commit_started is not None:
+            self.counts["COMMIT"] += 1
+            self.seconds["COMMIT"] += time.perf_counter() - self._commit_started
+            self._commit_started = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["bench_started"] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        match = STATEMENT_KIND.match(statement)
+        kind = f"{match.group(1).upper()} {match.group(2)}" if match else statement.split(None, 1)[0]
+        self.counts[kind] += 1
+        self.seconds[kind] += time.perf_counter() - conn.info.pop("bench_started")
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.seconds.clear()
+
+
+def pick_account(rng: random.Random, accounts: list[str], skew: float) -> str:
+    hot = max(1, int(len(accounts) * HOT_ACCOUNT_SHARE))
+    if skew and rng.random() < skew:
+        return accounts[rng.randrange(hot)]
+    return rng.choice(accounts)
+
+
+def generate_events(workload: str, count: int, accounts: list[str], rng: random.Random) -> list[dict]:
+    shares, skew = WORKLOADS[workload]
+    events = []
+    for i in range(count):
+        transaction_type = rng.choices(("DEPOSIT", "WITHDRAW", "TRANSFER"), shares)[0]
+        to_account = pick_account(rng, accounts, skew)
+        from_account = None
+        if transaction_type != "DEPOSIT":
+            from_account = pick_account(rng, accounts, skew)
+            while from_account == to_account:
+                from_account = rng.choice(accounts)
+        events.append({
+            "transaction_id": i + 1,
+            "from_account": from_account,
+            "to_account": to_account,
+            "amount": round(rng.uniform(1, 100), 2),
+            "transaction_type": transaction_type,
+            "created_at": None,
+        })
+    return events
+
+
+async def seed(accounts: int) -> list[str]:
+    numbers = [f"BENCH{i:08d}" for i in range(accounts)]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for model in (BalanceSnapshot, TransactionRollup, Transaction, Account):
+            await conn.execute(delete(model))
+        await conn.execute(insert(Account), [
+            {"account_number": number, "owner_name": "Bench", "balance": 1e9, "opening_balance": 1e9}
+            for number in numbers
+        ])
+    return numbers
+
+
+async def insert_pending(events: list[dict]) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(insert(Transaction), [
+            {key: event[key] for key in ("from_account", "to_account", "amount", "transaction_type")}
+            | {"id": event["transaction_id"], "status": "PENDING"}
+            for event in events
+        ])
+
+
+async def run_workload(name: str, args, stats: StatementStats) -> dict:
+    rng = random.Random(args.random_seed)
+    accounts = await seed(args.accounts)
+    events = generate_events(name, args.messages, accounts, rng)
+    await insert_pending(events)
+
+    published_at = repr(time.time()).encode()
+    stop = asyncio.Event()
+    broker = LocalBroker(stop, args.max_poll_records)
+    broker.publish_batch(TRANSACTIONS_TOPIC, [
+        Record(event, [("accepted_at", published_at), ("published_at", published_at)]) for event in events
+    ])
+
+    stats.reset()
+    started = time.perf_counter()
+    await consume_loop(broker, stop)
+    elapsed = time.perf_counter() - started
+    counts, seconds = dict(stats.counts), dict(stats.seconds)
+
+    async with AsyncSessionLocal() as session:
+        completed = (await session.execute(
+            select(func.count()).select_from(Transaction).where(Transaction.status == "COMPLETED")
+        )).scalar_one()
+    sql_seconds = sum(seconds.values())
+    return {
+        "messages": len(events),
+        "completed": completed,
+        "msgs_per_sec": round(len(events) / elapsed, 1),
+        "stage_ms_per_msg": {
+            "poll": round(broker.poll_seconds / len(events) * 1000, 4),
+            "sql_and_commit": round(sql_seconds / len(events) * 1000, 4),
+            "other": round((elapsed - sql_seconds - broker.poll_seconds) / len(events) * 1000, 4),
+        },
+        "statements_per_msg": {
+            kind: round(count / len(events), 2) for kind, count in sorted(counts.items())
+        },
+        "statement_ms_per_msg": {
+            kind: round(total / len(events) * 1000, 4) for kind, total in sorted(seconds.items())
+        },
+    }
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workload", choices=[*WORKLOADS, "all"], default="all")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--max-poll-records", type=int, default=500, help="records per poll, like MAX_POLL_RECORDS")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument(
+        "--reset", action="store_true", help="allow deleting all accounts and transactions in DATABASE_URL"
+    )
+    args = parser.parse_args(argv)
+    if not SCRATCH_DATABASE and not args.reset:
+        parser.error(
+            f"seeding deletes every account and transaction in {engine.url.render_as_string(hide_password=True)};"
+            " pass --reset to confirm, or unset DATABASE_URL to use a scratch database"
+        )
+
+    logging.basicConfig(level=logging.WARNING)
+    stats = StatementStats(engine.sync_engine)
+    names = list(WORKLOADS) if args.workload == "all" else [args.workload]
+    results = {
+        "database": engine.url.render_as_string(hide_password=True),
+        "workloads": {name: await run_workload(name, args, stats) for name in names},
+    }
+    await engine.dispose()
+
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""HTTP load generator for the bank API: latency percentiles and throughput.
+
+Requests are issued open-loop at a target rate (``--rps``) with at most
+``--concurrency`` in flight. Latency is measured from each request's
+scheduled start, so time spent waiting behind a slow server is counted
+instead of hidden (no coordinated omission).
+
+Without ``--url`` the app is driven in-process through ASGI against a
+scratch SQLite database, and events go to the in-process transport
+instead of Kafka.
+With ``--url`` a running server is used.
+
+    python scripts/bench_http.py --rps 300 --duration 20 --save bench.json
+    python scripts/bench_http.py --url http://localhost:8000 --baseline bench.json
+    python scripts/bench_http.py --mix get_account=1 --rps 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+
+import httpx
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server")
+DEFAULT_MIX = "get_account=70,create_transaction=25,create_account=5"
+TRANSACTION_TYPES = ("DEPOSIT", "TRANSFER", "WITHDRAW")
+
+
+class Workload:
+    """The operations in a mix; all of them use accounts created by ``seed``"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random):
+        self.client = client
+        self.rng = rng
+        self.accounts: list[str] = []
+
+    async def seed(self, count: int) -> None:
+        for i in range(count):
+            response = await self.client.post(
+                "/accounts/", json={"owner_name": f"Bench Owner {i}", "initial_balance": 1_000_000}
+            )
+            response.raise_for_status()
+            self.accounts.append(response.json()["account_number"])
+
+    async def create_account(self) -> httpx.Response:
+        response = await self.client.post(
+            "/accounts/", json={"owner_name": f"Bench Owner {self.rng.randrange(10 ** 6)}", "initial_balance": 100}
+        )
+        if response.status_code == 201:
+            self.accounts.append(response.json()["account_number"])
+        return response
+
+    async def get_account(self) -> httpx.Response:
+        return await self.client.get(f"/accounts/{self.rng.choice(self.accounts)}")
+
+    async def create_transaction(self) -> httpx.Response:
+        transaction_type = self.rng.choice(TRANSACTION_TYPES)
+        source, target = self.rng.sample(self.accounts, 2)
+        body = {"to_account": target, "amount": round(self.rng.uniform(1, 100), 2),
+                "transaction_type": transaction_type}
+        if transaction_type != "DEPOSIT":
+            body["from_account"] = source
+        return await self.client.post("/transactions/", json=body)
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if not hasattr(Workload, name) or name == "seed":
+            raise SystemExit(f"unknown operation in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(samples: list[tuple[float, bool]], elapsed: float) -> dict:
+    latencies = sorted(latency for latency, _ in samples)
+    return {
+        "count": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "p999_ms": round(percentile(latencies, 0.999) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def run_load(workload: Workload, mix: dict[str, float], rps: float, duration: float,
+                   concurrency: int) -> tuple[dict[str, list], float]:
+    operations, weights = list(mix), list(mix.values())
+    samples: dict[str, list[tuple[float, bool]]] = {name: [] for name in operations}
+    slots = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def one(name: str, scheduled: float) -> None:
+        async with slots:
+            try:
+                response = await getattr(workload, name)()
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+        samples[name].append((loop.time() - scheduled, ok))
+
+    started = loop.time()
+    total = int(rps * duration)
+    tasks = []
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = workload.rng.choices(operations, weights)[0]
+        tasks.append(asyncio.create_task(one(name, scheduled)))
+    await asyncio.gather(*tasks)
+    return samples, loop.time() - started
+
+
+def compare(result: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Operations whose p99 grew or throughput fell by more than ``max_regression``"""
+    regressions = []
+    for name, base in baseline["operations"].items():
+        current = result["operations"].get(name)
+        if not current or not base["count"]:
+            continue
+        if base["p99_ms"] and current["p99_ms"] > base["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p99 {base['p99_ms']} -> {current['p99_ms']} ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} rps")
+    return regressions
+
+
+async def in_process_client() -> httpx.AsyncClient:
+    """The app over ASGI with a scratch SQLite database and the in-process transport"""
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-http-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    for name, value in (("RATE_LIMIT_ENABLED", "false"), ("SWEEPER_ENABLED", "false"),
+                        ("DATABASE_ECHO", "false"), ("LOG_LEVEL", "WARNING"), ("MESSAGE_TRANSPORT", "memory")):
+        os.environ.setdefault(name, value)
+    sys.path.insert(0, SERVER_DIR)
+
+    from app.main import app
+    from app.models.database import init_db
+
+    await init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="server to load; in-process ASGI when omitted")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight,... (default: %(default)s)")
+    parser.add_argument("--rps", type=float, default=200, help="target request rate")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    parser.add_argument("--seed-accounts", type=int, default=100)
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against; exit 1 on regression")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed p99/throughput change")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30, limits=httpx.Limits(
+            max_connections=args.concurrency, max_keepalive_connections=args.concurrency))
+    else:
+        client = await in_process_client()
+
+    async with client:
+        workload = Workload(client, random.Random(args.random_seed))
+        await workload.seed(max(args.seed_accounts, 2))
+        if args.warmup:
+            await run_load(workload, mix, args.rps, args.warmup, args.concurrency)
+        samples, elapsed = await run_load(workload, mix, args.rps, args.duration, args.concurrency)
+
+    result = {
+        "config": {"target": args.url or "in-process", "mix": mix, "rps": args.rps,
+                   "duration": args.duration, "concurrency": args.concurrency},
+        "operations": {name: summarize(values, elapsed) for name, values in samples.items()},
+        "total": summarize([sample for values in samples.values() for sample in values], elapsed),
+    }
+    print(json.dumps(result, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Compare the JSON backends and event formats on the payloads the service emits.
+
+Times encode+decode of a transaction event (what the producer and the
+consumer do per message), encoding a page of 100 accounts (GET /accounts/),
+and, for context, the pydantic validation and ``model_dump`` that precede
+every response encode. For each EVENT_FORMAT it also reports the bytes per
+event, raw and with each available Kafka compression codec applied to a
+batch of 100 events.
+
+    python scripts/bench_json.py --iterations 20000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from app.models.schemas import AccountResponse  # noqa: E402
+from app.events import decode_event, encode_event  # noqa: E402
+from app.serialization import BACKENDS  # noqa: E402
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover - optional for this script
+    lz4 = None
+
+EVENT = {
+    "transaction_id": 123456,
+    "from_account": "ACC1234567890",
+    "to_account": "ACC0987654321",
+    "amount": 125.5,
+    "transaction_type": "TRANSFER",
+    "created_at": "2024-05-01T12:00:00.123456",
+}
+ACCOUNT = {
+    "id": 1,
+    "account_number": "ACC1234567890",
+    "owner_name": "Иван Петров",
+    "balance": 1000.25,
+    "created_at": datetime(2024, 5, 1, 12, 0, 0),
+    "is_active": True,
+}
+
+
+def per_call_us(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return round((time.perf_counter() - started) / iterations * 1e6, 2)
+
+
+def compressors() -> dict:
+    codecs = {"gzip": gzip.compress}
+    if lz4 is not None:
+        codecs["lz4"] = lz4.frame.compress
+    return codecs
+
+
+def event_formats(iterations: int) -> dict:
+    rng = random.Random(1)
+    events = [dict(EVENT, transaction_id=EVENT["transaction_id"] + i, amount=round(rng.uniform(1, 1000), 2),
+                   from_account=f"ACC{rng.randrange(10 ** 9):09d}", to_account=f"ACC{rng.randrange(10 ** 9):09d}",
+                   created_at=f"2024-05-01T12:{i % 60:02d}:{rng.randrange(60):02d}.{rng.randrange(10 ** 6):06d}")
+              for i in range(100)]
+    results = {}
+    for fmt in ("json", "binary"):
+        encoded = [encode_event(event, fmt) for event in events]
+        batch = b"".join(encoded)
+        results[fmt] = {
+            "roundtrip_us": per_call_us(lambda: decode_event(encode_event(EVENT, fmt)), iterations),
+            "bytes_per_event": round(len(batch) / len(events), 1),
+            **{f"{name}_bytes_per_event": round(len(compress(batch)) / len(events), 1)
+               for name, compress in compressors().items()},
+        }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    page = [dict(ACCOUNT, id=i) for i in range(100)]
+    dumped = [AccountResponse.model_validate(row).model_dump(mode="json") for row in page]
+    results = {}
+    for name, (dumps, loads) in BACKENDS.items():
+        results[name] = {
+            "event_roundtrip": per_call_us(lambda: loads(dumps(EVENT)), args.iterations),
+            "accounts_page_encode": per_call_us(lambda: dumps(dumped), args.iterations // 10),
+        }
+    results["pydantic_accounts_page"] = per_call_us(
+        lambda: [AccountResponse.model_validate(row).model_dump(mode="json") for row in page], args.iterations // 10
+    )
+
+    print(json.dumps({
+        "us_per_call": results, "event_formats": event_formats(args.iterations), "iterations": args.iterations
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Benchmark the cost of one log call as seen by the calling thread.
+
+Compares the previous basicConfig-style StreamHandler with the queue-based
+JSON pipeline from app.logging_config, plus a sampled-out call and a call
+below the logger's level. Output goes to a file so terminal speed does not
+dominate; the queue listener's write cost is reported separately, since it
+is paid on its own thread.
+
+    python scripts/bench_logging.py --calls 200000 --output /tmp/bench.log
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from app.logging_config import TEXT_FORMAT, setup_logging  # noqa: E402
+
+LOGGER = "app.services.kafka_producer"
+
+
+def reset_root() -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def time_calls(calls: int, method: str = "info") -> float:
+    log = getattr(logging.getLogger(LOGGER), method)
+    started = time.perf_counter()
+    for i in range(calls):
+        log("Sent transaction %s to Kafka", i, extra={"transaction_id": i})
+    return time.perf_counter() - started
+
+
+def per_call_ns(seconds: float, calls: int) -> float:
+    return round(seconds / calls * 1e9, 1)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--output", default=os.devnull, help="file the handlers write to")
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with open(args.output, "a") as stream:
+        reset_root()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        logging.getLogger().addHandler(handler)
+        logging.getLogger().setLevel(logging.INFO)
+        results["sync_text"] = per_call_ns(time_calls(args.calls), args.calls)
+
+        for name, sampling in (("queue_json", ""), ("queue_json_sampled", f"{LOGGER}={args.sample_rate}")):
+            reset_root()
+            listener = setup_logging(level="INFO", fmt="json", sampling=sampling, stream=stream)
+            caller = time_calls(args.calls)
+            started = time.perf_counter()
+            listener.stop()  # drains the queue
+            atexit.unregister(listener.stop)
+            results[name] = per_call_ns(caller, args.calls)
+            results[f"{name}_drain_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        results["below_level"] = per_call_ns(time_calls(args.calls, "debug"), args.calls)
+        reset_root()
+
+    print(json.dumps({"ns_per_call": results, "calls": args.calls}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
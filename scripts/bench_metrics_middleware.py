@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Benchmark PrometheusMiddleware overhead and label cardinality.
+
+Drives a small FastAPI app through raw ASGI calls (no HTTP stack) so the
+per-request cost of the middleware is visible, and compares labelling by
+route template with labelling by raw path.
+
+    python scripts/bench_metrics_middleware.py --requests 50000 --accounts 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server"))
+
+from fastapi import FastAPI  # noqa: E402
+from prometheus_client import REGISTRY, generate_latest  # noqa: E402
+
+from app.monitoring.metrics import PrometheusMiddleware  # noqa: E402
+
+
+class RawPathMiddleware(PrometheusMiddleware):
+    """The previous behaviour: one label value per distinct path"""
+
+    def _endpoint_label(self, scope) -> str:
+        return scope['path']
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/accounts/{account_number}")
+    async def get_account(account_number: str):
+        return {"account_number": account_number}
+
+    @app.get("/transactions/{transaction_id}")
+    async def get_transaction(transaction_id: int):
+        return {"id": transaction_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+def paths(requests: int, accounts: int) -> list[str]:
+    result = []
+    for i in range(requests):
+        kind = i % 4
+        if kind == 0:
+            result.append("/health")
+        elif kind == 1:
+            result.append(f"/transactions/{i % accounts}")
+        elif kind == 2:
+            result.append(f"/missing/{i % accounts}")
+        else:
+            result.append(f"/accounts/{i % accounts:010d}")
+    return result
+
+
+async def run(asgi_app, request_paths: list[str]) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for path in request_paths:
+        scope = {
+            "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [], "client": ("127.0.0.1", 1234), "server": ("test", 80),
+        }
+        await asgi_app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def series_count() -> int:
+    return sum(
+        1 for metric in REGISTRY.collect() if metric.name == "http_requests"
+        for sample in metric.samples if sample.name == "http_requests_total"
+    )
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--accounts", type=int, default=10000, help="distinct ids in the paths")
+    args = parser.parse_args(argv)
+
+    request_paths = paths(args.requests, args.accounts)
+    app = build_app()
+    await run(app, request_paths[:1000])  # warm-up
+
+    results = {}
+    for name, asgi_app in (
+            ("bare", app),
+            ("route_template", PrometheusMiddleware(app)),
+            ("raw_path", RawPathMiddleware(app)),
+    ):
+        before = series_count()
+        elapsed = await run(asgi_app, request_paths)
+        started = time.perf_counter()
+        generate_latest(REGISTRY)
+        results[name] = {
+            "us_per_request": round(elapsed / args.requests * 1e6, 2),
+            "new_series": series_count() - before,
+            "scrape_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    for name in ("route_template", "raw_path"):
+        results[name]["overhead_us"] = round(
+            results[name]["us_per_request"] - results["bare"]["us_per_request"], 2
+        )
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
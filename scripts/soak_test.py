@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+"""Soak test: concurrent money movement against a running stack, with invariant checks.
+
+Creates its own accounts, then for ``--minutes`` fires deposits, withdrawals
+and transfers between them through the API at ``--rps`` (open loop, at
+most ``--concurrency`` in flight) while the consumer processes them. Every
+``--check-interval`` seconds it checks that
+
+- the sum of the accounts' balances equals their opening balances plus
+  completed deposits minus completed withdrawals,
+- no balance is negative,
+- no accepted transaction has stayed PENDING/PROCESSING longer than
+  ``--stuck-after`` seconds.
+
+Balances and statuses cannot be read atomically under load, so every
+transaction that may have been applied while a check was reading (it
+finished then, or its request was still in flight) widens the allowed
+range by its amount; after the load stops and the backlog drains the
+final check is exact.
+
+Each interval prints a row of throughput, API latency and backlog; at the
+end these are charted as sparklines (``--svg`` writes a chart file,
+``--save`` the timeline as JSON). Exits 1 if an invariant was violated.
+
+The API rate-limits each client to 20 transactions/s by default; start the
+server with RATE_LIMIT_ENABLED=false to soak above that. Rejections (400
+insufficient funds, 429) are counted separately from errors.
+
+    docker compose up -d
+    python scripts/soak_test.py --minutes 30 --rps 50 --svg soak.svg --save soak.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+
+import httpx
+
+from bench_http import percentile
+
+TRANSACTION_TYPES = ("DEPOSIT", "WITHDRAW", "TRANSFER")
+UNFINISHED = ("PENDING", "PROCESSING")
+SPARK = "▁▂▃▄▅▆▇█"
+SERIES = (
+    ("requests_rps", "requests/s"),
+    ("finished_rps", "finished/s"),
+    ("p50_ms", "API p50 ms"),
+    ("p99_ms", "API p99 ms"),
+    ("backlog", "unfinished"),
+)
+TOLERANCE = 0.01
+
+
+class Ledger:
+    """What the soak test has submitted, and what it has seen finish"""
+
+    def __init__(self, opening_total: float):
+        self.opening_total = opening_total
+        self.unfinished: dict[int, dict] = {}
+        self.completed_delta = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.responses: dict[str, int] = {}
+        self.samples: list[tuple[float, bool]] = []
+
+    def accept(self, transaction: dict) -> None:
+        transaction["submitted_at"] = time.monotonic()
+        self.unfinished[transaction["id"]] = transaction
+
+    def finish(self, transaction_id: int, status: str) -> None:
+        transaction = self.unfinished.pop(transaction_id)
+        if status == "COMPLETED":
+            self.completed += 1
+            self.completed_delta += effect(transaction)
+        else:
+            self.failed += 1
+
+
+def effect(transaction: dict) -> float:
+    """Change to the sum of the soak accounts' balances once ``transaction`` completes"""
+    return {"DEPOSIT": 1, "WITHDRAW": -1, "TRANSFER": 0}[transaction["transaction_type"]] * transaction["amount"]
+
+
+class Soak:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.random_seed)
+        self.accounts: list[str] = []
+        self.ledger: Ledger | None = None
+        self.violations: list[str] = []
+        self.timeline: list[dict] = []
+        self.reads = asyncio.Semaphore(args.concurrency)
+        self.posting: dict[int, dict] = {}
+        self.tokens = itertools.count()
+        # Requests in flight during the current check, or None between checks
+        self.window: list[dict] | None = None
+
+    async def get(self, path: str) -> dict | None:
+        """GET with a few retries on 429 and connection errors; None when they persist"""
+        async with self.reads:
+            for attempt in range(5):
+                try:
+                    response = await self.client.get(path)
+                except httpx.TransportError:
+                    response = None
+                if response is not None and response.status_code != 429:
+                    response.raise_for_status()
+                    return response.json()
+                await asyncio.sleep(0.2 * (attempt + 1))
+        return None
+
+    async def seed(self) -> None:
+        for i in range(self.args.accounts):
+            response = await self.client.post(
+                "/accounts/", json={"owner_name": f"Soak Owner {i}", "initial_balance": self.args.initial_balance}
+            )
+            response.raise_for_status()
+            self.accounts.append(response.json()["account_number"])
+        self.ledger = Ledger(self.args.initial_balance * len(self.accounts))
+
+    async def submit(self, scheduled: float) -> None:
+        transaction_type = self.rng.choices(TRANSACTION_TYPES, self.args.weights)[0]
+        source, target = self.rng.sample(self.accounts, 2)
+        body = {"to_account": target, "amount": self.rng.randint(100, 5000) / 100,
+                "transaction_type": transaction_type}
+        if transaction_type == "WITHDRAW":
+            body["from_account"] = body["to_account"] = source
+        elif transaction_type == "TRANSFER":
+            body["from_account"] = source
+        token = next(self.tokens)
+        self.posting[token] = body
+        if self.window is not None:
+            self.window.append(body)
+        try:
+            response = await self.client.post("/transactions/", json=body)
+            outcome = "accepted" if response.status_code == 202 else (
+                "rejected" if response.status_code in (400, 429) else f"error_{response.status_code}")
+        except httpx.HTTPError:
+            response, outcome = None, "error_transport"
+        finally:
+            del self.posting[token]
+        self.ledger.samples.append((time.monotonic() - scheduled, not outcome.startswith("error")))
+        self.ledger.responses[outcome] = self.ledger.responses.get(outcome, 0) + 1
+        if outcome == "accepted":
+            self.ledger.accept(body | {"id": response.json()["id"]})
+
+    async def load(self, duration: float) -> None:
+        slots = asyncio.Semaphore(self.args.concurrency)
+
+        async def one(scheduled: float) -> None:
+            async with slots:
+                await self.submit(scheduled)
+
+        started = time.monotonic()
+        tasks = set()
+        for i in range(int(self.args.rps * duration)):
+            delay = started + i / self.args.rps - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(one(started + i / self.args.rps))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    async def refresh_statuses(self) -> set[int]:
+        """Record transactions that have finished; returns the ids seen still unfinished"""
+        ids = list(self.ledger.unfinished)
+        rows = await asyncio.gather(*(self.get(f"/transactions/{transaction_id}") for transaction_id in ids))
+        unfinished = set()
+        for transaction_id, row in zip(ids, rows):
+            if row is None:
+                continue
+            if row["status"] in UNFINISHED:
+                unfinished.add(transaction_id)
+            else:
+                self.ledger.finish(transaction_id, row["status"])
+        return unfinished
+
+    def violation(self, message: str) -> None:
+        line = f"[{time.strftime('%H:%M:%S')}] VIOLATION {message}"
+        self.violations.append(line)
+        print(line, file=sys.stderr)
+
+    async def check(self) -> None:
+        """Compare balances with the ledger, allowing for transactions finishing mid-read"""
+        ledger = self.ledger
+        await self.refresh_statuses()
+        sure_delta = ledger.completed_delta
+        unfinished = dict(ledger.unfinished)
+        self.window = list(self.posting.values())
+        rows = await asyncio.gather(*(self.get(f"/accounts/{number}") for number in self.accounts))
+        still_unfinished = await self.refresh_statuses()
+        # Still unfinished now means not applied when the balances were read
+        uncertain = [transaction for transaction_id, transaction in unfinished.items()
+                     if transaction_id not in still_unfinished] + self.window
+        self.window = None
+
+        if any(row is None for row in rows):
+            print("check skipped: some balance reads failed", file=sys.stderr)
+        else:
+            total = sum(row["balance"] for row in rows)
+            low = high = ledger.opening_total + sure_delta
+            # A transfer may be seen on one side only
+            for transaction in uncertain:
+                if transaction["transaction_type"] != "DEPOSIT":
+                    low -= transaction["amount"]
+                if transaction["transaction_type"] != "WITHDRAW":
+                    high += transaction["amount"]
+            if not low - TOLERANCE <= total <= high + TOLERANCE:
+                self.violation(f"sum of balances {total:.2f} outside expected [{low:.2f}, {high:.2f}]")
+            for row in rows:
+                if row["balance"] < -TOLERANCE:
+                    self.violation(f"account {row['account_number']} has negative balance {row['balance']:.2f}")
+
+        now = time.monotonic()
+        stuck = [transaction_id for transaction_id, transaction in ledger.unfinished.items()
+                 if now - transaction["submitted_at"] > self.args.stuck_after]
+        if stuck:
+            self.violation(f"{len(stuck)} transactions unfinished after {self.args.stuck_after}s, e.g. {stuck[:5]}")
+            for transaction_id in stuck:
+                ledger.unfinished[transaction_id]["submitted_at"] = float("inf")  # report each once
+
+    def record_interval(self, started: float, elapsed: float, finished_before: int) -> dict:
+        samples, self.ledger.samples = self.ledger.samples, []
+        latencies = sorted(latency for latency, _ in samples)
+        row = {
+            "t": round(time.monotonic() - started),
+            "requests_rps": round(len(samples) / elapsed, 1),
+            "finished_rps": round((self.ledger.completed + self.ledger.failed - finished_before) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "errors": sum(1 for _, ok in samples if not ok),
+            "backlog": len(self.ledger.unfinished),
+        }
+        self.timeline.append(row)
+        print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+        return row
+
+    async def monitor(self, started: float, done: asyncio.Event) -> None:
+        while not done.is_set():
+            interval_started = time.monotonic()
+            finished_before = self.ledger.completed + self.ledger.failed
+            try:
+                await asyncio.wait_for(done.wait(), self.args.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.check()
+            self.record_interval(started, time.monotonic() - interval_started, finished_before)
+
+    async def drain(self) -> None:
+        deadline = time.monotonic() + self.args.drain_timeout
+        while self.ledger.unfinished and time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            await self.refresh_statuses()
+        self.args.stuck_after = 0  # whatever is left now is stuck
+        await self.check()
+
+
+def sparkline(values: list[float]) -> str:
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return "".join(SPARK[int((value - low) / span * (len(SPARK) - 1))] for value in values)
+
+
+def svg_chart(timeline: list[dict], width: int = 720, panel: int = 90) -> str:
+    """One line panel per series, sharing the time axis"""
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{panel * len(SERIES)}" '
+             f'font-family="sans-serif" font-size="11">']
+    t_max = max((row["t"] for row in timeline), default=1) or 1
+    for index, (key, label) in enumerate(SERIES):
+        top = index * panel
+        values = [row[key] for row in timeline]
+        v_max = max(values, default=0) or 1
+        points = " ".join(
+            f"{40 + row['t'] / t_max * (width - 50):.1f},{top + panel - 15 - row[key] / v_max * (panel - 30):.1f}"
+            for row in timeline
+        )
+        parts.append(f'<text x="40" y="{top + 12}">{label} (max {v_max})</text>')
+        parts.append(f'<line x1="40" y1="{top + panel - 15}" x2="{width - 10}" y2="{top + panel - 15}" stroke="#ccc"/>')
+        parts.append(f'<polyline fill="none" stroke="#1f77b4" stroke-width="1.5" points="{points}"/>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--rps", type=float, default=20, help="target transaction rate")
+    parser.add_argument("--concurrency", type=int, default=32, help="max requests in flight")
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--initial-balance", type=float, default=1000)
+    parser.add_argument("--mix", default="40,30,30", help="deposit,withdraw,transfer weights")
+    parser.add_argument("--check-interval", type=float, default=10, help="seconds between invariant checks")
+    parser.add_argument("--stuck-after", type=float, default=120, help="seconds before an unfinished one is stuck")
+    parser.add_argument("--drain-timeout", type=float, default=120, help="seconds to wait for the backlog at the end")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--save", help="write the timeline and results as JSON")
+    parser.add_argument("--svg", help="write a throughput/latency chart")
+    args = parser.parse_args(argv)
+    args.weights = [float(weight) for weight in args.mix.split(",")]
+    if len(args.weights) != len(TRANSACTION_TYPES):
+        parser.error("--mix needs three weights")
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=30, limits=httpx.Limits(
+            max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)) as client:
+        soak = Soak(client, args)
+        await soak.seed()
+        started = time.monotonic()
+        done = asyncio.Event()
+        monitor = asyncio.create_task(soak.monitor(started, done))
+        try:
+            await soak.load(args.minutes * 60)
+        finally:
+            done.set()
+            await monitor
+        await soak.drain()
+
+    ledger = soak.ledger
+    print()
+    for key, label in SERIES:
+        values = [row[key] for row in soak.timeline]
+        print(f"{label:>12} {sparkline(values)}  min {min(values, default=0)} max {max(values, default=0)}")
+    result = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("save", "svg")},
+        "responses": ledger.responses,
+        "completed": ledger.completed,
+        "failed": ledger.failed,
+        "unfinished": len(ledger.unfinished),
+        "violations": soak.violations,
+        "timeline": soak.timeline,
+    }
+    print(json.dumps({key: result[key] for key in ("responses", "completed", "failed", "unfinished")}))
+    print(f"{len(soak.violations)} invariant violations")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.svg:
+        with open(args.svg, "w") as f:
+            f.write(svg_chart(soak.timeline))
+    return 1 if soak.violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
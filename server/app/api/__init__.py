@@ -5,7 +5,9 @@ All FastAPI routers for banking operations
 
 from .accounts import router as accounts_router
 from .transactions import router as transactions_router
+from .stats import router as stats_router
+from .debug import router as debug_router
 
-__all__ = ["accounts_router", "transactions_router"]
+__all__ = ["accounts_router", "transactions_router", "stats_router", "debug_router"]
 
 API_VERSION = "v1"
\ No newline at end of file
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..models.database import get_db, Account
-from ..models.schemas import AccountCreate, AccountResponse
-import uuid
-from ..monitoring.metrics import accounts_counter, accounts_balance_gauge
+from ..models.schemas import AccountCreate, AccountResponse, AccountBalanceAsOf, AccountSearchPage
+from ..services.account_numbers import account_numbers
+from ..services.balances import balance_as_of
+from ..services.account_search import CONTAINS_MIN_LENGTH, InvalidCursor, QueryTooShort, search_accounts
+from ..services import bulk_import
+import os
+import tempfile
+from datetime import datetime
+from typing import Optional
+from ..monitoring.metrics import accounts_counter, account_opening_balance_histogram
 
 router = APIRouter()
 
+IMPORT_SPOOL_MAX_MEMORY = int(os.getenv("IMPORT_SPOOL_MAX_MEMORY", str(8 * 1024 * 1024)))
+
 
 @router.post("/", response_model=AccountResponse, status_code=status.HTTP_201_CREATED)
 async def create_account(
@@ -15,12 +25,13 @@ async def create_account(
         db: AsyncSession = Depends(get_db)
 ):
     """Create a new bank account"""
-    account_number = str(uuid.uuid4())[:8].upper()
+    account_number = await account_numbers.allocate(db)
 
     account = Account(
         account_number=account_number,
         owner_name=account_data.owner_name,
-        balance=account_data.initial_balance
+        balance=account_data.initial_balance,
+        opening_balance=account_data.initial_balance
     )
 
     db.add(account)
@@ -28,11 +39,66 @@ async def create_account(
     await db.refresh(account)
 
     accounts_counter.labels(action="create").inc()
-    accounts_balance_gauge.labels(account_number=account_number).set(account.balance)
+    account_opening_balance_histogram.observe(account.balance)
 
     return account
 
 
+@router.post("/import")
+async def import_accounts(
+        request: Request,
+        db: AsyncSession = Depends(get_db)
+):
+    """Bulk-create accounts from a streamed CSV or NDJSON body.
+
+    Rows are validated and loaded in chunks while the body is read; the
+    response streams one NDJSON line per row (generated account number or
+    error) and a final summary line.
+    """
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    results = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY)
+
+    try:
+        summary = await bulk_import.import_accounts(db, request.stream(), fmt, results)
+    except Exception:
+        results.close()
+        raise
+    accounts_counter.labels(action="import").inc(summary["imported"])
+
+    return StreamingResponse(
+        bulk_import.iter_results(results),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/search", response_model=AccountSearchPage)
+async def search_accounts_by_owner(
+        q: str = Query(..., min_length=1, max_length=100),
+        mode: str = Query("prefix", pattern="^(prefix|contains)$"),
+        limit: int = Query(20, ge=1, le=100),
+        after: Optional[str] = None,
+        db: AsyncSession = Depends(get_db)
+):
+    """Find accounts by owner name (case-insensitive prefix or substring).
+
+    Pass ``next_cursor`` from the response as ``after`` to get the next page.
+    """
+    try:
+        accounts, next_cursor = await search_accounts(db, q, mode, limit, after)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    except QueryTooShort:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Substring search needs at least {CONTAINS_MIN_LENGTH} characters"
+        )
+
+    return AccountSearchPage(items=accounts, next_cursor=next_cursor)
+
+
 @router.get("/{account_number}", response_model=AccountResponse)
 async def get_account(
         account_number: str,
@@ -53,6 +119,31 @@ async def get_account(
     return account
 
 
+@router.get("/{account_number}/balance", response_model=AccountBalanceAsOf)
+async def get_balance_as_of(
+        account_number: str,
+        as_of: datetime,
+        db: AsyncSession = Depends(get_db)
+):
+    """Get the account balance at a point in time"""
+    result = await db.execute(
+        select(Account).where(Account.account_number == account_number)
+    )
+    account = result.scalar_one_or_none()
+
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    return AccountBalanceAsOf(
+        account_number=account_number,
+        as_of=as_of,
+        balance=await balance_as_of(db, account, as_of)
+    )
+
+
 @router.get("/", response_model=list[AccountResponse])
 async def list_accounts(
         skip: int = 0,
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from ..monitoring.profiler import collapse, sample_stacks
+import asyncio
+import hmac
+import os
+
+# Unset disables the debug endpoints (they answer 404)
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+PROFILE_MAX_SECONDS = 60
+
+router = APIRouter()
+_profile_lock = asyncio.Lock()
+
+
+def _authorize(authorization: Optional[str]) -> None:
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), DEBUG_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid debug token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+        seconds: float = Query(5, gt=0, le=PROFILE_MAX_SECONDS),
+        authorization: Optional[str] = Header(None)
+):
+    """Sample all threads' stacks for ``seconds`` and return collapsed stacks.
+
+    The output feeds flamegraph.pl or speedscope directly. Requires
+    ``Authorization: Bearer $DEBUG_TOKEN``; one profile runs at a time.
+    """
+    _authorize(authorization)
+    if _profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    async with _profile_lock:
+        stacks = await asyncio.to_thread(sample_stacks, seconds)
+    return PlainTextResponse(collapse(stacks))
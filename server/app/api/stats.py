@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from datetime import datetime
+from typing import Optional
+from ..models.database import get_db, TransactionRollup
+from ..models.schemas import TransactionStatsBucket
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[TransactionStatsBucket])
+async def get_transaction_stats(
+        granularity: str = Query("minute", pattern="^(minute|hour)$"),
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        transaction_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = Query(1440, ge=1, le=10000),
+        db: AsyncSession = Depends(get_db)
+):
+    """Transaction volume and amount per time bucket, type and status.
+
+    Reads the rollups maintained by the consumer, so the cost depends on
+    the number of buckets, not on the number of transactions. Without
+    ``since`` the most recent buckets are returned.
+    """
+    query = select(TransactionRollup).where(TransactionRollup.granularity == granularity)
+    if since:
+        query = query.where(TransactionRollup.bucket_start >= since)
+    if until:
+        query = query.where(TransactionRollup.bucket_start < until)
+    if transaction_type:
+        query = query.where(TransactionRollup.transaction_type == transaction_type)
+    if status:
+        query = query.where(TransactionRollup.status == status)
+
+    if since:
+        query = query.order_by(TransactionRollup.bucket_start).limit(limit)
+        return (await db.execute(query)).scalars().all()
+
+    query = query.order_by(TransactionRollup.bucket_start.desc()).limit(limit)
+    return list(reversed((await db.execute(query)).scalars().all()))
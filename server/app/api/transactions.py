@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from datetime import datetime
 from ..models.database import get_db, Account, Transaction
 from ..models.schemas import TransactionCreate, TransactionResponse
 from ..services.kafka_producer import send_transaction_event
-from ..monitoring.metrics import transactions_counter, transaction_amount_gauge
+from ..services.velocity import velocity_limiter
+from ..services.export import MEDIA_TYPES, arrow_available, export_transactions
+from ..monitoring.metrics import transactions_counter, transaction_amount_histogram
+from ..monitoring.hot_accounts import hot_accounts
+from ..monitoring.request_stats import request_stage
 import asyncio
+import time
 
 router = APIRouter()
 
@@ -16,6 +23,7 @@ async def create_transaction(
         db: AsyncSession = Depends(get_db)
 ):
     """Create a new transaction (will be processed by consumer)"""
+    accepted_at = time.time()
 
     result = await db.execute(
         select(Account).where(Account.account_number == transaction_data.to_account)
@@ -52,6 +60,17 @@ async def create_transaction(
                 detail="Insufficient funds"
             )
 
+        if not await velocity_limiter.check(
+                transaction_data.from_account,
+                transaction_data.amount,
+                transaction_data.transaction_type,
+                now=accepted_at
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Velocity limit exceeded for sender account"
+            )
+
     transaction = Transaction(
         from_account=transaction_data.from_account,
         to_account=transaction_data.to_account,
@@ -60,24 +79,65 @@ async def create_transaction(
         status="PENDING"
     )
 
-    db.add(transaction)
-    await db.commit()
+    try:
+        db.add(transaction)
+        await db.commit()
+    except Exception:
+        # The debit was charged up front so the check stays atomic; it never happened
+        if transaction_data.transaction_type in ["WITHDRAW", "TRANSFER"]:
+            await velocity_limiter.refund(
+                transaction_data.from_account, transaction_data.amount, accepted_at
+            )
+        raise
+
     await db.refresh(transaction)
 
-    await send_transaction_event(transaction)
+    with request_stage("kafka"):
+        await send_transaction_event(transaction, accepted_at=accepted_at)
 
     transactions_counter.labels(
         type=transaction_data.transaction_type,
         status="pending"
     ).inc()
 
-    transaction_amount_gauge.labels(
-        transaction_id=str(transaction.id)
-    ).set(transaction_data.amount)
+    transaction_amount_histogram.labels(
+        type=transaction_data.transaction_type
+    ).observe(transaction_data.amount)
+
+    if transaction_data.from_account:
+        hot_accounts.record(transaction_data.from_account)
+    if transaction_data.to_account != transaction_data.from_account:
+        hot_accounts.record(transaction_data.to_account)
 
     return transaction
 
 
+@router.get("/export")
+async def export_transactions_range(
+        start: datetime,
+        end: datetime,
+        format: str = Query("csv", pattern="^(csv|arrow)$"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Stream transactions created in [start, end) as CSV or Arrow IPC.
+
+    Rows are fetched with a server-side cursor and written out partition by
+    partition, so memory use does not grow with the size of the range.
+    """
+    if format == "arrow" and not arrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Arrow export requires pyarrow"
+        )
+
+    filename = f"transactions_{start:%Y%m%dT%H%M%S}_{end:%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        export_transactions(db, start, end, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
         transaction_id: int,
@@ -0,0 +1,103 @@
+"""Wire format of transaction events: a compact versioned binary layout, or JSON.
+
+Binary events start with a format version byte and JSON events with ``{``,
+so consumers read both and producers can switch EVENT_FORMAT without
+draining the topic first.
+"""
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+
+from .serialization import dumps, loads
+
+# "json", or "binary" once every consumer runs a version that decodes it
+EVENT_FORMAT = os.getenv("EVENT_FORMAT", "json")
+
+FORMAT_VERSION = 1
+TRANSACTION_TYPES = ("DEPOSIT", "WITHDRAW", "TRANSFER")
+_TYPE_CODES = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+
+# version, transaction type code, flags, transaction_id, amount,
+# created_at in microseconds since the epoch (UTC); then to_account and
+# from_account (when flagged), each a length byte and UTF-8 bytes
+_V1 = struct.Struct("<BBBqdq")
+_HAS_FROM_ACCOUNT = 1
+_HAS_CREATED_AT = 2
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode()
+    if len(data) > 255:
+        raise ValueError(f"Value too long for the binary event format: {value!r}")
+    return bytes((len(data),)) + data
+
+
+def _unpack_str(raw: bytes, offset: int) -> tuple[str, int]:
+    end = offset + 1 + raw[offset]
+    if end > len(raw):
+        raise ValueError("Truncated string field")
+    return raw[offset + 1:end].decode(), end
+
+
+def _encode_v1(event: dict) -> bytes:
+    type_code = _TYPE_CODES.get(event["transaction_type"])
+    if type_code is None:
+        raise ValueError(f"Unknown transaction type: {event['transaction_type']}")
+    flags = 0
+    created_at = 0
+    if event.get("from_account") is not None:
+        flags |= _HAS_FROM_ACCOUNT
+    if event.get("created_at"):
+        flags |= _HAS_CREATED_AT
+        moment = datetime.fromisoformat(event["created_at"])
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        created_at = (moment - _EPOCH) // _MICROSECOND
+    parts = [
+        _V1.pack(FORMAT_VERSION, type_code, flags, event["transaction_id"], event["amount"], created_at),
+        _pack_str(event["to_account"]),
+    ]
+    if flags & _HAS_FROM_ACCOUNT:
+        parts.append(_pack_str(event["from_account"]))
+    return b"".join(parts)
+
+
+def _decode_v1(raw: bytes) -> dict:
+    _, type_code, flags, transaction_id, amount, created_at = _V1.unpack_from(raw)
+    to_account, offset = _unpack_str(raw, _V1.size)
+    from_account = _unpack_str(raw, offset)[0] if flags & _HAS_FROM_ACCOUNT else None
+    return {
+        "transaction_id": transaction_id,
+        "from_account": from_account,
+        "to_account": to_account,
+        "amount": amount,
+        "transaction_type": TRANSACTION_TYPES[type_code],
+        "created_at": (_EPOCH + created_at * _MICROSECOND).isoformat() if flags & _HAS_CREATED_AT else None,
+    }
+
+
+_DECODERS = {FORMAT_VERSION: _decode_v1}
+
+
+def encode_event(event: dict, fmt: str = EVENT_FORMAT) -> bytes:
+    """Serialize a transaction event dict in ``fmt`` ("json" or "binary")"""
+    if fmt == "json":
+        return dumps(event)
+    if fmt == "binary":
+        return _encode_v1(event)
+    raise ValueError(f"Unknown EVENT_FORMAT: {fmt}")
+
+
+def decode_event(raw: bytes) -> dict:
+    """Parse an event in any format this version knows; raises ValueError otherwise"""
+    if raw[:1] == b"{":
+        return loads(raw)
+    decoder = _DECODERS.get(raw[0]) if raw else None
+    if decoder is None:
+        raise ValueError(f"Unsupported event format version: {raw[:1]!r}")
+    try:
+        return decoder(raw)
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Truncated or corrupt event: {e}") from e
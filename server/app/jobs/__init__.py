@@ -0,0 +1,9 @@
+"""
+Batch Jobs Package
+Offline jobs run with python -m app.jobs.<name>
+"""
+
+from .reconciliation import reconcile_balances, ReconciliationReport
+from .statements import generate_statements
+
+__all__ = ["reconcile_balances", "ReconciliationReport", "generate_statements"]
\ No newline at end of file
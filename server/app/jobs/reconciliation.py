@@ -0,0 +1,191 @@
+"""Balance reconciliation: accounts.balance vs. opening balance plus COMPLETED transactions.
+
+Run with ``python -m app.jobs.reconciliation [--output drift.json]``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+
+import numpy as np
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..models.database import AsyncSessionLocal, Account, Transaction
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_CHUNK_SIZE = int(os.getenv("RECONCILE_CHUNK_SIZE", "200000"))
+RECONCILE_TOLERANCE = float(os.getenv("RECONCILE_TOLERANCE", "0.005"))
+RECONCILE_MAX_REPORTED = int(os.getenv("RECONCILE_MAX_REPORTED", "10000"))
+
+DEPOSIT, WITHDRAW, TRANSFER = 0, 1, 2
+
+
+@dataclass
+class AccountDrift:
+    account_number: str
+    balance: float
+    expected: float
+    drift: float
+
+
+@dataclass
+class ReconciliationReport:
+    accounts: int = 0
+    transactions: int = 0
+    orphaned_transactions: int = 0
+    drifted_accounts: int = 0
+    seconds: float = 0.0
+    drifts: list[AccountDrift] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _as_matrix(rows, columns: int) -> np.ndarray:
+    flat = np.fromiter(
+        itertools.chain.from_iterable(rows), dtype=np.float64, count=len(rows) * columns
+    )
+    return flat.reshape(len(rows), columns)
+
+
+def _accumulate(expected: np.ndarray, ids: np.ndarray, amounts: np.ndarray) -> None:
+    """expected[ids] += amounts, grouping repeated ids first"""
+    if ids.size == 0:
+        return
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    expected[unique_ids] += np.bincount(inverse, weights=amounts)
+
+
+def apply_transactions(expected: np.ndarray, chunk: np.ndarray) -> int:
+    """Apply a chunk of (to_id, from_id, amount, type_code) rows; returns orphan count.
+
+    Ids are -1 when the account does not exist (or was created after the
+    reconciliation started).
+    """
+    to_ids = chunk[:, 0].astype(np.int64)
+    from_ids = chunk[:, 1].astype(np.int64)
+    amounts = chunk[:, 2]
+    kinds = chunk[:, 3]
+
+    credits = kinds != WITHDRAW
+    debits = kinds != DEPOSIT
+    credit_ok = credits & (to_ids >= 0)
+    debit_ok = debits & (from_ids >= 0)
+
+    _accumulate(expected, to_ids[credit_ok], amounts[credit_ok])
+    _accumulate(expected, from_ids[debit_ok], -amounts[debit_ok])
+    return int(np.count_nonzero((credits & ~credit_ok) | (debits & ~debit_ok)))
+
+
+async def reconcile_balances(
+        db: AsyncSession,
+        chunk_size: int = RECONCILE_CHUNK_SIZE,
+        tolerance: float = RECONCILE_TOLERANCE,
+        max_reported: int = RECONCILE_MAX_REPORTED,
+) -> ReconciliationReport:
+    """Compare every account balance with opening balance + COMPLETED transactions.
+
+    Transactions are streamed through a server-side cursor in chunks of
+    ``chunk_size`` rows; account numbers are resolved to integer account ids
+    by the database, so memory is one float64 per account id plus one chunk.
+    """
+    started = time.perf_counter()
+    report = ReconciliationReport()
+
+    if db.bind.dialect.name == "postgresql":
+        # One snapshot for both passes, so in-flight transactions don't show up as drift.
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    max_id = await db.scalar(select(func.max(Account.id))) or 0
+    expected = np.zeros(max_id + 1, dtype=np.float64)
+
+    to_acc = aliased(Account)
+    from_acc = aliased(Account)
+    type_code = case(
+        (Transaction.transaction_type == "DEPOSIT", DEPOSIT),
+        (Transaction.transaction_type == "WITHDRAW", WITHDRAW),
+        else_=TRANSFER,
+    )
+    transactions = await db.stream(
+        select(
+            func.coalesce(to_acc.id, -1),
+            func.coalesce(from_acc.id, -1),
+            Transaction.amount,
+            type_code,
+        )
+        .outerjoin(to_acc, (to_acc.account_number == Transaction.to_account) & (to_acc.id <= max_id))
+        .outerjoin(from_acc, (from_acc.account_number == Transaction.from_account) & (from_acc.id <= max_id))
+        .where(Transaction.status == "COMPLETED")
+        .execution_options(yield_per=chunk_size)
+    )
+    async for rows in transactions.partitions():
+        report.transactions += len(rows)
+        report.orphaned_transactions += apply_transactions(expected, _as_matrix(rows, 4))
+
+    accounts = await db.stream(
+        select(
+            Account.id,
+            Account.account_number,
+            Account.balance,
+            func.coalesce(Account.opening_balance, 0.0),
+        )
+        .where(Account.id <= max_id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for rows in accounts.partitions():
+        ids, numbers, balances, openings = zip(*rows)
+        ids = np.array(ids, dtype=np.int64)
+        balances = np.array(balances, dtype=np.float64)
+        should_be = np.array(openings, dtype=np.float64) + expected[ids]
+        drift = balances - should_be
+
+        report.accounts += len(rows)
+        for i in np.flatnonzero(np.abs(drift) > tolerance):
+            report.drifted_accounts += 1
+            if len(report.drifts) < max_reported:
+                report.drifts.append(AccountDrift(
+                    account_number=numbers[i],
+                    balance=float(balances[i]),
+                    expected=round(float(should_be[i]), 2),
+                    drift=round(float(drift[i]), 2),
+                ))
+
+    await db.rollback()
+    report.seconds = round(time.perf_counter() - started, 3)
+    logger.info(
+        "Reconciled %d accounts against %d transactions in %.1fs: %d drifted",
+        report.accounts, report.transactions, report.seconds, report.drifted_accounts
+    )
+    return report
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile account balances against completed transactions")
+    parser.add_argument("--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE)
+    parser.add_argument("--tolerance", type=float, default=RECONCILE_TOLERANCE)
+    parser.add_argument("--output", help="write the drift report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    async with AsyncSessionLocal() as db:
+        report = await reconcile_balances(db, args.chunk_size, args.tolerance)
+
+    payload = json.dumps(report.to_dict(), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 1 if report.drifted_accounts else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
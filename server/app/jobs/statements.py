@@ -0,0 +1,219 @@
+"""Per-account statements for a period, rendered to files by a process pool.
+
+Run with ``python -m app.jobs.statements --start 2024-01-01 --end 2024-02-01 --out statements/``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import AsyncSessionLocal, Transaction
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_CHUNK_SIZE = int(os.getenv("STATEMENT_CHUNK_SIZE", "50000"))
+STATEMENT_BATCH_ACCOUNTS = int(os.getenv("STATEMENT_BATCH_ACCOUNTS", "500"))
+STATEMENT_WORKERS = int(os.getenv("STATEMENT_WORKERS", str(os.cpu_count() or 1)))
+CHECKPOINT_FILE = ".checkpoint"
+
+
+def statement_legs(start: datetime, end: datetime, after: str | None = None):
+    """Completed transactions in [start, end) as signed per-account legs, clustered by account"""
+    period = (
+        (Transaction.status == "COMPLETED")
+        & (Transaction.processed_at >= start)
+        & (Transaction.processed_at < end)
+    )
+    credits = select(
+        Transaction.to_account.label("account"),
+        Transaction.id,
+        Transaction.processed_at,
+        Transaction.transaction_type,
+        Transaction.from_account.label("counterparty"),
+        Transaction.amount.label("amount"),
+    ).where(period, Transaction.transaction_type != "WITHDRAW")
+    debits = select(
+        Transaction.from_account.label("account"),
+        Transaction.id,
+        Transaction.processed_at,
+        Transaction.transaction_type,
+        Transaction.to_account.label("counterparty"),
+        (-Transaction.amount).label("amount"),
+    ).where(period, Transaction.transaction_type != "DEPOSIT", Transaction.from_account.isnot(None))
+    if after is not None:
+        credits = credits.where(Transaction.to_account > after)
+        debits = debits.where(Transaction.from_account > after)
+
+    legs = union_all(credits, debits).subquery()
+    return select(
+        legs.c.account, legs.c.id, legs.c.processed_at,
+        legs.c.transaction_type, legs.c.counterparty, legs.c.amount,
+    ).order_by(legs.c.account, legs.c.processed_at, legs.c.id)
+
+
+def render_statement(account: str, period: str, rows: list[tuple]) -> str:
+    lines = [
+        f"Statement for account {account}",
+        f"Period: {period}",
+        "",
+        "date,transaction_id,type,counterparty,amount",
+    ]
+    credits = debits = 0.0
+    for tx_id, processed_at, tx_type, counterparty, amount in rows:
+        if amount >= 0:
+            credits += amount
+        else:
+            debits -= amount
+        lines.append(f"{processed_at.isoformat()},{tx_id},{tx_type},{counterparty or ''},{amount:.2f}")
+    lines += [
+        "",
+        f"Credits: {credits:.2f}",
+        f"Debits: {debits:.2f}",
+        f"Net: {credits - debits:.2f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_statements(out_dir: str, period: str, batch: list[tuple[str, list[tuple]]]) -> int:
+    """Render and write one batch of accounts; runs inside a pool worker"""
+    for account, rows in batch:
+        path = os.path.join(out_dir, f"{account}.txt")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_statement(account, period, rows))
+        os.replace(tmp_path, path)
+    return len(batch)
+
+
+def _read_checkpoint(out_dir: str, period: str) -> str | None:
+    try:
+        with open(os.path.join(out_dir, CHECKPOINT_FILE), encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+    return checkpoint["last_account"] if checkpoint.get("period") == period else None
+
+
+def _write_checkpoint(out_dir: str, period: str, last_account: str) -> None:
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"period": period, "last_account": last_account}, f)
+    os.replace(path + ".tmp", path)
+
+
+async def generate_statements(
+        db: AsyncSession,
+        start: date,
+        end: date,
+        out_dir: str,
+        workers: int = STATEMENT_WORKERS,
+        batch_accounts: int = STATEMENT_BATCH_ACCOUNTS,
+        chunk_size: int = STATEMENT_CHUNK_SIZE,
+) -> dict:
+    """Write one statement file per account with completed transactions in [start, end).
+
+    Transactions are read with a single account-ordered streaming query;
+    batches of accounts are rendered and written by a process pool
+    (``workers=0`` renders in-process). A checkpoint with the last fully
+    written account is kept in ``out_dir`` so an interrupted run resumes
+    where it stopped.
+    """
+    period = f"{start.isoformat()}..{end.isoformat()}"
+    os.makedirs(out_dir, exist_ok=True)
+    after = _read_checkpoint(out_dir, period)
+    if after is not None:
+        logger.info("Resuming statements for %s after account %s", period, after)
+
+    started = time.perf_counter()
+    accounts = transactions = 0
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    in_flight = deque()
+    max_in_flight = max(workers, 1) * 2
+
+    async def complete_oldest() -> None:
+        nonlocal accounts
+        future, last_account = in_flight.popleft()
+        accounts += await future
+        _write_checkpoint(out_dir, period, last_account)
+        elapsed = time.perf_counter() - started
+        logger.info("Statements: %d accounts (%.0f accounts/s)", accounts, accounts / elapsed)
+
+    async def dispatch(batch: list) -> None:
+        if pool is None:
+            future = loop.create_future()
+            future.set_result(write_statements(out_dir, period, batch))
+        else:
+            future = loop.run_in_executor(pool, write_statements, out_dir, period, batch)
+        in_flight.append((future, batch[-1][0]))
+        while len(in_flight) >= max_in_flight:
+            await complete_oldest()
+
+    try:
+        result = await db.stream(
+            statement_legs(datetime.combine(start, datetime.min.time()),
+                           datetime.combine(end, datetime.min.time()), after)
+            .execution_options(yield_per=chunk_size)
+        )
+        batch = []
+        current, rows = None, []
+        async for partition in result.partitions():
+            for account, *leg in partition:
+                transactions += 1
+                if account != current:
+                    if rows:
+                        batch.append((current, rows))
+                        if len(batch) >= batch_accounts:
+                            await dispatch(batch)
+                            batch = []
+                    current, rows = account, []
+                rows.append(tuple(leg))
+        if rows:
+            batch.append((current, rows))
+        if batch:
+            await dispatch(batch)
+        while in_flight:
+            await complete_oldest()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "period": period,
+        "accounts": accounts,
+        "transactions": transactions,
+        "seconds": round(elapsed, 3),
+        "accounts_per_sec": round(accounts / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate per-account statements for a period")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first day (inclusive)")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="last day (exclusive)")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--workers", type=int, default=STATEMENT_WORKERS)
+    parser.add_argument("--batch-accounts", type=int, default=STATEMENT_BATCH_ACCOUNTS)
+    args = parser.parse_args(argv)
+
+    async with AsyncSessionLocal() as db:
+        summary = await generate_statements(
+            db, args.start, args.end, args.out, args.workers, args.batch_accounts
+        )
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
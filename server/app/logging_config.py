@@ -0,0 +1,134 @@
+"""Non-blocking logging: records are queued by the caller and written by a listener thread."""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# "json" (one object per line) or "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Comma-separated logger=rate pairs, e.g. "app.services.kafka_producer=0.01";
+# a logger's INFO and DEBUG records are kept at that rate, warnings always.
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; ``extra`` fields become top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_sampling(spec: str) -> dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fixed share of each configured logger's records below WARNING.
+
+    Sampling is deterministic (every 1/rate-th record is kept), so a burst of
+    identical lines is thinned evenly. A logger inherits the rate of its
+    closest configured parent.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: dict[str, float | None] = {}
+        self._credit: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float | None:
+        if name not in self._resolved:
+            rate, candidate = None, name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None:
+            return True
+        if not rate:
+            return False
+        credit = self._credit.get(record.name, 1.0 - rate) + rate
+        if credit >= 1.0:
+            self._credit[record.name] = credit - 1.0
+            return True
+        self._credit[record.name] = credit
+        return False
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues the rendered message and traceback text, leaving the record's
+    other fields (``extra`` included) for the listener's formatter."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+        level: str = LOG_LEVEL,
+        fmt: str = LOG_FORMAT,
+        sampling: str = LOG_SAMPLING,
+        stream=None,
+) -> logging.handlers.QueueListener:
+    """Replace the root handlers with a queue; returns the started listener.
+
+    The calling thread only filters the record and formats its message
+    before enqueueing it. JSON encoding and the write happen on the
+    listener's thread, so a slow stream never blocks the event loop.
+    """
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
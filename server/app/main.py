@@ -1,31 +1,48 @@
 from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
+from .logging_config import setup_logging
+from .serialization import FastJSONResponse
 from .models.database import init_db
-from .api import accounts, transactions
+from .api import accounts, transactions, stats, debug
 from .monitoring.metrics import metrics_endpoint, PrometheusMiddleware
+from .monitoring.load import load_monitor
+from .monitoring.request_stats import RequestStatsMiddleware
+from .middleware.rate_limit import RateLimitMiddleware
+from .services.sweeper import SWEEPER_ENABLED, run_sweeper
+import asyncio
 import logging
 
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Initializing database...")
     await init_db()
+    tasks = [asyncio.create_task(load_monitor.run())]
+    if SWEEPER_ENABLED:
+        tasks.append(asyncio.create_task(run_sweeper()))
     logger.info("Server started successfully")
     yield
     logger.info("Shutting down...")
+    for task in tasks:
+        task.cancel()
 
-app = FastAPI(title="Bank API", lifespan=lifespan)
+app = FastAPI(title="Bank API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
+# Added first so they run inside PrometheusMiddleware and rejections are counted.
+app.add_middleware(RequestStatsMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(PrometheusMiddleware)
 
 app.include_router(accounts.router, prefix="/accounts", tags=["accounts"])
 app.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"], include_in_schema=False)
 
 @app.get("/metrics")
 async def metrics(request: Request):
-    return metrics_endpoint(request)
+    return await metrics_endpoint(request)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,8 @@
+"""
+Middleware Package
+ASGI middleware protecting the API under load
+"""
+
+from .rate_limit import RateLimitMiddleware, TokenBucket
+
+__all__ = ["RateLimitMiddleware", "TokenBucket"]
\ No newline at end of file
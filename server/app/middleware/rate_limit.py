@@ -0,0 +1,139 @@
+"""Token-bucket rate limiting per client and route, plus load shedding."""
+import math
+import os
+import time
+from collections import OrderedDict
+
+from fastapi.responses import JSONResponse
+
+from ..monitoring.load import LoadMonitor, load_monitor
+from ..monitoring.metrics import rejected_requests_counter
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_CLIENT_RATE = float(os.getenv("RATE_LIMIT_CLIENT_RATE", "100"))
+RATE_LIMIT_CLIENT_BURST = float(os.getenv("RATE_LIMIT_CLIENT_BURST", "200"))
+# "METHOD /prefix=rate:burst" entries, comma separated; applied per client
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "POST /transactions=20:40,POST /accounts=10:20")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+SHED_LOOP_LAG_SECONDS = float(os.getenv("SHED_LOOP_LAG_SECONDS", "0.5"))
+SHED_POOL_WAIT_SECONDS = float(os.getenv("SHED_POOL_WAIT_SECONDS", "1.0"))
+
+EXEMPT_PATHS = ("/health", "/metrics")
+
+
+def parse_route_limits(spec: str) -> dict[tuple[str, str], tuple[float, float]]:
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, limit = entry.partition("=")
+        method, _, prefix = route.strip().partition(" ")
+        rate, _, burst = limit.partition(":")
+        limits[(method.upper(), prefix.strip().rstrip("/"))] = (float(rate), float(burst or rate))
+    return limits
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, rate: float, burst: float, now: float) -> float:
+        """Take a token; return 0 on success, else seconds until one is available"""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class RateLimitMiddleware:
+    """Rejects with 429 when a client's bucket is empty and 503 when overloaded.
+
+    Every client has one bucket for all requests plus one per configured
+    route prefix; each check is a dict lookup and a little arithmetic.
+    Buckets live in an LRU capped at ``max_clients`` entries. Before the
+    buckets are consulted, requests are shed with 503 while the event loop
+    lag or the DB pool wait is above its threshold.
+    """
+
+    def __init__(
+            self,
+            app,
+            enabled: bool = RATE_LIMIT_ENABLED,
+            client_rate: float = RATE_LIMIT_CLIENT_RATE,
+            client_burst: float = RATE_LIMIT_CLIENT_BURST,
+            route_limits: dict | None = None,
+            max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+            monitor: LoadMonitor = load_monitor,
+            max_loop_lag: float = SHED_LOOP_LAG_SECONDS,
+            max_pool_wait: float = SHED_POOL_WAIT_SECONDS,
+            trust_forwarded: bool = RATE_LIMIT_TRUST_FORWARDED,
+    ):
+        self.app = app
+        self.enabled = enabled
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.route_limits = parse_route_limits(RATE_LIMIT_ROUTES) if route_limits is None else route_limits
+        self.max_clients = max_clients
+        self.monitor = monitor
+        self.max_loop_lag = max_loop_lag
+        self.max_pool_wait = max_pool_wait
+        self.trust_forwarded = trust_forwarded
+        self._buckets: OrderedDict[tuple, TokenBucket] = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.enabled or scope['path'] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if self.monitor.loop_lag > self.max_loop_lag or self.monitor.pool_wait > self.max_pool_wait:
+            await self._reject(scope, receive, send, 503, "overloaded", "Server overloaded", 1.0)
+            return
+
+        now = time.monotonic()
+        client = self._client_key(scope)
+        retry_after = self._take((client,), self.client_rate, self.client_burst, now)
+        reason = "client"
+        if not retry_after:
+            route = (scope['method'], "/" + scope['path'].lstrip("/").split("/", 1)[0])
+            limit = self.route_limits.get(route)
+            if limit:
+                retry_after = self._take((client, route), limit[0], limit[1], now)
+                reason = "route"
+
+        if retry_after:
+            await self._reject(scope, receive, send, 429, reason, "Rate limit exceeded", retry_after)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _take(self, key: tuple, rate: float, burst: float, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(rate, burst, now)
+
+    def _client_key(self, scope) -> str:
+        if self.trust_forwarded:
+            for name, value in scope.get('headers', ()):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",", 1)[0].strip()
+        client = scope.get('client')
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def _reject(scope, receive, send, status_code: int, reason: str, detail: str, retry_after: float):
+        rejected_requests_counter.labels(reason=reason).inc()
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
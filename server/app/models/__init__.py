@@ -7,6 +7,9 @@ from .database import (
     Base,
     Account,
     Transaction,
+    TransactionRollup,
+    AccountNumberBlock,
+    account_number_seq,
     engine,
     AsyncSessionLocal,
     get_db,
@@ -17,6 +20,9 @@ __all__ = [
     "Base",
     "Account",
     "Transaction",
+    "TransactionRollup",
+    "AccountNumberBlock",
+    "account_number_seq",
     "engine",
     "AsyncSessionLocal",
     "get_db",
@@ -25,5 +31,7 @@ __all__ = [
 
 MODELS = {
     "Account": "Bank account with balance and owner information",
-    "Transaction": "Financial transaction between accounts"
+    "Transaction": "Financial transaction between accounts",
+    "TransactionRollup": "Per-minute/hour transaction totals by type and status",
+    "AccountNumberBlock": "Hi/lo counter for account number blocks"
 }
\ No newline at end of file
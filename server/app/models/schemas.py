@@ -37,4 +37,27 @@ class TransactionResponse(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TransactionStatsBucket(BaseModel):
+    granularity: str
+    bucket_start: datetime
+    transaction_type: str
+    status: str
+    count: int
+    amount: float
+
+    class Config:
+        from_attributes = True
+
+
+class AccountBalanceAsOf(BaseModel):
+    account_number: str
+    as_of: datetime
+    balance: float
+
+
+class AccountSearchPage(BaseModel):
+    items: list[AccountResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
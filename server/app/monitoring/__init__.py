@@ -9,11 +9,24 @@ from .metrics import (
     request_duration,
     accounts_counter,
     transactions_counter,
-    accounts_balance_gauge,
-    transaction_amount_gauge,
+    account_opening_balance_histogram,
+    transaction_amount_histogram,
+    stuck_transactions_gauge,
+    swept_transactions_counter,
+    velocity_rejections_counter,
+    rejected_requests_counter,
+    db_queries_histogram,
+    db_time_histogram,
+    query_budget_exceeded_counter,
+    pipeline_latency_histogram,
+    event_loop_lag_histogram,
     metrics_endpoint,
+    metrics_cache,
     PrometheusMiddleware
 )
+from .hot_accounts import HotAccounts, hot_accounts
+from .request_stats import RequestStatsMiddleware, request_stage
+from .profiler import sample_stacks, collapse
 
 __all__ = [
     "init_metrics",
@@ -21,10 +34,26 @@ __all__ = [
     "request_duration",
     "accounts_counter",
     "transactions_counter",
-    "accounts_balance_gauge",
-    "transaction_amount_gauge",
+    "account_opening_balance_histogram",
+    "transaction_amount_histogram",
+    "stuck_transactions_gauge",
+    "swept_transactions_counter",
+    "velocity_rejections_counter",
+    "rejected_requests_counter",
+    "db_queries_histogram",
+    "db_time_histogram",
+    "query_budget_exceeded_counter",
+    "pipeline_latency_histogram",
+    "event_loop_lag_histogram",
     "metrics_endpoint",
-    "PrometheusMiddleware"
+    "metrics_cache",
+    "PrometheusMiddleware",
+    "HotAccounts",
+    "hot_accounts",
+    "RequestStatsMiddleware",
+    "request_stage",
+    "sample_stacks",
+    "collapse"
 ]
 
 METRICS_PREFIX = "bank_"
@@ -0,0 +1,63 @@
+"""Bounded top-K of the accounts with the most transactions, exported as a gauge."""
+import os
+import threading
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+# 0 disables the collector
+HOT_ACCOUNTS_TOP_K = int(os.getenv("HOT_ACCOUNTS_TOP_K", "0"))
+# Counters tracked per reported account; more counters, better estimates.
+HOT_ACCOUNTS_CAPACITY_FACTOR = 4
+
+
+class HotAccounts:
+    """Space-saving heavy hitters: at most ``capacity`` counters, top ``k`` exported.
+
+    When an untracked account arrives while all counters are in use, the
+    account with the smallest count is evicted and the newcomer inherits
+    that count (recorded as its maximum overcount). Memory and the number
+    of exported series stay fixed however many accounts are active.
+    """
+
+    def __init__(self, k: int = HOT_ACCOUNTS_TOP_K, capacity: int | None = None):
+        self.k = k
+        self.capacity = capacity or k * HOT_ACCOUNTS_CAPACITY_FACTOR
+        self._counts: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, account_number: str) -> None:
+        if not self.k:
+            return
+        with self._lock:
+            entry = self._counts.get(account_number)
+            if entry is not None:
+                entry[0] += 1
+            elif len(self._counts) < self.capacity:
+                self._counts[account_number] = [1, 0]
+            else:
+                victim = min(self._counts, key=lambda account: self._counts[account][0])
+                floor = self._counts.pop(victim)[0]
+                self._counts[account_number] = [floor + 1, floor]
+
+    def top(self) -> list[tuple[str, int, int]]:
+        """(account_number, estimated count, max overcount), highest count first"""
+        with self._lock:
+            items = [(account, count, error) for account, (count, error) in self._counts.items()]
+        items.sort(key=lambda item: item[1], reverse=True)
+        return items[:self.k]
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            'bank_hot_account_transactions',
+            'Estimated transactions of the busiest accounts (space-saving top-K)',
+            labels=['account_number']
+        )
+        for account_number, count, _ in self.top():
+            gauge.add_metric([account_number], count)
+        yield gauge
+
+
+hot_accounts = HotAccounts()
+if hot_accounts.k:
+    REGISTRY.register(hot_accounts)
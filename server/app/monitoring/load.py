@@ -0,0 +1,70 @@
+"""Load signals used for shedding: event-loop lag and DB pool wait."""
+import asyncio
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .metrics import event_loop_lag_histogram
+
+LOAD_SAMPLE_INTERVAL = float(os.getenv("LOAD_SAMPLE_INTERVAL_SECONDS", "0.1"))
+POOL_WAIT_SMOOTHING = 0.2
+
+
+class LoadMonitor:
+    """Keeps the latest event-loop lag and a decaying average of pool wait.
+
+    ``run`` is a background task: every interval it measures how late its
+    own sleep woke up (loop lag) and decays the pool wait average, so the
+    signal recovers even when shedding keeps requests away from the pool.
+    Every lag sample also goes into ``bank_event_loop_lag_seconds``.
+    """
+
+    def __init__(self, interval: float = LOAD_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.loop_lag = 0.0
+        self.pool_wait = 0.0
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        self.pool_wait += POOL_WAIT_SMOOTHING * (seconds - self.pool_wait)
+
+    def sample_lag(self, lag: float) -> None:
+        self.loop_lag = lag
+        event_loop_lag_histogram.observe(lag)
+        self.pool_wait *= 1 - POOL_WAIT_SMOOTHING
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.sample_lag(max(0.0, loop.time() - started - self.interval))
+
+
+load_monitor = LoadMonitor()
+
+
+# Pool wait is measured from the first statement or flush of a session
+# transaction to the moment it got a connection; sessions that never touch
+# the database never check one out.
+@event.listens_for(Session, "do_orm_execute")
+def _before_execute(orm_execute_state):
+    orm_execute_state.session.info.setdefault("pool_requested", time.perf_counter())
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session, flush_context, instances):
+    session.info.setdefault("pool_requested", time.perf_counter())
+
+
+@event.listens_for(Session, "after_begin")
+def _after_begin(session, transaction, connection):
+    started = session.info.pop("pool_requested", None)
+    if started is not None:
+        load_monitor.observe_pool_wait(time.perf_counter() - started)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    session.info.pop("pool_requested", None)
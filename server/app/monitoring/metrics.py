@@ -1,9 +1,15 @@
 from prometheus_client import Counter, Gauge, Histogram, generate_latest, REGISTRY
+from prometheus_client.exposition import choose_encoder
 from fastapi import Response
 from fastapi.routing import APIRoute
+import asyncio
+import gzip
+import os
 import time
 from typing import Callable
 from fastapi import Request
+from . import multiprocess
+from .hot_accounts import hot_accounts
 
 requests_counter = Counter(
     'http_requests_total',
@@ -29,16 +35,45 @@ transactions_counter = Counter(
     ['type', 'status']
 )
 
-accounts_balance_gauge = Gauge(
-    'bank_account_balance',
-    'Account balance',
-    ['account_number']
+# Money-sized buckets, from cents to millions
+AMOUNT_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 1000000, float('inf'))
+
+account_opening_balance_histogram = Histogram(
+    'bank_account_opening_balance',
+    'Initial balance of created accounts',
+    buckets=AMOUNT_BUCKETS
 )
 
-transaction_amount_gauge = Gauge(
+transaction_amount_histogram = Histogram(
     'bank_transaction_amount',
-    'Transaction amount',
-    ['transaction_id']
+    'Amount of created transactions',
+    ['type'],
+    buckets=AMOUNT_BUCKETS
+)
+
+stuck_transactions_gauge = Gauge(
+    'bank_stuck_transactions',
+    'Transactions stuck in a non-terminal status',
+    ['status'],
+    multiprocess_mode='livemax'
+)
+
+swept_transactions_counter = Counter(
+    'bank_swept_transactions_total',
+    'Stuck transactions handled by the sweeper',
+    ['action']
+)
+
+rejected_requests_counter = Counter(
+    'http_rejected_requests_total',
+    'Requests rejected by rate limiting or load shedding',
+    ['reason']
+)
+
+velocity_rejections_counter = Counter(
+    'bank_velocity_rejections_total',
+    'Transactions rejected by per-account velocity limits',
+    ['type']
 )
 
 
@@ -47,23 +82,94 @@ def init_metrics():
     pass
 
 
+db_queries_histogram = Histogram(
+    'http_request_db_queries',
+    'Database queries per request',
+    ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float('inf'))
+)
+
+db_time_histogram = Histogram(
+    'http_request_db_seconds',
+    'Time spent in database queries per request',
+    ['endpoint']
+)
+
+query_budget_exceeded_counter = Counter(
+    'http_request_query_budget_exceeded_total',
+    'Requests that ran more queries than QUERY_BUDGET',
+    ['endpoint']
+)
+
+# Shared with the consumer, which reports the queue, process and total stages
+PIPELINE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float('inf'))
+
+event_loop_lag_histogram = Histogram(
+    'bank_event_loop_lag_seconds',
+    'How late a scheduled event-loop wakeup ran (time the loop was blocked)',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, float('inf'))
+)
+
+pipeline_latency_histogram = Histogram(
+    'bank_transaction_pipeline_seconds',
+    'Transaction pipeline stage latency (persist: accepted to handed to Kafka, publish: broker ack)',
+    ['stage'],
+    buckets=PIPELINE_BUCKETS
+)
+
+UNMATCHED_ENDPOINT = "other"
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+_endpoint_paths = {}
+
+
+def route_template(scope) -> str:
+    """Template of the route that handled the request, or ``other``"""
+    route = scope.get('route')
+    if route is not None:
+        return route.path_format
+    # Plain Starlette routes (docs, openapi.json) only leave the endpoint behind.
+    endpoint = scope.get('endpoint')
+    if endpoint is None:
+        return UNMATCHED_ENDPOINT
+    path = _endpoint_paths.get(endpoint)
+    if path is None:
+        router = scope.get('router')
+        path = next(
+            (r.path_format for r in getattr(router, 'routes', ()) if getattr(r, 'endpoint', None) is endpoint),
+            UNMATCHED_ENDPOINT
+        )
+        _endpoint_paths[endpoint] = path
+    return path
+
+
 class PrometheusMiddleware:
+    """Counts requests and durations per method, route template and status.
+
+    The endpoint label is the matched route's template (``/accounts/{account_number}``),
+    never the raw path, so the number of series is bounded by the number of
+    routes. Requests that match no route (404s, slash redirects) share the
+    ``other`` label, and unknown methods are folded the same way.
+    """
+
     def __init__(self, app):
         self.app = app
 
+    def _endpoint_label(self, scope) -> str:
+        return route_template(scope)
+
     async def __call__(self, scope, receive, send):
         if scope['type'] != 'http':
             await self.app(scope, receive, send)
             return
 
-        start_time = time.time()
-        method = scope['method']
-        endpoint = scope['path']
+        start_time = time.perf_counter()
+        method = scope['method'] if scope['method'] in KNOWN_METHODS else UNMATCHED_ENDPOINT
 
         async def send_wrapper(response):
             if response['type'] == 'http.response.start':
                 status_code = response['status']
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
+                endpoint = self._endpoint_label(scope)
 
                 requests_counter.labels(
                     method=method,
@@ -81,6 +187,62 @@ class PrometheusMiddleware:
         await self.app(scope, receive, send_wrapper)
 
 
-def metrics_endpoint(request: Request) -> Response:
+METRICS_CACHE_SECONDS = float(os.getenv("METRICS_CACHE_SECONDS", "1.0"))
+METRICS_GZIP_LEVEL = 6
+
+
+def render_metrics(encoder=generate_latest) -> bytes:
+    if multiprocess.PROMETHEUS_MULTIPROC_DIR:
+        # Hot accounts stay per process: the sample seen by the worker serving the scrape.
+        return multiprocess.collect_latest(
+            collectors=[hot_accounts] if hot_accounts.k else [], encoder=encoder
+        )
+    return encoder(REGISTRY)
+
+
+class MetricsCache:
+    """Rendered exposition per content type, reused for ``ttl`` seconds.
+
+    Rendering and compression run in a worker thread, and concurrent scrapes
+    of an expired entry wait for a single render instead of each starting
+    their own. The gzip body is produced once per rendered entry, on demand.
+    """
+
+    def __init__(self, ttl: float = METRICS_CACHE_SECONDS):
+        self.ttl = ttl
+        self._entries: dict[str, list] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, encoder, content_type: str, compress: bool) -> bytes:
+        entry = self._entries.get(content_type)
+        if self._expired(entry):
+            async with self._lock:
+                entry = self._entries.get(content_type)
+                if self._expired(entry):
+                    body = await asyncio.to_thread(render_metrics, encoder)
+                    entry = self._entries[content_type] = [time.monotonic(), body, None]
+        if not compress:
+            return entry[1]
+        if entry[2] is None:
+            entry[2] = await asyncio.to_thread(gzip.compress, entry[1], METRICS_GZIP_LEVEL)
+        return entry[2]
+
+    def _expired(self, entry) -> bool:
+        return entry is None or time.monotonic() - entry[0] >= self.ttl
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+metrics_cache = MetricsCache()
+
+
+async def metrics_endpoint(request: Request) -> Response:
     """Endpoint for Prometheus to scrape metrics"""
-    return Response(content=generate_latest(REGISTRY), media_type="text/plain")
\ No newline at end of file
+    encoder, content_type = choose_encoder(request.headers.get("accept"))
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    content = await metrics_cache.get(encoder, content_type, compress)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=content, media_type=content_type, headers=headers)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""Metrics aggregation across server worker processes sharing PROMETHEUS_MULTIPROC_DIR.
+
+With the variable set (before prometheus_client is imported), every worker
+writes its samples to mmap files in that directory and a scrape served by
+any worker merges all of them. When a worker exits its counter, histogram
+and summary files are folded into one ``<type>_archive.db`` file, so the
+number of files a scrape has to read stays bounded by the number of live
+workers instead of growing with every restart.
+"""
+import fcntl
+import glob
+import os
+from contextlib import contextmanager
+
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.mmap_dict import MmapedDict
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+ARCHIVED_TYPES = ("counter", "histogram", "summary")
+LOCK_FILE = ".lock"
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool):
+    """Scrapes share the lock; compaction takes it exclusively so no scrape
+    sees a worker's values both in its own file and in the archive."""
+    with open(os.path.join(path, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def collect_latest(path: str | None = None, collectors=(), encoder=generate_latest) -> bytes:
+    """Render all workers' metrics, plus process-local ``collectors``"""
+    path = path or PROMETHEUS_MULTIPROC_DIR
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=path)
+    for collector in collectors:
+        registry.register(collector)
+    with _locked(path, exclusive=False):
+        return encoder(registry)
+
+
+def _archive(path: str, typ: str, pid) -> None:
+    source = os.path.join(path, f"{typ}_{pid}.db")
+    if not os.path.exists(source):
+        return
+    archive = MmapedDict(os.path.join(path, f"{typ}_archive.db"))
+    try:
+        for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(source):
+            archived, _ = archive.read_value(key)
+            archive.write_value(key, archived + value, timestamp)
+    finally:
+        archive.close()
+    os.remove(source)
+
+
+def worker_exit(pid, path: str | None = None) -> None:
+    """Drop the worker's live gauges and fold its cumulative metrics into the archive"""
+    path = path or PROMETHEUS_MULTIPROC_DIR
+    if not path:
+        return
+    with _locked(path, exclusive=True):
+        mark_process_dead(pid, path)
+        for typ in ARCHIVED_TYPES:
+            _archive(path, typ, pid)
+
+
+def reset(path: str | None = None) -> None:
+    """Remove files left by a previous run; call before any worker starts"""
+    path = path or PROMETHEUS_MULTIPROC_DIR
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for f in glob.glob(os.path.join(path, "*.db")):
+        os.remove(f)
@@ -0,0 +1,46 @@
+"""In-process sampling profiler producing collapsed stacks for flamegraphs."""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.005"))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.sep.join(code.co_filename.rsplit(os.sep, 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> list[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_stacks(seconds: float, interval: float = PROFILE_SAMPLE_INTERVAL) -> Counter:
+    """Sample every other thread's stack for ``seconds``; returns stack -> samples.
+
+    Blocking: run it in a worker thread so the event loop keeps running and
+    is sampled like any other thread. Each stack starts with the thread name.
+    """
+    own = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident != own:
+                stacks[(names.get(ident, str(ident)), *_stack(frame))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def collapse(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format: ``frame;frame;frame count`` per line"""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,127 @@
+"""Per-request database time and query count, collected from SQLAlchemy engine events."""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import (
+    db_queries_histogram,
+    db_time_histogram,
+    query_budget_exceeded_counter,
+    route_template,
+)
+
+logger = logging.getLogger(__name__)
+
+# More queries than this in one request is logged as a likely N+1 pattern; 0 disables
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))
+QUERY_BUDGET_LOG_INTERVAL = float(os.getenv("QUERY_BUDGET_LOG_INTERVAL", "60"))
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "stages")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.stages: dict[str, float] = {}
+
+
+current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started.pop()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+@contextmanager
+def request_stage(name: str):
+    """Add the time spent in the block to a named stage of the current request"""
+    stats = current_stats.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.stages[name] = stats.stages.get(name, 0.0) + time.perf_counter() - started
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    entries = [f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries"']
+    entries += [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stats.stages.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class RequestStatsMiddleware:
+    """Collects DB time and query count per request.
+
+    The totals so far are sent back in a ``Server-Timing`` header with the
+    response start. Once the response is complete they are recorded in
+    histograms by route template. Requests over ``query_budget`` queries
+    are counted and logged at most once per route and interval.
+    """
+
+    def __init__(self, app, query_budget: int = QUERY_BUDGET):
+        self.app = app
+        self.query_budget = query_budget
+        self._last_logged: dict[str, float] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                header = server_timing(stats, time.perf_counter() - started)
+                message = dict(message)
+                message['headers'] = list(message.get('headers', [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+            self._record(scope, stats)
+
+    def _record(self, scope, stats: RequestStats) -> None:
+        endpoint = route_template(scope)
+        db_queries_histogram.labels(endpoint=endpoint).observe(stats.queries)
+        db_time_histogram.labels(endpoint=endpoint).observe(stats.db_seconds)
+        if not self.query_budget or stats.queries <= self.query_budget:
+            return
+        query_budget_exceeded_counter.labels(endpoint=endpoint).inc()
+        now = time.monotonic()
+        if now - self._last_logged.get(endpoint, float("-inf")) >= QUERY_BUDGET_LOG_INTERVAL:
+            self._last_logged[endpoint] = now
+            logger.warning(
+                "Possible N+1: %s %s ran %d queries (budget %d)",
+                scope['method'], endpoint, stats.queries, self.query_budget
+            )
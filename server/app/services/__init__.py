@@ -4,15 +4,50 @@ Business logic and external service integrations
 """
 
 from .kafka_producer import (
-    get_producer,
+    get_transport,
     send_transaction_event,
+    republish_transactions,
     TRANSACTIONS_TOPIC
 )
+from .transport import Record, KafkaTransport, MemoryTransport, create_transport
+from .account_numbers import (
+    AccountNumberAllocator,
+    account_numbers,
+    format_account_number,
+    is_valid_account_number
+)
+from .bulk_import import import_accounts
+from .sweeper import sweep_stuck_transactions, run_sweeper
+from .export import export_transactions
+from .balances import balance_as_of
+from .account_search import PrefixIndex, prefix_index, search_accounts
+from .velocity import VelocityLimiter, LocalVelocityBackend, RedisVelocityBackend, velocity_limiter
 
 __all__ = [
-    "get_producer",
+    "get_transport",
+    "Record",
+    "KafkaTransport",
+    "MemoryTransport",
+    "create_transport",
     "send_transaction_event",
-    "TRANSACTIONS_TOPIC"
+    "republish_transactions",
+    "TRANSACTIONS_TOPIC",
+    "AccountNumberAllocator",
+    "account_numbers",
+    "format_account_number",
+    "is_valid_account_number",
+    "import_accounts",
+    "sweep_stuck_transactions",
+    "run_sweeper",
+    "export_transactions",
+    "balance_as_of",
+    "PrefixIndex",
+    "prefix_index",
+    "search_accounts",
+    "VelocityLimiter",
+    "LocalVelocityBackend",
+    "RedisVelocityBackend",
+    "velocity_limiter"
 ]
 
 SERVICE_CONFIG = {
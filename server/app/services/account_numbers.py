@@ -0,0 +1,107 @@
+"""Account number allocation: blocks reserved in the database, numbers handed out from memory."""
+import asyncio
+import os
+from collections import deque
+
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import ACCOUNT_NUMBER_BLOCK_SIZE, AccountNumberBlock, account_number_seq
+
+ACCOUNT_NUMBER_DIGITS = int(os.getenv("ACCOUNT_NUMBER_DIGITS", "9"))
+
+
+def luhn_check_digit(digits: str) -> str:
+    """Luhn check digit for a string of decimal digits"""
+    total = 0
+    for position, char in enumerate(reversed(digits)):
+        digit = int(char)
+        if position % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+
+def format_account_number(value: int) -> str:
+    """Zero-padded sequence value followed by its check digit"""
+    body = str(value).zfill(ACCOUNT_NUMBER_DIGITS)
+    if len(body) > ACCOUNT_NUMBER_DIGITS:
+        raise ValueError("Account number space exhausted")
+    return body + luhn_check_digit(body)
+
+
+def is_valid_account_number(account_number: str) -> bool:
+    return (
+        len(account_number) == ACCOUNT_NUMBER_DIGITS + 1
+        and account_number.isdigit()
+        and luhn_check_digit(account_number[:-1]) == account_number[-1]
+    )
+
+
+class AccountNumberAllocator:
+    """Hands out unique account numbers without a round trip per number.
+
+    On PostgreSQL every nextval() of account_number_seq reserves a block of
+    ACCOUNT_NUMBER_BLOCK_SIZE values; elsewhere the account_number_blocks
+    hi/lo row is bumped in its own transaction. Blocks are never handed out
+    twice, so workers cannot collide on the unique index. Numbers left in a
+    block when the process exits are simply skipped.
+    """
+
+    def __init__(self):
+        self._ranges = deque()
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, db: AsyncSession) -> str:
+        return (await self.allocate_many(db, 1))[0]
+
+    async def allocate_many(self, db: AsyncSession, count: int) -> list[str]:
+        numbers = []
+        async with self._lock:
+            while len(numbers) < count:
+                if not self._ranges:
+                    missing = count - len(numbers)
+                    blocks = -(-missing // ACCOUNT_NUMBER_BLOCK_SIZE)
+                    self._ranges.extend(await self._reserve(db, blocks))
+
+                start, end = self._ranges[0]
+                take = min(end - start, count - len(numbers))
+                numbers.extend(format_account_number(value) for value in range(start, start + take))
+                if start + take == end:
+                    self._ranges.popleft()
+                else:
+                    self._ranges[0] = (start + take, end)
+        return numbers
+
+    def reset(self) -> None:
+        """Drop reserved ranges (e.g. after the schema was recreated)"""
+        self._ranges.clear()
+
+    async def _reserve(self, db: AsyncSession, blocks: int) -> list[tuple[int, int]]:
+        if db.bind.dialect.name == "postgresql":
+            result = await db.execute(
+                select(account_number_seq.next_value()).select_from(func.generate_series(1, blocks))
+            )
+            return [(start, start + ACCOUNT_NUMBER_BLOCK_SIZE) for start in result.scalars()]
+
+        size = blocks * ACCOUNT_NUMBER_BLOCK_SIZE
+        # Separate transaction: a rollback of the caller must not return the block.
+        async with db.bind.begin() as conn:
+            result = await conn.execute(
+                update(AccountNumberBlock)
+                .where(AccountNumberBlock.name == account_number_seq.name)
+                .values(next_value=AccountNumberBlock.next_value + size)
+                .returning(AccountNumberBlock.next_value)
+            )
+            end = result.scalar_one_or_none()
+            if end is None:
+                end = 1 + size
+                await conn.execute(
+                    insert(AccountNumberBlock).values(name=account_number_seq.name, next_value=end)
+                )
+        return [(end - size, end)]
+
+
+account_numbers = AccountNumberAllocator()
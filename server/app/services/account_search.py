@@ -0,0 +1,198 @@
+"""Account lookup by owner name: prefix and substring matching with keyset pages."""
+import asyncio
+import base64
+import binascii
+import bisect
+import heapq
+import json
+import os
+from array import array
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import Account
+
+SEARCH_REFRESH_BATCH = int(os.getenv("SEARCH_REFRESH_BATCH", "50000"))
+# Refreshes loading more rows than this build the index in a worker thread
+SEARCH_INLINE_ROWS = 64
+# Substring queries are answered from trigram postings, so need a full trigram
+CONTAINS_MIN_LENGTH = 3
+
+# Must match the expression of ix_accounts_owner_name_lower; "C" collation
+# orders by code point, like Python string comparison.
+owner_name_key = func.lower(Account.owner_name).collate("C")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class QueryTooShort(ValueError):
+    pass
+
+
+def encode_cursor(key: tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, ensure_ascii=False).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        name, account_number = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+    if not isinstance(name, str) or not isinstance(account_number, str):
+        raise InvalidCursor(cursor)
+    return name, account_number
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PrefixIndex:
+    """In-memory (lower(owner_name), account_number) index for non-PostgreSQL databases.
+
+    Keys are kept in one sorted list, so a prefix page is a bisect plus a
+    slice. Substring queries scan the shortest posting list of the query's
+    trigrams; postings are arrays of 4-byte entry numbers, not key sets.
+    ``refresh`` only loads accounts with an id above the last one seen, so
+    the index is built once and then kept current incrementally. Owner
+    names are never updated, which is what makes this sufficient. Large
+    loads, such as the first one, are indexed in a worker thread so the
+    event loop keeps serving other requests meanwhile.
+    """
+
+    def __init__(self, batch_size: int = SEARCH_REFRESH_BATCH):
+        self.batch_size = batch_size
+        self.entries: list[tuple[str, str]] = []
+        self.keys: list[tuple[str, str]] = []
+        self.postings: dict[str, array] = {}
+        self.last_id = 0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, rows) -> None:
+        new_keys = [(owner_name.lower(), account_number) for owner_name, account_number in rows]
+        if len(new_keys) > SEARCH_INLINE_ROWS:
+            # Two sorted runs: timsort merges them in linear time.
+            self.keys.extend(sorted(new_keys))
+            self.keys.sort()
+        else:
+            for key in new_keys:
+                bisect.insort(self.keys, key)
+        for key in new_keys:
+            entry = len(self.entries)
+            self.entries.append(key)
+            for trigram in trigrams(key[0]):
+                postings = self.postings.get(trigram)
+                if postings is None:
+                    postings = self.postings[trigram] = array("I")
+                postings.append(entry)
+
+    async def refresh(self, db: AsyncSession) -> None:
+        # Searches wait here, so they never read the index while a thread updates it
+        async with self._lock:
+            last_id = self.last_id
+            new_rows = []
+            while True:
+                rows = (await db.execute(
+                    select(Account.id, Account.owner_name, Account.account_number)
+                    .where(Account.id > last_id)
+                    .order_by(Account.id)
+                    .limit(self.batch_size)
+                )).all()
+                if not rows:
+                    break
+                new_rows.extend((owner_name, account_number) for _, owner_name, account_number in rows)
+                last_id = rows[-1][0]
+            # One merge for all batches
+            if len(new_rows) > SEARCH_INLINE_ROWS:
+                await asyncio.to_thread(self.add, new_rows)
+            elif new_rows:
+                self.add(new_rows)
+            self.last_id = last_id
+
+    def prefix(self, q: str, limit: int, after: tuple[str, str] | None = None) -> list[tuple[str, str]]:
+        if after is not None and after >= (q,):
+            start = bisect.bisect_right(self.keys, after)
+        else:
+            start = bisect.bisect_left(self.keys, (q,))
+        page = []
+        for key in self.keys[start:start + limit]:
+            if not key[0].startswith(q):
+                break
+            page.append(key)
+        return page
+
+    def contains(self, q: str, limit: int, after: tuple[str, str] | None = None) -> list[tuple[str, str]]:
+        if len(q) < CONTAINS_MIN_LENGTH:
+            raise QueryTooShort(q)
+        postings = [self.postings.get(t) for t in trigrams(q)]
+        if any(p is None for p in postings):
+            return []
+        candidates = (self.entries[entry] for entry in min(postings, key=len))
+        return heapq.nsmallest(
+            limit, (key for key in candidates if q in key[0] and (after is None or key > after))
+        )
+
+    def reset(self) -> None:
+        self.entries = []
+        self.keys = []
+        self.postings = {}
+        self.last_id = 0
+
+
+prefix_index = PrefixIndex()
+
+
+async def search_accounts(
+        db: AsyncSession,
+        q: str,
+        mode: str = "prefix",
+        limit: int = 20,
+        after: str | None = None,
+) -> tuple[list[Account], str | None]:
+    """One page of accounts whose lowercased owner name starts with / contains ``q``.
+
+    Results are ordered by (lowercased owner name, account number); the
+    returned cursor encodes the last key and is passed back as ``after``.
+    PostgreSQL answers from the btree and trigram indexes on
+    lower(owner_name); other databases use the in-process ``prefix_index``.
+    ``contains`` needs at least CONTAINS_MIN_LENGTH characters.
+    """
+    q = q.strip().lower()
+    if mode == "contains" and len(q) < CONTAINS_MIN_LENGTH:
+        raise QueryTooShort(q)
+    cursor = decode_cursor(after) if after else None
+
+    if db.bind.dialect.name == "postgresql":
+        match = owner_name_key.startswith(q, autoescape=True) if mode == "prefix" \
+            else func.lower(Account.owner_name).contains(q, autoescape=True)
+        query = select(Account, owner_name_key).where(match)
+        if cursor:
+            query = query.where(tuple_(owner_name_key, Account.account_number) > tuple_(*cursor))
+        query = query.order_by(owner_name_key, Account.account_number).limit(limit + 1)
+        rows = (await db.execute(query)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        accounts = [account for account, _ in rows]
+        last_key = (rows[-1][1], rows[-1][0].account_number) if rows else None
+    else:
+        await prefix_index.refresh(db)
+        lookup = prefix_index.prefix if mode == "prefix" else prefix_index.contains
+        keys = lookup(q, limit + 1, cursor)
+        has_more = len(keys) > limit
+        keys = keys[:limit]
+        last_key = keys[-1] if keys else None
+        by_number = {}
+        if keys:
+            result = await db.execute(
+                select(Account).where(Account.account_number.in_([number for _, number in keys]))
+            )
+            by_number = {account.account_number: account for account in result.scalars()}
+        accounts = [by_number[number] for _, number in keys if number in by_number]
+
+    return accounts, encode_cursor(last_key) if has_more and last_key else None
@@ -0,0 +1,49 @@
+"""Point-in-time balances from daily snapshots plus the transactions since."""
+from datetime import datetime, time, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import Account, BalanceSnapshot, Transaction
+
+
+def _movement(account_number: str, since: datetime | None, until: datetime):
+    """Net amount of completed transactions on the account with since <= processed_at <= until"""
+    period = (Transaction.status == "COMPLETED") & (Transaction.processed_at <= until)
+    if since is not None:
+        period &= Transaction.processed_at >= since
+    credits = select(func.coalesce(func.sum(Transaction.amount), 0.0)).where(
+        period, Transaction.to_account == account_number, Transaction.transaction_type != "WITHDRAW"
+    )
+    debits = select(func.coalesce(func.sum(Transaction.amount), 0.0)).where(
+        period, Transaction.from_account == account_number, Transaction.transaction_type != "DEPOSIT"
+    )
+    return select(credits.scalar_subquery() - debits.scalar_subquery())
+
+
+async def balance_as_of(db: AsyncSession, account: Account, as_of: datetime) -> float:
+    """Balance of the account right after the transactions processed up to ``as_of``.
+
+    Starts from the closing balance of the latest snapshot before the day of
+    ``as_of`` and adds that day's completed transactions, each read through a
+    (account, processed_at) index. Without an earlier snapshot it starts from
+    the opening balance and adds every completed transaction up to ``as_of``.
+    """
+    if as_of.tzinfo is not None:
+        as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+    day_start = datetime.combine(as_of.date(), time.min)
+
+    snapshot = await db.execute(
+        select(BalanceSnapshot.closing_balance)
+        .where(BalanceSnapshot.account_number == account.account_number, BalanceSnapshot.day < as_of.date())
+        .order_by(BalanceSnapshot.day.desc())
+        .limit(1)
+    )
+    start_balance = snapshot.scalar_one_or_none()
+    since = day_start
+    if start_balance is None:
+        start_balance = account.opening_balance or 0.0
+        since = None
+
+    movement = await db.execute(_movement(account.account_number, since, as_of))
+    return start_balance + movement.scalar_one()
@@ -0,0 +1,231 @@
+"""Bulk account import: streamed CSV/NDJSON rows loaded in chunks (COPY on PostgreSQL)."""
+import csv
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import Account
+from ..models.schemas import AccountCreate
+from ..serialization import dumps, loads
+from .account_numbers import account_numbers
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+RESULTS_READ_SIZE = 64 * 1024
+
+COPY_COLUMNS = ["account_number", "owner_name", "balance", "opening_balance", "is_active"]
+
+
+def _decode(line: bytes) -> str | None:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str | None]]:
+    """Split a byte stream into (line number, text) pairs.
+
+    Text is None for a line that is not valid UTF-8. A newline byte never
+    occurs inside a multi-byte UTF-8 sequence, so lines decode on their
+    own; a line split across chunks is kept as parts and joined once.
+    """
+    partial: list[bytes] = []
+    line_no = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            partial.append(chunk[start:end])
+            line_no += 1
+            yield line_no, _decode(b"".join(partial))
+            partial.clear()
+            start = end + 1
+        if start < len(chunk):
+            partial.append(chunk[start:])
+    if partial:
+        yield line_no + 1, _decode(b"".join(partial))
+
+
+def _parse_json(text: str) -> dict | str:
+    try:
+        row = loads(text)
+    except json.JSONDecodeError as e:
+        return f"invalid JSON: {e.msg}"
+    if not isinstance(row, dict):
+        return "expected a JSON object"
+    return row
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield (line number, raw row dict) or (line number, error message), skipping blank lines.
+
+    A CSV record ends at the first line break outside quotes (an even
+    number of quote characters so far, since escaped quotes are doubled),
+    so quoted fields may span lines; its line number is its first line's.
+    """
+    header = None
+    record: list[str] = []
+    record_start = quotes = 0
+    async for line_no, text in iter_lines(chunks):
+        if text is None:
+            yield (record_start if record else line_no), "invalid UTF-8"
+            record.clear()
+            continue
+        if fmt != "csv":
+            if text.strip():
+                yield line_no, _parse_json(text)
+            continue
+
+        if not record:
+            if not text.strip():
+                continue
+            record_start, quotes = line_no, 0
+        record.append(text + "\n")
+        quotes += text.count('"')
+        if quotes % 2:
+            continue
+        values = next(csv.reader(record))
+        record.clear()
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_start, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield record_start, {name: value for name, value in zip(header, values) if value != ""}
+
+    if record:
+        yield record_start, "unterminated quoted field"
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+async def _load_chunk(db: AsyncSession, rows: list[AccountCreate]) -> list[str]:
+    numbers = await account_numbers.allocate_many(db, len(rows))
+
+    if db.bind.dialect.name == "postgresql":
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            Account.__tablename__,
+            records=[
+                (number, row.owner_name, row.initial_balance, row.initial_balance, True)
+                for number, row in zip(numbers, rows)
+            ],
+            columns=COPY_COLUMNS,
+        )
+    else:
+        await db.execute(
+            insert(Account),
+            [
+                {
+                    "account_number": number,
+                    "owner_name": row.owner_name,
+                    "balance": row.initial_balance,
+                    "opening_balance": row.initial_balance,
+                    "is_active": True,
+                }
+                for number, row in zip(numbers, rows)
+            ],
+        )
+
+    await db.commit()
+    return numbers
+
+
+async def import_accounts(
+        db: AsyncSession,
+        chunks: AsyncIterator[bytes],
+        fmt: str,
+        results: BinaryIO,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> dict:
+    """Validate and insert streamed rows chunk by chunk.
+
+    Writes one NDJSON line per input row to ``results`` (the generated
+    account number or the validation error) followed by a summary line,
+    and returns the summary.
+    """
+    started = time.perf_counter()
+    imported = failed = 0
+    # Errors wait with the valid rows so results come back in input order.
+    pending: list[tuple[int, AccountCreate | str]] = []
+    valid = 0
+
+    def write(record: dict) -> None:
+        results.write(dumps(record) + b"\n")
+
+    async def flush() -> None:
+        nonlocal imported, valid
+        rows = [row for _, row in pending if not isinstance(row, str)]
+        numbers = iter(await _load_chunk(db, rows) if rows else [])
+        for line_no, row in pending:
+            if isinstance(row, str):
+                write({"line": line_no, "error": row})
+            else:
+                write({"line": line_no, "account_number": next(numbers)})
+        imported += len(rows)
+        valid = 0
+        pending.clear()
+        elapsed = time.perf_counter() - started
+        logger.info("Imported %d accounts (%.0f rows/s)", imported, imported / elapsed)
+
+    async for line_no, row in iter_rows(chunks, fmt):
+        if not isinstance(row, str):
+            try:
+                row = AccountCreate(**row)
+                valid += 1
+            except ValidationError as e:
+                row = _validation_message(e)
+        if isinstance(row, str):
+            failed += 1
+        pending.append((line_no, row))
+        if valid >= chunk_size or len(pending) >= chunk_size * 2:
+            await flush()
+
+    if pending:
+        await flush()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "imported": imported,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(imported / elapsed, 1) if elapsed else 0.0,
+    }
+    write({"summary": summary})
+    return summary
+
+
+async def iter_results(results: BinaryIO) -> AsyncIterator[bytes]:
+    """Stream a spooled results file back, whole lines only, and close it.
+
+    The 200 status is sent before the first chunk, so a read that fails part
+    way can no longer change it; the stream then ends with an ``{"error"}``
+    record without a line number instead of the summary.
+    """
+    pending = b""
+    try:
+        results.seek(0)
+        while chunk := results.read(RESULTS_READ_SIZE):
+            pending += chunk
+            end = pending.rfind(b"\n") + 1
+            if end:
+                yield pending[:end]
+                pending = pending[end:]
+    except Exception as e:
+        logger.exception("Failed to stream import results")
+        yield dumps({"error": f"import results truncated: {e}"}) + b"\n"
+    finally:
+        results.close()
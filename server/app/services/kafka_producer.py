@@ -1,38 +1,41 @@
-from kafka import KafkaProducer
-import json
-import os
+import asyncio
 import logging
+import time
+from datetime import datetime, timezone
+from ..events import encode_event
 from ..models.database import Transaction
+from ..monitoring.metrics import pipeline_latency_histogram
+from .transport import Record, create_transport
 
 logger = logging.getLogger(__name__)
 
-KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
 TRANSACTIONS_TOPIC = "bank-transactions"
 
-producer = None
+# Stage timestamps (epoch seconds) sent as message headers for the consumer
+ACCEPTED_AT_HEADER = "accepted_at"
+PUBLISHED_AT_HEADER = "published_at"
 
+transport = None
 
-def get_producer():
-    global producer
-    if producer is None:
-        try:
-            producer = KafkaProducer(
-                bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
-                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-                acks='all',
-                retries=3
-            )
-            logger.info(f"Connected to Kafka at {KAFKA_BOOTSTRAP_SERVERS}")
-        except Exception as e:
-            logger.error(f"Failed to connect to Kafka: {e}")
-            raise
-    return producer
 
+def get_transport():
+    """The process-wide publishing transport, chosen by MESSAGE_TRANSPORT;
+    events are encoded in EVENT_FORMAT"""
+    global transport
+    if transport is None:
+        transport = create_transport(value_serializer=encode_event)
+    return transport
 
-async def send_transaction_event(transaction: Transaction):
-    """Send transaction to Kafka for processing"""
-    producer = get_producer()
 
+def _epoch(created_at: datetime | None) -> float:
+    if created_at is None:
+        return time.time()
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.timestamp()
+
+
+def _event_record(transaction: Transaction, published_at: float, accepted_at: float | None = None) -> Record:
     event = {
         "transaction_id": transaction.id,
         "from_account": transaction.from_account,
@@ -41,11 +44,42 @@ async def send_transaction_event(transaction: Transaction):
         "transaction_type": transaction.transaction_type,
         "created_at": transaction.created_at.isoformat() if transaction.created_at else None
     }
+    headers = [
+        (ACCEPTED_AT_HEADER, repr(accepted_at or _epoch(transaction.created_at)).encode()),
+        (PUBLISHED_AT_HEADER, repr(published_at).encode()),
+    ]
+    return Record(event, headers)
+
 
+async def send_transaction_event(transaction: Transaction, accepted_at: float | None = None):
+    """Publish the transaction for the consumer to process
+
+    ``accepted_at`` is when the request was received. Re-published events
+    have none (see ``republish_transactions``): their headers carry the
+    row's created_at instead and they are left out of the persist stage,
+    which would otherwise count the sweep delay.
+    """
     try:
-        future = producer.send(TRANSACTIONS_TOPIC, value=event)
-        result = future.get(timeout=10)
-        logger.info(f"Sent transaction {transaction.id} to Kafka: {result}")
+        published_at = time.time()
+        record = _event_record(transaction, published_at, accepted_at)
+        # Waiting for the broker's ack happens off the event loop.
+        await asyncio.to_thread(get_transport().publish_batch, TRANSACTIONS_TOPIC, [record])
+        if accepted_at is not None:
+            pipeline_latency_histogram.labels(stage="persist").observe(published_at - accepted_at)
+        pipeline_latency_histogram.labels(stage="publish").observe(time.time() - published_at)
+        logger.info("Published transaction %s", transaction.id, extra={"transaction_id": transaction.id})
     except Exception as e:
-        logger.error(f"Failed to send transaction to Kafka: {e}")
-        raise
\ No newline at end of file
+        logger.error(
+            "Failed to publish transaction %s: %s", transaction.id, e, extra={"transaction_id": transaction.id}
+        )
+        raise
+
+
+async def republish_transactions(transactions: list[Transaction]) -> None:
+    """Publish events for ``transactions`` again, as one batch; raises if any is not acked"""
+    if not transactions:
+        return
+    published_at = time.time()
+    records = [_event_record(transaction, published_at) for transaction in transactions]
+    await asyncio.to_thread(get_transport().publish_batch, TRANSACTIONS_TOPIC, records)
+    pipeline_latency_histogram.labels(stage="publish").observe(time.time() - published_at)
@@ -0,0 +1,134 @@
+"""Background sweeper for transactions stuck in PENDING."""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import AsyncSessionLocal, Transaction, UNFINISHED_STATUSES
+from ..monitoring.metrics import stuck_transactions_gauge, swept_transactions_counter
+from .kafka_producer import republish_transactions
+
+logger = logging.getLogger(__name__)
+
+SWEEPER_ENABLED = os.getenv("SWEEPER_ENABLED", "true").lower() == "true"
+SWEEP_INTERVAL_SECONDS = float(os.getenv("SWEEP_INTERVAL_SECONDS", "30"))
+SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", "500"))
+STUCK_AFTER_SECONDS = int(os.getenv("STUCK_AFTER_SECONDS", "60"))
+STUCK_FAIL_AFTER_SECONDS = int(os.getenv("STUCK_FAIL_AFTER_SECONDS", "900"))
+# Minimum time between two re-publishes of the same transaction
+REPUBLISH_INTERVAL_SECONDS = int(os.getenv("REPUBLISH_INTERVAL_SECONDS", "120"))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def _fail_batch(db: AsyncSession, condition, now: datetime, batch_size: int) -> int:
+    ids = (await db.execute(
+        select(Transaction.id)
+        .where(condition)
+        .order_by(Transaction.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )).scalars().all()
+    if ids:
+        await db.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(ids), Transaction.status.in_(UNFINISHED_STATUSES))
+            .values(status="FAILED", processed_at=now)
+        )
+    await db.commit()
+    return len(ids)
+
+
+async def sweep_stuck_transactions(
+        db: AsyncSession,
+        now: datetime | None = None,
+        batch_size: int = SWEEP_BATCH_SIZE,
+) -> dict:
+    """Re-publish or fail transactions that stayed non-terminal for too long.
+
+    PENDING rows older than STUCK_AFTER_SECONDS are re-published (the
+    consumer only claims PENDING rows, so a duplicate event is a no-op),
+    at most once per REPUBLISH_INTERVAL_SECONDS so a lagging consumer does
+    not get a fresh duplicate every sweep. The rows are stamped and
+    committed before publishing, so no lock is held while waiting for the
+    broker; if the publish fails the stamps are cleared for the next sweep.
+    PENDING rows older than STUCK_FAIL_AFTER_SECONDS are marked FAILED.
+    PROCESSING is left alone: the consumer sets it and the final status in
+    one transaction, so no other session ever sees it committed. Every
+    query hits the partial index on unfinished transactions.
+
+    ``now`` is naive UTC, like created_at: PostgreSQL sessions run with
+    timezone UTC (see app.models.database), so now() defaults are UTC too.
+    """
+    now = now or _utcnow()
+    stuck_cutoff = now - timedelta(seconds=STUCK_AFTER_SECONDS)
+    fail_cutoff = now - timedelta(seconds=STUCK_FAIL_AFTER_SECONDS)
+    unfinished = Transaction.status.in_(UNFINISHED_STATUSES)
+
+    counts = dict((await db.execute(
+        select(Transaction.status, func.count())
+        .where(unfinished, Transaction.created_at < stuck_cutoff)
+        .group_by(Transaction.status)
+    )).all())
+    for status in UNFINISHED_STATUSES:
+        stuck_transactions_gauge.labels(status=status).set(counts.get(status, 0))
+
+    failed = 0
+    fail_condition = (Transaction.status == "PENDING") & (Transaction.created_at < fail_cutoff)
+    while True:
+        batch = await _fail_batch(db, unfinished & fail_condition, now, batch_size)
+        failed += batch
+        if batch < batch_size:
+            break
+
+    republish_cutoff = now - timedelta(seconds=REPUBLISH_INTERVAL_SECONDS)
+    pending = (await db.execute(
+        select(Transaction)
+        .where(
+            Transaction.status == "PENDING",
+            Transaction.created_at < stuck_cutoff,
+            Transaction.created_at >= fail_cutoff,
+            (Transaction.republished_at.is_(None)) | (Transaction.republished_at < republish_cutoff),
+        )
+        .order_by(Transaction.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )).scalars().all()
+    republished = 0
+    if pending:
+        ids = [transaction.id for transaction in pending]
+        await db.execute(update(Transaction).where(Transaction.id.in_(ids)).values(republished_at=now))
+        for transaction in pending:
+            db.expunge(transaction)
+        await db.commit()
+        try:
+            await republish_transactions(pending)
+            republished = len(pending)
+        except Exception:
+            logger.exception("Failed to re-publish %d stuck transactions", len(pending))
+            await db.execute(update(Transaction).where(Transaction.id.in_(ids)).values(republished_at=None))
+            await db.commit()
+    else:
+        await db.commit()
+
+    swept_transactions_counter.labels(action="failed").inc(failed)
+    swept_transactions_counter.labels(action="republished").inc(republished)
+    if failed or republished:
+        logger.warning("Sweeper: %d stuck transactions failed, %d re-published", failed, republished)
+    return {"stuck": counts, "failed": failed, "republished": republished}
+
+
+async def run_sweeper(interval: float = SWEEP_INTERVAL_SECONDS) -> None:
+    """Sweep forever; meant to run as a background task"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await sweep_stuck_transactions(db)
+        except Exception:
+            logger.exception("Stuck-transaction sweep failed")
+        await asyncio.sleep(interval)
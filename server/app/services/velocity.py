@@ -0,0 +1,215 @@
+"""Sliding-window velocity limits per sender account, checked without touching the DB."""
+import os
+import time
+from collections import OrderedDict
+
+from ..monitoring.metrics import velocity_rejections_counter
+
+VELOCITY_WINDOW_SECONDS = int(os.getenv("VELOCITY_WINDOW_SECONDS", "60"))
+VELOCITY_BUCKETS = int(os.getenv("VELOCITY_BUCKETS", "12"))
+# 0 disables the corresponding limit
+VELOCITY_MAX_DEBITS = int(os.getenv("VELOCITY_MAX_DEBITS", "0"))
+VELOCITY_MAX_AMOUNT = float(os.getenv("VELOCITY_MAX_AMOUNT", "0"))
+VELOCITY_MAX_ACCOUNTS = int(os.getenv("VELOCITY_MAX_ACCOUNTS", "100000"))
+VELOCITY_BACKEND = os.getenv("VELOCITY_BACKEND", "local")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class _Window:
+    __slots__ = ("epochs", "counts", "amounts", "last_seen")
+
+    def __init__(self, buckets: int):
+        self.epochs = [-1] * buckets
+        self.counts = [0] * buckets
+        self.amounts = [0.0] * buckets
+        self.last_seen = 0.0
+
+
+class LocalVelocityBackend:
+    """Per-process counters: a fixed ring of time buckets per account.
+
+    A check touches ``buckets`` slots, independent of traffic. Accounts are
+    kept in LRU order; those idle for a whole window (all slots expired) and
+    the least recently used ones beyond ``max_accounts`` are evicted.
+    """
+
+    def __init__(
+            self,
+            window_seconds: int = VELOCITY_WINDOW_SECONDS,
+            buckets: int = VELOCITY_BUCKETS,
+            max_accounts: int = VELOCITY_MAX_ACCOUNTS,
+    ):
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.max_accounts = max_accounts
+        self._windows: OrderedDict[str, _Window] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    async def add_if_within(
+            self, key: str, amount: float, max_count: int, max_amount: float, now: float
+    ) -> bool:
+        epoch = int(now // self.bucket_seconds)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(self.buckets)
+        else:
+            self._windows.move_to_end(key)
+        window.last_seen = now
+
+        oldest = epoch - self.buckets + 1
+        count = 0
+        total = 0.0
+        for i in range(self.buckets):
+            if window.epochs[i] >= oldest:
+                count += window.counts[i]
+                total += window.amounts[i]
+
+        allowed = not (
+            (max_count and count + 1 > max_count)
+            or (max_amount and total + amount > max_amount)
+        )
+        if allowed:
+            slot = epoch % self.buckets
+            if window.epochs[slot] != epoch:
+                window.epochs[slot] = epoch
+                window.counts[slot] = 0
+                window.amounts[slot] = 0.0
+            window.counts[slot] += 1
+            window.amounts[slot] += amount
+
+        self._evict(now)
+        return allowed
+
+    async def refund(self, key: str, amount: float, now: float) -> None:
+        epoch = int(now // self.bucket_seconds)
+        window = self._windows.get(key)
+        slot = epoch % self.buckets
+        # Nothing to give back once the bucket has been reused
+        if window is None or window.epochs[slot] != epoch:
+            return
+        window.counts[slot] = max(window.counts[slot] - 1, 0)
+        window.amounts[slot] = max(window.amounts[slot] - amount, 0.0)
+
+    def _evict(self, now: float) -> None:
+        while len(self._windows) > self.max_accounts:
+            self._windows.popitem(last=False)
+        while self._windows:
+            oldest = next(iter(self._windows.values()))
+            if now - oldest.last_seen < self.window_seconds:
+                break
+            self._windows.popitem(last=False)
+
+
+class RedisVelocityBackend:
+    """Counters shared by all server workers, kept in Redis.
+
+    One hash per account and time bucket, expiring after the window; the
+    check-and-add runs as a single Lua script so concurrent workers see
+    consistent counts.
+    """
+
+    SCRIPT = """
+    local epoch = tonumber(ARGV[1])
+    local buckets = tonumber(ARGV[2])
+    local amount = tonumber(ARGV[3])
+    local max_count = tonumber(ARGV[4])
+    local max_amount = tonumber(ARGV[5])
+    local count, total = 0, 0
+    for e = epoch - buckets + 1, epoch do
+        local v = redis.call('HMGET', KEYS[1] .. ':' .. e, 'count', 'amount')
+        count = count + (tonumber(v[1]) or 0)
+        total = total + (tonumber(v[2]) or 0)
+    end
+    if (max_count > 0 and count + 1 > max_count) or (max_amount > 0 and total + amount > max_amount) then
+        return 0
+    end
+    local bucket = KEYS[1] .. ':' .. epoch
+    redis.call('HINCRBY', bucket, 'count', 1)
+    redis.call('HINCRBYFLOAT', bucket, 'amount', ARGV[3])
+    redis.call('EXPIRE', bucket, tonumber(ARGV[6]))
+    return 1
+    """
+
+    REFUND_SCRIPT = """
+    local bucket = KEYS[1] .. ':' .. ARGV[1]
+    if redis.call('EXISTS', bucket) == 1 then
+        redis.call('HINCRBY', bucket, 'count', -1)
+        redis.call('HINCRBYFLOAT', bucket, 'amount', ARGV[2])
+    end
+    return 1
+    """
+
+    def __init__(
+            self,
+            url: str = REDIS_URL,
+            window_seconds: int = VELOCITY_WINDOW_SECONDS,
+            buckets: int = VELOCITY_BUCKETS,
+            client=None,
+    ):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError("VELOCITY_BACKEND=redis requires the redis package") from e
+            client = redis.from_url(url)
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self._script = client.register_script(self.SCRIPT)
+        self._refund_script = client.register_script(self.REFUND_SCRIPT)
+
+    async def add_if_within(
+            self, key: str, amount: float, max_count: int, max_amount: float, now: float
+    ) -> bool:
+        epoch = int(now // self.bucket_seconds)
+        allowed = await self._script(
+            keys=[f"velocity:{{{key}}}"],
+            args=[epoch, self.buckets, amount, max_count, max_amount, self.window_seconds + 1],
+        )
+        return bool(allowed)
+
+    async def refund(self, key: str, amount: float, now: float) -> None:
+        epoch = int(now // self.bucket_seconds)
+        await self._refund_script(keys=[f"velocity:{{{key}}}"], args=[epoch, -amount])
+
+
+class VelocityLimiter:
+    """Rejects debits beyond max_count transactions or max_amount per window and account"""
+
+    def __init__(self, backend, max_count: int = VELOCITY_MAX_DEBITS, max_amount: float = VELOCITY_MAX_AMOUNT):
+        self.backend = backend
+        self.max_count = max_count
+        self.max_amount = max_amount
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_count or self.max_amount)
+
+    async def check(
+            self, account_number: str, amount: float, transaction_type: str, now: float | None = None
+    ) -> bool:
+        """Record the debit and return True, or return False if it would exceed a limit"""
+        if not self.enabled:
+            return True
+        allowed = await self.backend.add_if_within(
+            account_number, amount, self.max_count, self.max_amount, time.time() if now is None else now
+        )
+        if not allowed:
+            velocity_rejections_counter.labels(type=transaction_type).inc()
+        return allowed
+
+    async def refund(self, account_number: str, amount: float, now: float) -> None:
+        """Give back a debit recorded by ``check(..., now=now)`` that was never persisted"""
+        if self.enabled:
+            await self.backend.refund(account_number, amount, now)
+
+
+def create_velocity_limiter() -> VelocityLimiter:
+    backend = RedisVelocityBackend() if VELOCITY_BACKEND == "redis" else LocalVelocityBackend()
+    return VelocityLimiter(backend)
+
+
+velocity_limiter = create_velocity_limiter()
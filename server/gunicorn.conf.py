@@ -0,0 +1,25 @@
+"""Gunicorn settings for running the API with several uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Metrics from all workers are merged through PROMETHEUS_MULTIPROC_DIR,
+which must be set before the workers import prometheus_client.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/bank_prometheus")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    from app.monitoring import multiprocess
+    multiprocess.reset(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def child_exit(server, worker):
+    from app.monitoring import multiprocess
+    multiprocess.worker_exit(worker.pid, os.environ["PROMETHEUS_MULTIPROC_DIR"])
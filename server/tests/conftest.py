@@ -1,12 +1,17 @@
 """Pytest fixtures: in-memory SQLite DB and FastAPI client."""
 import asyncio
+import os
 import pytest
 from unittest.mock import patch, AsyncMock
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 from app.main import app
 from app.models.database import Base, get_db
+from app.services.account_numbers import account_numbers
+from app.services.account_search import prefix_index
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 engine = create_async_engine(TEST_DATABASE_URL, echo=False)
@@ -26,6 +31,8 @@ def event_loop():
 async def setup_database():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    account_numbers.reset()
+    prefix_index.reset()
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
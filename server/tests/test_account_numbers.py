@@ -0,0 +1,87 @@
+"""Tests for block-allocated account numbers."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import ACCOUNT_NUMBER_BLOCK_SIZE
+from app.services.account_numbers import (
+    ACCOUNT_NUMBER_DIGITS,
+    AccountNumberAllocator,
+    format_account_number,
+    is_valid_account_number,
+    luhn_check_digit,
+)
+
+
+def test_luhn_check_digit():
+    assert luhn_check_digit("7992739871") == "3"
+    assert luhn_check_digit("0") == "0"
+
+
+def test_format_account_number():
+    number = format_account_number(42)
+    assert len(number) == ACCOUNT_NUMBER_DIGITS + 1
+    assert number.startswith("0" * (ACCOUNT_NUMBER_DIGITS - 2) + "42")
+    assert is_valid_account_number(number)
+
+
+def test_format_account_number_exhausted():
+    with pytest.raises(ValueError):
+        format_account_number(10 ** ACCOUNT_NUMBER_DIGITS)
+
+
+def test_is_valid_account_number_rejects_typos():
+    number = format_account_number(12345)
+    typo = number[:-2] + str((int(number[-2]) + 1) % 10) + number[-1]
+    assert not is_valid_account_number(typo)
+    assert not is_valid_account_number("ABCD1234")
+
+
+@pytest.mark.asyncio
+async def test_allocate_many_spans_blocks(db_session: AsyncSession):
+    allocator = AccountNumberAllocator()
+    numbers = await allocator.allocate_many(db_session, ACCOUNT_NUMBER_BLOCK_SIZE * 2 + 5)
+    assert len(set(numbers)) == len(numbers)
+    assert numbers[0] == format_account_number(1)
+    assert all(is_valid_account_number(n) for n in numbers)
+
+
+@pytest.mark.asyncio
+async def test_workers_never_share_a_block(db_session: AsyncSession):
+    worker_a = AccountNumberAllocator()
+    worker_b = AccountNumberAllocator()
+    numbers = []
+    for _ in range(3):
+        numbers.append(await worker_a.allocate(db_session))
+        numbers.append(await worker_b.allocate(db_session))
+    assert len(set(numbers)) == 6
+    # The second worker starts in the block after the first worker's one.
+    assert numbers[1] == format_account_number(ACCOUNT_NUMBER_BLOCK_SIZE + 1)
+
+
+@pytest.mark.asyncio
+async def test_reset_drops_reserved_block(db_session: AsyncSession):
+    allocator = AccountNumberAllocator()
+    first = await allocator.allocate(db_session)
+    allocator.reset()
+    second = await allocator.allocate(db_session)
+    assert second == format_account_number(ACCOUNT_NUMBER_BLOCK_SIZE + 1)
+    assert first != second
+
+
+@pytest.mark.asyncio
+async def test_postgres_reserves_blocks_from_sequence():
+    result = MagicMock()
+    result.scalars.return_value = [1, 1 + ACCOUNT_NUMBER_BLOCK_SIZE]
+    db = MagicMock()
+    db.bind.dialect.name = "postgresql"
+    db.execute = AsyncMock(return_value=result)
+
+    allocator = AccountNumberAllocator()
+    numbers = await allocator.allocate_many(db, ACCOUNT_NUMBER_BLOCK_SIZE + 1)
+
+    db.execute.assert_called_once()
+    statement = db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    assert "nextval('account_number_seq')" in str(statement)
+    assert numbers[-1] == format_account_number(1 + ACCOUNT_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,130 @@
+"""Tests for owner-name account search."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Account
+from app.services.account_search import (
+    InvalidCursor,
+    PrefixIndex,
+    QueryTooShort,
+    decode_cursor,
+    encode_cursor,
+    search_accounts,
+)
+
+NAMES = ["Иван Петров", "Иванна Ким", "ivan smith", "Anna Ivanova", "Boris", "Ivan Smith"]
+
+
+async def _seed(db: AsyncSession) -> None:
+    db.add_all([
+        Account(account_number=f"{i:04d}", owner_name=name, balance=0.0)
+        for i, name in enumerate(NAMES)
+    ])
+    await db.commit()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(("иван петров", "0001"))) == ("иван петров", "0001")
+    for bad in ("!!!", encode_cursor(["only-one"]), "bnVsbA"):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(bad)
+
+
+def test_prefix_index_pages_and_contains():
+    index = PrefixIndex()
+    index.add([("Bob", "2"), ("bobby", "1"), ("Alice", "3")])
+    index.add([("Bob", "0")])
+    assert index.prefix("bob", 2) == [("bob", "0"), ("bob", "2")]
+    assert index.prefix("bob", 10, after=("bob", "2")) == [("bobby", "1")]
+    assert index.prefix("c", 10) == []
+    assert index.contains("obb", 10) == [("bobby", "1")]
+    assert index.contains("lic", 10) == [("alice", "3")]
+    assert index.contains("bob", 2, after=("bob", "0")) == [("bob", "2"), ("bobby", "1")]
+    assert index.contains("xyz", 10) == []
+    with pytest.raises(QueryTooShort):
+        index.contains("li", 10)
+
+
+@pytest.mark.asyncio
+async def test_prefix_index_refreshes_incrementally(db_session: AsyncSession):
+    index = PrefixIndex(batch_size=2)
+    await _seed(db_session)
+    await index.refresh(db_session)
+    assert len(index) == len(NAMES)
+
+    db_session.add(Account(account_number="9999", owner_name="Ivan Late", balance=0.0))
+    await db_session.commit()
+    await index.refresh(db_session)
+    assert len(index) == len(NAMES) + 1
+    assert index.prefix("ivan l", 10) == [("ivan late", "9999")]
+
+
+@pytest.mark.asyncio
+async def test_prefix_index_merges_large_refresh_once_off_loop(db_session: AsyncSession):
+    db_session.add_all([
+        Account(account_number=f"{i:04d}", owner_name=f"Owner {i}", balance=0.0) for i in range(100)
+    ])
+    await db_session.commit()
+    index = PrefixIndex(batch_size=30)
+    with patch.object(index, "add", wraps=index.add) as add, \
+            patch("app.services.account_search.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        await index.refresh(db_session)
+    add.assert_called_once()
+    to_thread.assert_called_once()
+    assert len(index) == 100
+    assert index.prefix("owner 99", 10) == [("owner 99", "0099")]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_pages_with_cursor(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    response = await client.get("/accounts/search", params={"q": "IVAN", "limit": 1})
+    assert response.status_code == 200
+    page = response.json()
+    assert [a["account_number"] for a in page["items"]] == ["0002"]
+
+    seen = ["0002"]
+    while page["next_cursor"]:
+        page = (await client.get(
+            "/accounts/search", params={"q": "IVAN", "limit": 1, "after": page["next_cursor"]}
+        )).json()
+        seen += [a["account_number"] for a in page["items"]]
+    assert seen == ["0002", "0005"]
+
+    response = await client.get("/accounts/search", params={"q": "иван"})
+    assert [a["owner_name"] for a in response.json()["items"]] == ["Иван Петров", "Иванна Ким"]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_contains(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    response = await client.get("/accounts/search", params={"q": "ivan", "mode": "contains"})
+    assert [a["owner_name"] for a in response.json()["items"]] == ["Anna Ivanova", "ivan smith", "Ivan Smith"]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_rejects_bad_input(client: AsyncClient):
+    assert (await client.get("/accounts/search", params={"q": "x", "after": "!!!"})).status_code == 400
+    assert (await client.get("/accounts/search", params={"q": ""})).status_code == 422
+    assert (await client.get("/accounts/search", params={"q": "x", "mode": "fuzzy"})).status_code == 422
+    response = await client.get("/accounts/search", params={"q": " iv ", "mode": "contains"})
+    assert response.status_code == 422
+    assert "at least 3" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_search_on_postgres_uses_indexed_expression():
+    db = MagicMock()
+    db.bind.dialect.name = "postgresql"
+    db.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+
+    accounts, cursor = await search_accounts(db, "Iv_n", after=encode_cursor(("iv_a", "0001")))
+    assert accounts == [] and cursor is None
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert 'lower(accounts.owner_name) COLLATE "C") LIKE' in sql
+    assert "ESCAPE '/'" in sql
+    assert 'ORDER BY lower(accounts.owner_name) COLLATE "C", accounts.account_number' in sql
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.accounts import create_account, get_account, list_accounts
 from app.models.schemas import AccountCreate
+from app.services.account_numbers import ACCOUNT_NUMBER_DIGITS, is_valid_account_number
 
 
 @pytest.mark.asyncio
@@ -73,7 +74,8 @@ async def test_create_account_unit(db_session: AsyncSession):
     )
     assert result.owner_name == "Unit Test"
     assert result.balance == 200.0
-    assert len(result.account_number) == 8
+    assert len(result.account_number) == ACCOUNT_NUMBER_DIGITS + 1
+    assert is_valid_account_number(result.account_number)
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,64 @@
+"""Tests for point-in-time balance queries."""
+import pytest
+from datetime import date, datetime
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Account, BalanceSnapshot, Transaction
+
+
+async def _seed(db: AsyncSession) -> None:
+    db.add_all([
+        Account(account_number="A", owner_name="Ann", balance=165.0, opening_balance=100.0),
+        Account(account_number="B", owner_name="Bob", balance=35.0, opening_balance=0.0),
+        BalanceSnapshot(account_number="A", day=date(2024, 1, 1), closing_balance=150.0),
+        BalanceSnapshot(account_number="A", day=date(2024, 1, 3), closing_balance=200.0),
+    ])
+    db.add_all([
+        Transaction(to_account="A", amount=50.0, transaction_type="DEPOSIT", status="COMPLETED",
+                    processed_at=datetime(2024, 1, 1, 12)),
+        Transaction(to_account="A", amount=50.0, transaction_type="DEPOSIT", status="COMPLETED",
+                    processed_at=datetime(2024, 1, 3, 8)),
+        Transaction(from_account="A", to_account="B", amount=20.0, transaction_type="TRANSFER",
+                    status="COMPLETED", processed_at=datetime(2024, 1, 5, 9)),
+        Transaction(from_account="A", to_account="A", amount=15.0, transaction_type="WITHDRAW",
+                    status="COMPLETED", processed_at=datetime(2024, 1, 5, 10)),
+        Transaction(to_account="A", amount=999.0, transaction_type="DEPOSIT", status="FAILED",
+                    processed_at=datetime(2024, 1, 5, 10)),
+        Transaction(from_account="A", to_account="B", amount=15.0, transaction_type="TRANSFER",
+                    status="COMPLETED", processed_at=datetime(2024, 1, 6, 9)),
+    ])
+    await db.commit()
+
+
+async def _balance(client: AsyncClient, account: str, as_of: str) -> float:
+    response = await client.get(f"/accounts/{account}/balance", params={"as_of": as_of})
+    assert response.status_code == 200
+    return response.json()["balance"]
+
+
+@pytest.mark.asyncio
+async def test_balance_as_of(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    # Before any snapshot: opening balance plus everything processed so far.
+    assert await _balance(client, "A", "2024-01-01T06:00:00") == 100.0
+    assert await _balance(client, "A", "2024-01-01T12:00:00") == 150.0
+    # Nearest earlier snapshot, nothing processed that day yet.
+    assert await _balance(client, "A", "2024-01-02T00:00:00") == 150.0
+    assert await _balance(client, "A", "2024-01-05T09:30:00") == 180.0
+    assert await _balance(client, "A", "2024-01-05T23:59:59") == 165.0
+    assert await _balance(client, "B", "2024-01-06T10:00:00") == 35.0
+    assert await _balance(client, "B", "2024-01-05T12:00:00") == 20.0
+
+
+@pytest.mark.asyncio
+async def test_balance_as_of_converts_to_utc(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    # 2024-01-05 12:30 at +03:00 is 09:30 UTC.
+    assert await _balance(client, "A", "2024-01-05T12:30:00+03:00") == 180.0
+
+
+@pytest.mark.asyncio
+async def test_balance_as_of_unknown_account(client: AsyncClient):
+    response = await client.get("/accounts/NOPE/balance", params={"as_of": "2024-01-01T00:00:00"})
+    assert response.status_code == 404
@@ -0,0 +1,173 @@
+"""Tests for bulk account import."""
+import io
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Account
+from app.models.schemas import AccountCreate
+from app.services import bulk_import
+from app.services.account_numbers import is_valid_account_number
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _records(body: bytes) -> list[dict]:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_import_csv(client: AsyncClient, db_session: AsyncSession):
+    body = b"owner_name,initial_balance\nAlice,100\nBob,\n\nX,5\nCarol,-1\n"
+    response = await client.post(
+        "/accounts/import", content=body, headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    records = _records(response.content)
+
+    assert [r["line"] for r in records[:-1]] == [2, 3, 5, 6]
+    assert is_valid_account_number(records[0]["account_number"])
+    assert "account_number" in records[1]
+    assert "owner_name" in records[2]["error"]
+    assert "initial_balance" in records[3]["error"]
+    assert records[-1]["summary"]["imported"] == 2
+    assert records[-1]["summary"]["failed"] == 2
+
+    count = await db_session.scalar(select(func.count()).select_from(Account))
+    assert count == 2
+    bob = (await db_session.execute(
+        select(Account).where(Account.account_number == records[1]["account_number"])
+    )).scalar_one()
+    assert bob.owner_name == "Bob"
+    assert bob.balance == 0.0
+    assert bob.is_active
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson(client: AsyncClient):
+    body = b'{"owner_name": "Dan", "initial_balance": 7}\nnot json\n[1]\n{"owner_name": "Eve"}'
+    response = await client.post(
+        "/accounts/import", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    records = _records(response.content)
+    assert records[0]["line"] == 1 and "account_number" in records[0]
+    assert records[1]["error"].startswith("invalid JSON")
+    assert records[2]["error"] == "expected a JSON object"
+    assert records[3]["line"] == 4 and "account_number" in records[3]
+    assert records[-1]["summary"]["imported"] == 2
+
+    info = await client.get(f"/accounts/{records[0]['account_number']}")
+    assert info.json()["balance"] == 7.0
+
+
+@pytest.mark.asyncio
+async def test_import_commits_in_chunks(db_session: AsyncSession):
+    lines = b"".join(b'{"owner_name": "User %d"}\n' % i for i in range(7))
+    results = io.BytesIO()
+    summary = await bulk_import.import_accounts(
+        db_session, _chunks(lines[:10], lines[10:]), "ndjson", results, chunk_size=3
+    )
+    assert summary["imported"] == 7
+    numbers = [r["account_number"] for r in _records(results.getvalue())[:-1]]
+    assert len(set(numbers)) == 7
+
+
+@pytest.mark.asyncio
+async def test_import_csv_column_mismatch(db_session: AsyncSession):
+    results = io.BytesIO()
+    summary = await bulk_import.import_accounts(
+        db_session, _chunks(b"owner_name\nAl,1\n"), "csv", results
+    )
+    assert summary == {**summary, "imported": 0, "failed": 1}
+    assert "expected 1 columns" in _records(results.getvalue())[0]["error"]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_quoted_newlines_and_bad_utf8(db_session: AsyncSession):
+    body = b'owner_name,initial_balance\n"Ann\nLee",1\n\xff\xfe,2\n"Bob ""B""",3\n"open,4\n'
+    results = io.BytesIO()
+    summary = await bulk_import.import_accounts(
+        db_session, _chunks(body[:20], body[20:31], body[31:]), "csv", results
+    )
+    records = _records(results.getvalue())
+    assert [r["line"] for r in records[:-1]] == [2, 4, 5, 6]
+    assert records[1]["error"] == "invalid UTF-8"
+    assert records[3]["error"] == "unterminated quoted field"
+    assert summary == {**summary, "imported": 2, "failed": 2}
+    owners = (await db_session.execute(select(Account.owner_name).order_by(Account.id))).scalars().all()
+    assert owners == ["Ann\nLee", 'Bob "B"']
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_lines_split_across_chunks():
+    lines = [item async for item in bulk_import.iter_lines(_chunks(b"ab", b"c\r\nd", b"", b"e\n\xc3", b"\xa9"))]
+    assert lines == [(1, "abc"), (2, "de"), (3, "\u00e9")]
+
+
+class _FailingResults(io.BytesIO):
+    """A results spool whose second read fails"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        if self.reads > 1:
+            raise OSError("disk gone")
+        return super().read(size)
+
+
+@pytest.mark.asyncio
+async def test_iter_results_sends_whole_lines():
+    results = io.BytesIO(b'{"line": 1}\n{"line": 2}\n{"summary": {}}\n')
+    with patch.object(bulk_import, "RESULTS_READ_SIZE", 5):
+        chunks = [chunk async for chunk in bulk_import.iter_results(results)]
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert b"".join(chunks) == b'{"line": 1}\n{"line": 2}\n{"summary": {}}\n'
+    assert results.closed
+
+
+@pytest.mark.asyncio
+async def test_import_reports_failure_while_streaming_results(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr("app.api.accounts.tempfile.SpooledTemporaryFile", _FailingResults)
+    # One whole result line and part of the next are read before the failure
+    monkeypatch.setattr(bulk_import, "RESULTS_READ_SIZE", 60)
+    body = b"owner_name,initial_balance\nAlice,1\nBob,2\nCarol,3\n"
+    response = await client.post("/accounts/import", content=body, headers={"content-type": "text/csv"})
+
+    assert response.status_code == 200
+    records = _records(response.content)
+    assert len(records) == 2
+    assert records[0]["line"] == 2 and "account_number" in records[0]
+    assert records[1] == {"error": "import results truncated: disk gone"}
+    assert not any("summary" in record for record in records)
+
+
+@pytest.mark.asyncio
+async def test_load_chunk_uses_copy_on_postgres(monkeypatch):
+    raw = MagicMock()
+    raw.driver_connection.copy_records_to_table = AsyncMock()
+    conn = MagicMock()
+    conn.get_raw_connection = AsyncMock(return_value=raw)
+    db = MagicMock()
+    db.bind.dialect.name = "postgresql"
+    db.connection = AsyncMock(return_value=conn)
+    db.commit = AsyncMock()
+    monkeypatch.setattr(
+        bulk_import.account_numbers, "allocate_many", AsyncMock(return_value=["0000000018"])
+    )
+
+    numbers = await bulk_import._load_chunk(db, [AccountCreate(owner_name="Pg User", initial_balance=3)])
+
+    assert numbers == ["0000000018"]
+    kwargs = raw.driver_connection.copy_records_to_table.call_args.kwargs
+    assert kwargs["records"] == [("0000000018", "Pg User", 3.0, 3.0, True)]
+    assert kwargs["columns"] == bulk_import.COPY_COLUMNS
+    db.commit.assert_called_once()
@@ -22,3 +22,56 @@ async def test_get_db():
             sessions.append(session)
             assert session is not None
         assert len(sessions) == 1
+
+
+@pytest.mark.asyncio
+async def test_init_db_upgrades_legacy_schema(tmp_path):
+    from sqlalchemy import inspect, text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    legacy = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with legacy.begin() as conn:
+        # The schema as the first release created it
+        await conn.execute(text(
+            "CREATE TABLE accounts (id INTEGER PRIMARY KEY, account_number VARCHAR NOT NULL, "
+            "owner_name VARCHAR NOT NULL, balance FLOAT, is_active BOOLEAN, created_at DATETIME, updated_at DATETIME)"
+        ))
+        await conn.execute(text(
+            "CREATE TABLE transactions (id INTEGER PRIMARY KEY, from_account VARCHAR, to_account VARCHAR NOT NULL, "
+            "amount FLOAT NOT NULL, transaction_type VARCHAR NOT NULL, status VARCHAR, created_at DATETIME, "
+            "processed_at DATETIME)"
+        ))
+        for statement in (
+                "CREATE INDEX ix_accounts_id ON accounts (id)",
+                "CREATE UNIQUE INDEX ix_accounts_account_number ON accounts (account_number)",
+                "CREATE INDEX ix_transactions_id ON transactions (id)",
+                "CREATE INDEX ix_transactions_from_account ON transactions (from_account)",
+                "CREATE INDEX ix_transactions_to_account ON transactions (to_account)",
+        ):
+            await conn.execute(text(statement))
+        await conn.execute(text(
+            "INSERT INTO accounts (id, account_number, owner_name, balance) VALUES (1, 'A', 'Ann', 130), (2, 'B', 'Bo', 20)"
+        ))
+        await conn.execute(text(
+            "INSERT INTO transactions (from_account, to_account, amount, transaction_type, status) VALUES "
+            "(NULL, 'A', 50, 'DEPOSIT', 'COMPLETED'), ('A', 'B', 20, 'TRANSFER', 'COMPLETED'), "
+            "('A', 'A', 10, 'WITHDRAW', 'COMPLETED'), (NULL, 'A', 999, 'DEPOSIT', 'FAILED')"
+        ))
+
+    with patch("app.models.database.engine", legacy):
+        await init_db()
+        await init_db()
+
+    async with legacy.connect() as conn:
+        rows = (await conn.execute(text("SELECT account_number, opening_balance FROM accounts ORDER BY id"))).all()
+        indexes = await conn.run_sync(
+            lambda sync_conn: {index["name"] for index in inspect(sync_conn).get_indexes("transactions")}
+        )
+    await legacy.dispose()
+    assert rows == [("A", 110.0), ("B", 0.0)]
+    assert {
+        "ix_transactions_unfinished_created_at",
+        "ix_transactions_created_at_id",
+        "ix_transactions_to_account_processed_at",
+        "ix_transactions_from_account_processed_at",
+    } <= indexes
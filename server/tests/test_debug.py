@@ -0,0 +1,69 @@
+"""Tests for the token-protected sampling profiler endpoint."""
+import threading
+from collections import Counter
+
+import pytest
+
+import app.api.debug as debug
+from app.monitoring.profiler import collapse, sample_stacks
+
+
+def _busy_worker(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_stacks_sees_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name="busy")
+    worker.start()
+    try:
+        stacks = sample_stacks(0.05, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+    busy = [stack for stack in stacks if stack[0] == "busy"]
+    assert busy
+    assert any("_busy_worker" in frame for stack in busy for frame in stack)
+    assert not any("sample_stacks" in frame for stack in stacks for frame in stack)
+
+
+def test_collapse_format():
+    stacks = {("MainThread", "main (a.py:1)", "work (b.py:2)"): 3}
+    assert collapse(Counter(stacks)) == "MainThread;main (a.py:1);work (b.py:2) 3\n"
+
+
+@pytest.mark.asyncio
+async def test_profile_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(debug, "DEBUG_TOKEN", "")
+    response = await client.get("/debug/profile?seconds=0.01")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_requires_token(client, monkeypatch):
+    monkeypatch.setattr(debug, "DEBUG_TOKEN", "secret")
+    response = await client.get("/debug/profile?seconds=0.01", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    response = await client.get("/debug/profile?seconds=0.01")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profile_returns_collapsed_stacks(client, monkeypatch):
+    monkeypatch.setattr(debug, "DEBUG_TOKEN", "secret")
+    response = await client.get("/debug/profile?seconds=0.05", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "MainThread" in response.text
+
+
+@pytest.mark.asyncio
+async def test_profile_rejects_bad_duration(client, monkeypatch):
+    monkeypatch.setattr(debug, "DEBUG_TOKEN", "secret")
+    response = await client.get("/debug/profile?seconds=600", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 422
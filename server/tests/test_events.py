@@ -0,0 +1,44 @@
+"""Tests for the transaction event wire format."""
+import pytest
+
+from app.events import FORMAT_VERSION, decode_event, encode_event
+from app.serialization import dumps
+
+TRANSFER = {
+    "transaction_id": 42,
+    "from_account": "ACC000000001",
+    "to_account": "ACC000000002",
+    "amount": 125.5,
+    "transaction_type": "TRANSFER",
+    "created_at": "2024-05-01T12:00:00.123456",
+}
+
+
+@pytest.mark.parametrize("fmt", ["json", "binary"])
+def test_roundtrip(fmt):
+    assert decode_event(encode_event(TRANSFER, fmt)) == TRANSFER
+
+
+def test_binary_deposit_without_optional_fields():
+    deposit = dict(TRANSFER, from_account=None, transaction_type="DEPOSIT", created_at=None)
+    assert decode_event(encode_event(deposit, "binary")) == deposit
+
+
+def test_binary_is_versioned_and_smaller():
+    encoded = encode_event(TRANSFER, "binary")
+    assert encoded[0] == FORMAT_VERSION
+    assert len(encoded) < len(dumps(TRANSFER)) / 2
+
+
+def test_binary_normalizes_aware_timestamps_to_utc():
+    event = dict(TRANSFER, created_at="2024-05-01T15:00:00+03:00")
+    assert decode_event(encode_event(event, "binary"))["created_at"] == "2024-05-01T12:00:00"
+
+
+def test_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        encode_event(TRANSFER, "avro")
+    with pytest.raises(ValueError):
+        encode_event(dict(TRANSFER, transaction_type="REFUND"), "binary")
+    with pytest.raises(ValueError):
+        decode_event(bytes([FORMAT_VERSION + 1]) + encode_event(TRANSFER, "binary")[1:])
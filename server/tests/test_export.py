@@ -0,0 +1,85 @@
+"""Tests for the streaming transaction export."""
+import csv
+import io
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Transaction
+from app.services.export import EXPORT_COLUMNS, iter_csv
+
+
+async def _seed(db: AsyncSession) -> None:
+    db.add_all([
+        Transaction(to_account="A", amount=10.0, transaction_type="DEPOSIT", status="COMPLETED",
+                    created_at=datetime(2024, 1, 1, 10), processed_at=datetime(2024, 1, 1, 10, 0, 1)),
+        Transaction(from_account="A", to_account="B", amount=2.5, transaction_type="TRANSFER",
+                    status="PENDING", created_at=datetime(2024, 1, 2)),
+        Transaction(to_account="C", amount=1.0, transaction_type="DEPOSIT", status="COMPLETED",
+                    created_at=datetime(2024, 1, 1, 9)),
+        Transaction(to_account="D", amount=1.0, transaction_type="DEPOSIT", status="COMPLETED",
+                    created_at=datetime(2024, 2, 1)),
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_iter_csv_streams_range_in_order(db_session: AsyncSession):
+    await _seed(db_session)
+    chunks = [chunk async for chunk in iter_csv(db_session, datetime(2024, 1, 1), datetime(2024, 2, 1), chunk_size=1)]
+    assert len(chunks) == 3
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert [row["to_account"] for row in rows] == ["C", "A", "B"]
+    assert rows[1]["processed_at"] == "2024-01-01 10:00:01"
+    assert rows[2]["processed_at"] == ""
+
+
+@pytest.mark.asyncio
+async def test_export_csv_endpoint(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    response = await client.get(
+        "/transactions/export", params={"start": "2024-01-01T00:00:00", "end": "2024-01-02T00:00:00"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "transactions_20240101T000000_20240102T000000.csv" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert lines[0] == ",".join(EXPORT_COLUMNS)
+    assert len(lines) == 3
+
+
+@pytest.mark.asyncio
+async def test_export_arrow_endpoint(client: AsyncClient, db_session: AsyncSession):
+    pa = pytest.importorskip("pyarrow")
+    await _seed(db_session)
+    response = await client.get(
+        "/transactions/export",
+        params={"start": "2024-01-01T00:00:00", "end": "2024-02-01T00:00:00", "format": "arrow"}
+    )
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == list(EXPORT_COLUMNS)
+    assert table.column("amount").to_pylist() == [1.0, 10.0, 2.5]
+    assert table.column("processed_at").to_pylist()[1] == datetime(2024, 1, 1, 10, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_export_arrow_without_pyarrow(client: AsyncClient):
+    with patch("app.api.transactions.arrow_available", return_value=False):
+        response = await client.get(
+            "/transactions/export",
+            params={"start": "2024-01-01T00:00:00", "end": "2024-02-01T00:00:00", "format": "arrow"}
+        )
+    assert response.status_code == 501
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_unknown_format(client: AsyncClient):
+    response = await client.get(
+        "/transactions/export",
+        params={"start": "2024-01-01T00:00:00", "end": "2024-02-01T00:00:00", "format": "xml"}
+    )
+    assert response.status_code == 422
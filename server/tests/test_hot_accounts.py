@@ -0,0 +1,51 @@
+"""Tests for the bounded hot-accounts collector and amount histograms."""
+import pytest
+from httpx import AsyncClient
+from prometheus_client import CollectorRegistry, REGISTRY
+
+from app.monitoring.hot_accounts import HotAccounts
+
+
+def test_hot_accounts_keeps_heavy_hitters():
+    hot = HotAccounts(k=2, capacity=3)
+    for account in ["A"] * 10 + ["B"] * 6 + ["C", "D", "E", "F"]:
+        hot.record(account)
+
+    top = hot.top()
+    assert [account for account, _, _ in top] == ["A", "B"]
+    assert top[0][1:] == (10, 0)
+    assert len(hot._counts) == 3
+    # The newest account inherited the evicted minimum as its overcount.
+    assert hot._counts["F"] == [4, 3]
+
+
+def test_hot_accounts_disabled():
+    hot = HotAccounts(k=0)
+    hot.record("A")
+    assert hot.top() == []
+
+
+def test_hot_accounts_collect():
+    hot = HotAccounts(k=1)
+    registry = CollectorRegistry()
+    registry.register(hot)
+    hot.record("A")
+    hot.record("A")
+    hot.record("B")
+    assert registry.get_sample_value("bank_hot_account_transactions", {"account_number": "A"}) == 2
+    assert registry.get_sample_value("bank_hot_account_transactions", {"account_number": "B"}) is None
+
+
+@pytest.mark.asyncio
+async def test_create_account_observes_histogram_without_per_account_series(client: AsyncClient):
+    before = REGISTRY.get_sample_value("bank_account_opening_balance_count") or 0
+    response = await client.post("/accounts/", json={"owner_name": "Histogram", "initial_balance": 75.0})
+    assert response.status_code == 201
+
+    assert REGISTRY.get_sample_value("bank_account_opening_balance_count") == before + 1
+    account_number = response.json()["account_number"]
+    labelled = [
+        sample for metric in REGISTRY.collect() for sample in metric.samples
+        if sample.labels.get("account_number") == account_number
+    ]
+    assert labelled == []
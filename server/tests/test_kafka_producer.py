@@ -1,9 +1,10 @@
-"""Tests for Kafka producer (mocked)."""
+"""Tests for publishing transaction events through the message transport."""
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.services.kafka_producer import send_transaction_event, get_producer
+from app.services.kafka_producer import send_transaction_event, get_transport, republish_transactions
+from app.services.transport import KafkaTransport, MemoryTransport, Record, create_transport
 
 
 @pytest.fixture
@@ -18,20 +19,23 @@ def mock_transaction():
     return t
 
 
+@pytest.fixture
+def memory_transport():
+    transport = MemoryTransport(["bank-transactions"])
+    with patch("app.services.kafka_producer.get_transport", return_value=transport):
+        yield transport
+
+
+def _published(transport: MemoryTransport) -> list[Record]:
+    return transport.poll_batch(100, 0)
+
+
 @pytest.mark.asyncio
-async def test_send_transaction_event(mock_transaction):
-    mock_future = MagicMock()
-    mock_future.get.return_value = Mock(topic="bank-transactions", partition=0, offset=0)
-    mock_producer = MagicMock()
-    mock_producer.send.return_value = mock_future
-
-    with patch("app.services.kafka_producer.get_producer", return_value=mock_producer):
-        await send_transaction_event(mock_transaction)
-
-    mock_producer.send.assert_called_once()
-    call_args = mock_producer.send.call_args
-    assert call_args[0][0] == "bank-transactions"
-    event = call_args[1]["value"]
+async def test_send_transaction_event(mock_transaction, memory_transport):
+    await send_transaction_event(mock_transaction)
+
+    (record,) = _published(memory_transport)
+    event = record.value
     assert event["transaction_id"] == 1
     assert event["from_account"] == "ACC001"
     assert event["to_account"] == "ACC002"
@@ -40,54 +44,144 @@ async def test_send_transaction_event(mock_transaction):
 
 
 @pytest.mark.asyncio
-async def test_send_transaction_event_deposit(mock_transaction):
+async def test_send_transaction_event_deposit(mock_transaction, memory_transport):
     mock_transaction.from_account = None
     mock_transaction.transaction_type = "DEPOSIT"
-    mock_future = MagicMock()
-    mock_future.get.return_value = Mock()
-    mock_producer = MagicMock()
-    mock_producer.send.return_value = mock_future
 
-    with patch("app.services.kafka_producer.get_producer", return_value=mock_producer):
-        await send_transaction_event(mock_transaction)
+    await send_transaction_event(mock_transaction)
 
-    event = mock_producer.send.call_args[1]["value"]
+    event = _published(memory_transport)[0].value
     assert event["from_account"] is None
     assert event["transaction_type"] == "DEPOSIT"
 
 
-def test_get_producer_creates_once():
+@pytest.mark.asyncio
+async def test_republish_transactions_sends_one_batch(mock_transaction, memory_transport):
+    other = Mock(**{attr: getattr(mock_transaction, attr) for attr in (
+        "from_account", "to_account", "amount", "transaction_type", "created_at")}, id=2)
+
+    await republish_transactions([mock_transaction, other])
+
+    records = _published(memory_transport)
+    assert [record.value["transaction_id"] for record in records] == [1, 2]
+    created = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+    assert float(dict(records[0].headers)["accepted_at"]) == created
+
+
+def test_get_transport_creates_once():
     import app.services.kafka_producer as mod
-    old_producer = mod.producer
+    old_transport = mod.transport
     try:
-        mod.producer = None
-        with patch("app.services.kafka_producer.KafkaProducer") as mock_kafka:
-            mock_kafka.return_value = MagicMock()
-            p1 = get_producer()
-            p2 = get_producer()
-            assert p1 is p2
-            mock_kafka.assert_called_once()
+        mod.transport = None
+        with patch("app.services.kafka_producer.create_transport") as create:
+            create.return_value = MagicMock()
+            t1 = get_transport()
+            t2 = get_transport()
+            assert t1 is t2
+            create.assert_called_once()
     finally:
-        mod.producer = old_producer
+        mod.transport = old_transport
 
 
 @pytest.mark.asyncio
 async def test_send_transaction_event_raises_on_failure(mock_transaction):
-    mock_producer = MagicMock()
-    mock_producer.send.return_value.get.side_effect = Exception("Kafka error")
-    with patch("app.services.kafka_producer.get_producer", return_value=mock_producer):
+    transport = MagicMock()
+    transport.publish_batch.side_effect = Exception("Kafka error")
+    with patch("app.services.kafka_producer.get_transport", return_value=transport):
         with pytest.raises(Exception, match="Kafka error"):
             await send_transaction_event(mock_transaction)
 
 
-def test_get_producer_raises_when_kafka_unavailable():
+@pytest.mark.asyncio
+async def test_send_transaction_event_trace_headers(mock_transaction, memory_transport):
+    from prometheus_client import REGISTRY
+
+    def count(stage):
+        return REGISTRY.get_sample_value("bank_transaction_pipeline_seconds_count", {"stage": stage}) or 0.0
+
+    before = count("persist"), count("publish")
+    await send_transaction_event(mock_transaction, accepted_at=1000.0)
+    headers = dict(_published(memory_transport)[0].headers)
+    assert float(headers["accepted_at"]) == 1000.0
+    assert float(headers["published_at"]) > 1000.0
+    assert (count("persist"), count("publish")) == (before[0] + 1, before[1] + 1)
+
+    # Re-published events carry created_at and skip the persist stage
+    await send_transaction_event(mock_transaction)
+    headers = dict(_published(memory_transport)[0].headers)
+    assert float(headers["accepted_at"]) == datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+    assert (count("persist"), count("publish")) == (before[0] + 1, before[1] + 2)
+
+
+def test_kafka_transport_publish_batch_waits_for_acks():
+    producer = MagicMock()
+    producer.send.return_value.get.return_value = Mock(partition=0, offset=7)
+    with patch("app.services.transport.KafkaProducer", return_value=producer) as kafka:
+        transport = KafkaTransport()
+        results = transport.publish_batch("topic", [Record({"a": 1}, [("h", b"1")]), Record({"a": 2})])
+        transport.publish_batch("topic", [Record({"a": 3})])
+    kafka.assert_called_once()
+    assert [call.kwargs["value"] for call in producer.send.call_args_list] == [{"a": 1}, {"a": 2}, {"a": 3}]
+    assert producer.send.call_args_list[0].kwargs["headers"] == [("h", b"1")]
+    assert [r.offset for r in results] == [7, 7]
+
+
+def test_kafka_transport_producer_settings():
+    with patch("app.services.transport.KafkaProducer") as kafka:
+        KafkaTransport(value_serializer=bytes).producer
+    options = kafka.call_args.kwargs
+    assert options["value_serializer"] is bytes
+    assert options["compression_type"] == "lz4"
+    assert options["linger_ms"] == 5
+    assert options["batch_size"] == 16384
+
+
+def test_get_transport_encodes_events():
     import app.services.kafka_producer as mod
-    old_producer = mod.producer
+    old_transport = mod.transport
     try:
-        mod.producer = None
-        with patch("app.services.kafka_producer.KafkaProducer") as mock_kafka:
-            mock_kafka.side_effect = Exception("Connection refused")
-            with pytest.raises(Exception, match="Connection refused"):
-                get_producer()
+        mod.transport = None
+        with patch("app.services.kafka_producer.create_transport") as create:
+            get_transport()
+        assert create.call_args.kwargs["value_serializer"] is mod.encode_event
     finally:
-        mod.producer = old_producer
+        mod.transport = old_transport
+
+
+def test_kafka_transport_raises_when_kafka_unavailable():
+    with patch("app.services.transport.KafkaProducer", side_effect=Exception("Connection refused")):
+        with pytest.raises(Exception, match="Connection refused"):
+            KafkaTransport().publish_batch("topic", [Record({})])
+
+
+def test_kafka_transport_poll_and_commit():
+    consumer = MagicMock()
+    consumer.poll.return_value = {"tp": [Mock(value={"a": 1}, headers=[("h", b"1")])]}
+    with patch("app.services.transport.KafkaConsumer", return_value=consumer) as kafka:
+        transport = KafkaTransport(["topic"], group_id="group")
+        records = transport.poll_batch(10, 100)
+        transport.commit()
+    assert kafka.call_args.kwargs["enable_auto_commit"] is False
+    consumer.poll.assert_called_once_with(timeout_ms=100, max_records=10)
+    assert [(r.value, r.headers) for r in records] == [({"a": 1}, [("h", b"1")])]
+    consumer.commit.assert_called_once()
+
+
+def test_memory_transport_batches_and_commits():
+    transport = MemoryTransport(["topic"])
+    transport.publish_batch("topic", [Record(i) for i in range(5)])
+    transport.publish_batch("other", [Record("x")])
+    assert [r.value for r in transport.poll_batch(3, 0)] == [0, 1, 2]
+    assert transport.committed == 0
+    transport.commit()
+    assert transport.committed == 3
+    assert [r.value for r in transport.poll_batch(10, 0)] == [3, 4]
+    assert transport.poll_batch(10, 10) == []
+    assert transport.pending("other") == 1
+
+
+def test_create_transport():
+    assert isinstance(create_transport(["t"], kind="memory"), MemoryTransport)
+    assert isinstance(create_transport(["t"], "group", kind="kafka"), KafkaTransport)
+    with pytest.raises(ValueError):
+        create_transport(kind="carrier-pigeon")
@@ -0,0 +1,69 @@
+"""Tests for the queue-based JSON logging pipeline."""
+import atexit
+import io
+import json
+import logging
+
+import pytest
+
+from app.logging_config import JsonFormatter, SamplingFilter, parse_sampling, setup_logging
+
+
+def _record(name="app.test", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(_record(transaction_id=7)))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["transaction_id"] == 7
+    assert "args" not in entry
+
+
+def test_parse_sampling():
+    assert parse_sampling("app.a=0.1, app.b=2,") == {"app.a": 0.1, "app.b": 1.0}
+    assert parse_sampling("") == {}
+
+
+def test_sampling_filter_keeps_share_and_all_warnings():
+    sampler = SamplingFilter({"app.services": 0.25})
+    kept = sum(sampler.filter(_record("app.services.kafka_producer")) for _ in range(100))
+    assert kept == 25
+    assert all(sampler.filter(_record("app.services.x", logging.WARNING)) for _ in range(10))
+    assert all(sampler.filter(_record("app.api")) for _ in range(10))
+
+
+def test_setup_logging_writes_json_off_thread(root_logger):
+    stream = io.StringIO()
+    listener = setup_logging(level="INFO", fmt="json", sampling="app.noisy=0", stream=stream)
+    logger = logging.getLogger("app.test")
+    logger.info("sent %s", 1, extra={"transaction_id": 1})
+    logging.getLogger("app.noisy").info("dropped")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    listener.stop()
+    atexit.unregister(listener.stop)
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry["message"] for entry in entries] == ["sent 1", "failed"]
+    assert entries[0]["transaction_id"] == 1
+    assert "ValueError: boom" in entries[1]["exc_info"]
@@ -1,22 +1,42 @@
 """Tests for monitoring metrics."""
+import asyncio
+import gzip
 import pytest
-from unittest.mock import Mock, AsyncMock, MagicMock
+from unittest.mock import AsyncMock, patch
 
 from app.monitoring.metrics import (
     init_metrics,
     metrics_endpoint,
+    metrics_cache,
+    METRICS_CACHE_SECONDS,
     PrometheusMiddleware,
 )
 from fastapi import Request
+from httpx import AsyncClient
+from prometheus_client import Counter, REGISTRY
 
 
 def test_init_metrics():
     init_metrics()
 
 
-def test_metrics_endpoint():
-    request = Mock(spec=Request)
-    response = metrics_endpoint(request)
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.fixture
+def fresh_cache():
+    metrics_cache.clear()
+    yield metrics_cache
+    metrics_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(fresh_cache):
+    response = await metrics_endpoint(_request())
     assert response.status_code == 200
     assert "text/plain" in response.media_type
     body = getattr(response, "body", getattr(response, "content", b""))
@@ -24,6 +44,45 @@ def test_metrics_endpoint():
     assert b"#" in body or b"http" in body
 
 
+@pytest.mark.asyncio
+async def test_metrics_endpoint_caches_rendering(fresh_cache):
+    counter = Counter("bank_test_cached_renders", "test counter")
+    try:
+        first = (await metrics_endpoint(_request())).body
+        counter.inc()
+        assert (await metrics_endpoint(_request())).body == first
+
+        fresh_cache.ttl = 0
+        assert b"bank_test_cached_renders_total 1.0" in (await metrics_endpoint(_request())).body
+    finally:
+        fresh_cache.ttl = METRICS_CACHE_SECONDS
+        REGISTRY.unregister(counter)
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_renders_once_for_concurrent_scrapes(fresh_cache):
+    with patch("app.monitoring.metrics.render_metrics", return_value=b"# rendered\n") as render:
+        responses = await asyncio.gather(*(metrics_endpoint(_request()) for _ in range(5)))
+    assert render.call_count == 1
+    assert all(r.body == b"# rendered\n" for r in responses)
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_gzip(fresh_cache):
+    plain = (await metrics_endpoint(_request())).body
+    response = await metrics_endpoint(_request(accept_encoding="gzip, deflate"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == plain
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_openmetrics(fresh_cache):
+    response = await metrics_endpoint(_request(accept="application/openmetrics-text; version=1.0.0"))
+    assert response.media_type.startswith("application/openmetrics-text")
+    assert response.body.endswith(b"# EOF\n")
+    assert "Accept" in response.headers["vary"]
+
+
 @pytest.mark.asyncio
 async def test_prometheus_middleware_passes_non_http():
     app = AsyncMock()
@@ -55,3 +114,40 @@ async def test_prometheus_middleware_records_http():
     call_args = send.call_args_list[0][0][0]
     assert call_args.get("type") == "http.response.start"
     assert call_args.get("status") == 200
+
+
+def _requests(method: str, endpoint: str, status: str) -> float:
+    labels = {"method": method, "endpoint": endpoint, "status": status}
+    return REGISTRY.get_sample_value("http_requests_total", labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_prometheus_middleware_labels_route_template(client: AsyncClient):
+    before = _requests("GET", "/accounts/{account_number}", "404")
+    before_other = _requests("GET", "other", "404")
+
+    await client.get("/accounts/UNKNOWN1")
+    await client.get("/accounts/UNKNOWN2")
+    await client.get("/no/such/path")
+
+    assert _requests("GET", "/accounts/{account_number}", "404") == before + 2
+    assert _requests("GET", "other", "404") == before_other + 1
+    assert _requests("GET", "/accounts/UNKNOWN1", "404") == 0
+
+
+@pytest.mark.asyncio
+async def test_prometheus_middleware_resolves_plain_starlette_routes(client: AsyncClient):
+    before = _requests("GET", "/openapi.json", "200")
+    await client.get("/openapi.json")
+    assert _requests("GET", "/openapi.json", "200") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_prometheus_middleware_folds_unknown_methods():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 405})
+
+    middleware = PrometheusMiddleware(app)
+    before = _requests("other", "other", "405")
+    await middleware({"type": "http", "method": "BREW", "path": "/coffee"}, AsyncMock(), AsyncMock())
+    assert _requests("other", "other", "405") == before + 1
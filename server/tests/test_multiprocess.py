@@ -0,0 +1,85 @@
+"""Tests for metrics aggregation across worker processes."""
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi import Request
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.monitoring import multiprocess
+from app.monitoring.metrics import metrics_cache, metrics_endpoint
+
+WORKER = """
+import os
+from prometheus_client import Counter, Gauge, Histogram
+Counter('bank_test_events', 'events', ['kind']).labels(kind='a').inc({count})
+Histogram('bank_test_amount', 'amount', buckets=(10, float('inf'))).observe({count})
+Gauge('bank_test_live', 'live', multiprocess_mode='livemax').set({count})
+print(os.getpid())
+"""
+
+
+def _run_worker(path: str, count: int) -> int:
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=path)
+    out = subprocess.run(
+        [sys.executable, "-c", WORKER.format(count=count)], env=env, check=True, capture_output=True, text=True
+    )
+    return int(out.stdout)
+
+
+def _samples(path: str) -> dict:
+    text = multiprocess.collect_latest(path).decode()
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text) for sample in family.samples
+    }
+
+
+def test_collect_merges_workers_and_compacts_on_exit(tmp_path):
+    path = str(tmp_path)
+    first = _run_worker(path, 3)
+    second = _run_worker(path, 20)
+
+    samples = _samples(path)
+    assert samples[("bank_test_events_total", (("kind", "a"),))] == 23
+    assert samples[("bank_test_amount_bucket", (("le", "10.0"),))] == 1
+    assert samples[("bank_test_amount_count", ())] == 2
+    assert samples[("bank_test_live", ())] == 20
+
+    multiprocess.worker_exit(first, path)
+    multiprocess.worker_exit(second, path)
+    assert sorted(f for f in os.listdir(path) if f.endswith(".db")) == ["counter_archive.db", "histogram_archive.db"]
+
+    samples = _samples(path)
+    assert samples[("bank_test_events_total", (("kind", "a"),))] == 23
+    assert samples[("bank_test_amount_sum", ())] == 23
+    assert ("bank_test_live", ()) not in samples
+
+    # A new worker adds to the archived totals.
+    _run_worker(path, 1)
+    assert _samples(path)[("bank_test_events_total", (("kind", "a"),))] == 24
+
+
+def test_reset_removes_previous_run(tmp_path):
+    path = str(tmp_path / "metrics")
+    multiprocess.reset(path)
+    _run_worker(path, 1)
+    multiprocess.reset(path)
+    assert [f for f in os.listdir(path) if f.endswith(".db")] == []
+
+
+def test_worker_exit_without_dir_is_noop():
+    with patch.object(multiprocess, "PROMETHEUS_MULTIPROC_DIR", None):
+        multiprocess.worker_exit(12345)
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_uses_multiprocess_dir(tmp_path):
+    _run_worker(str(tmp_path), 5)
+    metrics_cache.clear()
+    with patch.object(multiprocess, "PROMETHEUS_MULTIPROC_DIR", str(tmp_path)):
+        response = await metrics_endpoint(Request({"type": "http", "headers": []}))
+    metrics_cache.clear()
+    assert b'bank_test_events_total{kind="a"} 5.0' in response.body
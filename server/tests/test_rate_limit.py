@@ -0,0 +1,153 @@
+"""Tests for rate limiting and load shedding."""
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.middleware.rate_limit import RateLimitMiddleware, TokenBucket, parse_route_limits
+from app.monitoring.load import LoadMonitor, load_monitor
+
+
+def _app(**kwargs) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/accounts/")
+    async def list_accounts():
+        return []
+
+    @app.post("/transactions/")
+    async def create_transaction():
+        return {}
+
+    kwargs.setdefault("enabled", True)
+    kwargs.setdefault("route_limits", {})
+    kwargs.setdefault("monitor", LoadMonitor())
+    app.add_middleware(RateLimitMiddleware, **kwargs)
+    return app
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(burst=2, now=0.0)
+    assert bucket.take(1.0, 2, now=0.0) == 0
+    assert bucket.take(1.0, 2, now=0.0) == 0
+    assert bucket.take(1.0, 2, now=0.0) == pytest.approx(1.0)
+    assert bucket.take(1.0, 2, now=0.5) == pytest.approx(0.5)
+    assert bucket.take(1.0, 2, now=1.0) == 0
+    # Refill is capped at the burst size.
+    bucket.take(1.0, 2, now=100.0)
+    assert bucket.tokens == 1
+
+
+def test_parse_route_limits():
+    assert parse_route_limits("POST /transactions/=20:40, get /accounts=5,") == {
+        ("POST", "/transactions"): (20.0, 40.0),
+        ("GET", "/accounts"): (5.0, 5.0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_client_limit_returns_429_with_retry_after():
+    app = _app(client_rate=0.5, client_burst=2)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        assert (await ac.get("/accounts/")).status_code == 200
+        assert (await ac.get("/accounts/")).status_code == 200
+        response = await ac.get("/accounts/")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert response.json()["detail"] == "Rate limit exceeded"
+        # Health checks and metrics scrapes are never limited.
+        assert (await ac.get("/health")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_route_limit_applies_per_method_and_prefix():
+    app = _app(client_rate=100, client_burst=100, route_limits={("POST", "/transactions"): (1.0, 1.0)})
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        assert (await ac.post("/transactions/")).status_code == 200
+        assert (await ac.post("/transactions/")).status_code == 429
+        assert (await ac.get("/accounts/")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_forwarded_client_gets_own_bucket():
+    app = _app(client_rate=1, client_burst=1, trust_forwarded=True)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        assert (await ac.get("/accounts/", headers={"X-Forwarded-For": "10.0.0.1"})).status_code == 200
+        assert (await ac.get("/accounts/", headers={"X-Forwarded-For": "10.0.0.1"})).status_code == 429
+        assert (await ac.get("/accounts/", headers={"X-Forwarded-For": "10.0.0.2, 10.0.0.1"})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_disabled_middleware_passes_through():
+    app = _app(enabled=False, client_rate=1, client_burst=1)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        for _ in range(3):
+            assert (await ac.get("/accounts/")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_overloaded():
+    monitor = LoadMonitor()
+    app = _app(monitor=monitor, max_loop_lag=0.5, max_pool_wait=1.0)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        monitor.sample_lag(0.6)
+        response = await ac.get("/accounts/")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert (await ac.get("/health")).status_code == 200
+
+        monitor.sample_lag(0.0)
+        monitor.pool_wait = 2.0
+        assert (await ac.get("/accounts/")).status_code == 503
+        monitor.pool_wait = 0.0
+        assert (await ac.get("/accounts/")).status_code == 200
+
+
+def test_bucket_table_is_capped():
+    middleware = RateLimitMiddleware(None, enabled=True, route_limits={}, max_clients=2)
+    for client in ("a", "b", "a", "c"):
+        middleware._take((client,), 1.0, 1.0, now=0.0)
+    assert list(middleware._buckets) == [("a",), ("c",)]
+
+
+def test_load_monitor_pool_wait_decays():
+    monitor = LoadMonitor()
+    monitor.observe_pool_wait(1.0)
+    assert monitor.pool_wait == pytest.approx(0.2)
+    monitor.sample_lag(0.05)
+    assert monitor.loop_lag == 0.05
+    assert monitor.pool_wait == pytest.approx(0.16)
+
+
+@pytest.mark.asyncio
+async def test_load_monitor_measures_loop_lag():
+    monitor = LoadMonitor(interval=0.01)
+    lag_before = REGISTRY.get_sample_value("bank_event_loop_lag_seconds_sum")
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.005)
+    # Block the loop so the monitor's sleep wakes up late.
+    time.sleep(0.05)
+    await asyncio.sleep(0.001)
+    task.cancel()
+    assert monitor.loop_lag > 0.02
+    assert REGISTRY.get_sample_value("bank_event_loop_lag_seconds_sum") - lag_before > 0.02
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_recorded_once_per_checkout(db_session):
+    with patch.object(load_monitor, "observe_pool_wait") as observe:
+        await db_session.execute(text("SELECT 1"))
+        await db_session.execute(text("SELECT 2"))
+        assert observe.call_count == 1
+        await db_session.commit()
+        await db_session.execute(text("SELECT 3"))
+        assert observe.call_count == 2
+    assert observe.call_args.args[0] >= 0
@@ -0,0 +1,88 @@
+"""Tests for the balance reconciliation job."""
+import json
+import numpy as np
+import pytest
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs import reconciliation
+from app.jobs.reconciliation import apply_transactions, reconcile_balances, DEPOSIT, WITHDRAW, TRANSFER
+from app.models.database import Account, Transaction
+from tests.conftest import TestingSessionLocal
+
+
+async def _seed(db: AsyncSession) -> None:
+    db.add_all([
+        Account(account_number="A", owner_name="A", balance=150.0, opening_balance=100.0),
+        Account(account_number="B", owner_name="B", balance=70.0, opening_balance=0.0),
+        Account(account_number="C", owner_name="C", balance=999.0, opening_balance=10.0),
+    ])
+    db.add_all([
+        Transaction(to_account="A", amount=100.0, transaction_type="DEPOSIT", status="COMPLETED"),
+        Transaction(from_account="A", to_account="B", amount=80.0, transaction_type="TRANSFER", status="COMPLETED"),
+        Transaction(from_account="B", to_account="B", amount=10.0, transaction_type="WITHDRAW", status="COMPLETED"),
+        Transaction(to_account="A", amount=30.0, transaction_type="DEPOSIT", status="COMPLETED"),
+        Transaction(to_account="C", amount=500.0, transaction_type="DEPOSIT", status="PENDING"),
+        Transaction(to_account="GONE", amount=1.0, transaction_type="DEPOSIT", status="COMPLETED"),
+    ])
+    await db.commit()
+
+
+def test_apply_transactions_groups_repeated_ids():
+    expected = np.zeros(4)
+    chunk = np.array([
+        [1, -1, 10.0, DEPOSIT],
+        [1, -1, 5.0, DEPOSIT],
+        [2, 1, 3.0, TRANSFER],
+        [3, 3, 1.0, WITHDRAW],
+        [-1, -1, 7.0, DEPOSIT],
+    ])
+    orphans = apply_transactions(expected, chunk)
+    assert expected.tolist() == [0.0, 12.0, 3.0, -1.0]
+    assert orphans == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_balances(db_session: AsyncSession):
+    await _seed(db_session)
+    report = await reconcile_balances(db_session, chunk_size=2)
+
+    assert report.accounts == 3
+    assert report.transactions == 5
+    assert report.orphaned_transactions == 1
+    assert report.drifted_accounts == 1
+    drift = report.drifts[0]
+    assert drift.account_number == "C"
+    assert drift.expected == 10.0
+    assert drift.drift == 989.0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_balances_caps_report(db_session: AsyncSession):
+    db_session.add_all([
+        Account(account_number=f"X{i}", owner_name="X", balance=1.0, opening_balance=0.0)
+        for i in range(3)
+    ])
+    await db_session.commit()
+    report = await reconcile_balances(db_session, max_reported=2)
+    assert report.drifted_accounts == 3
+    assert len(report.drifts) == 2
+
+
+@pytest.mark.asyncio
+async def test_main_writes_report(db_session: AsyncSession, tmp_path):
+    await _seed(db_session)
+    output = tmp_path / "drift.json"
+    with patch("app.jobs.reconciliation.AsyncSessionLocal", TestingSessionLocal):
+        code = await reconciliation.main(["--output", str(output)])
+    assert code == 1
+    data = json.loads(output.read_text())
+    assert data["drifts"][0]["account_number"] == "C"
+
+
+@pytest.mark.asyncio
+async def test_main_prints_clean_report(capsys):
+    with patch("app.jobs.reconciliation.AsyncSessionLocal", TestingSessionLocal):
+        code = await reconciliation.main([])
+    assert code == 0
+    assert json.loads(capsys.readouterr().out)["accounts"] == 0
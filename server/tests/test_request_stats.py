@@ -0,0 +1,80 @@
+"""Tests for per-request DB time and query count instrumentation."""
+import logging
+import pytest
+from unittest.mock import AsyncMock
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.monitoring.request_stats import RequestStatsMiddleware, current_stats, request_stage
+from tests.conftest import TestingSessionLocal
+
+
+def _sample(name: str, endpoint: str) -> float:
+    return REGISTRY.get_sample_value(name, {"endpoint": endpoint}) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_and_histograms(client: AsyncClient):
+    created = await client.post("/accounts/", json={"owner_name": "Timing", "initial_balance": 1.0})
+    endpoint = "/accounts/{account_number}"
+    before = _sample("http_request_db_queries_count", endpoint)
+
+    response = await client.get(f"/accounts/{created.json()['account_number']}")
+    header = response.headers["server-timing"]
+    assert header.startswith("db;dur=")
+    assert '"1 queries"' in header
+    assert "total;dur=" in header
+    assert _sample("http_request_db_queries_count", endpoint) == before + 1
+    assert _sample("http_request_db_queries_sum", endpoint) >= 1
+
+
+def _app(queries: int):
+    async def app(scope, receive, send):
+        with request_stage("work"):
+            async with TestingSessionLocal() as session:
+                for _ in range(queries):
+                    await session.execute(text("SELECT 1"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_counts_queries_and_stages():
+    middleware = RequestStatsMiddleware(_app(3), query_budget=0)
+    send = AsyncMock()
+    await middleware({"type": "http", "method": "GET", "path": "/x"}, AsyncMock(), send)
+
+    headers = dict(send.call_args_list[0].args[0]["headers"])
+    timing = headers[b"server-timing"].decode()
+    assert '"3 queries"' in timing
+    assert "work;dur=" in timing
+    assert current_stats.get() is None
+
+
+@pytest.mark.asyncio
+async def test_query_budget_logs_once_per_interval(caplog):
+    middleware = RequestStatsMiddleware(_app(3), query_budget=2)
+    before = REGISTRY.get_sample_value(
+        "http_request_query_budget_exceeded_total", {"endpoint": "other"}
+    ) or 0.0
+    with caplog.at_level(logging.WARNING, logger="app.monitoring.request_stats"):
+        for _ in range(2):
+            await middleware({"type": "http", "method": "GET", "path": "/x"}, AsyncMock(), AsyncMock())
+
+    warnings = [r for r in caplog.records if "Possible N+1" in r.getMessage()]
+    assert len(warnings) == 1
+    assert "ran 3 queries (budget 2)" in warnings[0].getMessage()
+    assert REGISTRY.get_sample_value(
+        "http_request_query_budget_exceeded_total", {"endpoint": "other"}
+    ) == before + 2
+
+
+@pytest.mark.asyncio
+async def test_queries_outside_requests_are_ignored():
+    async with TestingSessionLocal() as session:
+        await session.execute(text("SELECT 1"))
+    with request_stage("idle"):
+        pass
+    assert current_stats.get() is None
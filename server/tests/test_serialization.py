@@ -0,0 +1,43 @@
+"""Tests for the JSON backend used by responses, events and bulk import."""
+from datetime import datetime
+
+import pytest
+
+from app import serialization
+from app.main import app
+from app.serialization import BACKENDS, FastJSONResponse, dumps, loads
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+def test_backends_agree(name):
+    backend_dumps, backend_loads = BACKENDS[name]
+    value = {"id": 1, "owner_name": "Пётр", "balance": 10.5, "created_at": datetime(2024, 1, 2, 3, 4, 5)}
+    encoded = backend_dumps(value)
+    assert isinstance(encoded, bytes)
+    assert backend_loads(encoded) == {**value, "created_at": "2024-01-02T03:04:05"}
+    assert backend_loads(encoded.decode()) == backend_loads(encoded)
+
+
+def test_auto_prefers_orjson():
+    expected = "orjson" if "orjson" in BACKENDS else "stdlib"
+    assert serialization._choose("auto") == expected
+    assert serialization._choose("stdlib") == "stdlib"
+    with pytest.raises(RuntimeError):
+        serialization._choose("simdjson")
+
+
+def test_roundtrip_with_selected_backend():
+    assert loads(dumps({"a": [1, 2.5, None, True]})) == {"a": [1, 2.5, None, True]}
+
+
+def test_app_uses_fast_response():
+    assert app.router.default_response_class is FastJSONResponse
+    assert FastJSONResponse({"ok": True}).body == dumps({"ok": True})
+
+
+@pytest.mark.asyncio
+async def test_account_response_is_json(client):
+    created = await client.post("/accounts/", json={"owner_name": "Ann Lee", "initial_balance": 5})
+    response = await client.get("/accounts/")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()[0]["account_number"] == created.json()["account_number"]
@@ -0,0 +1,83 @@
+"""Tests for the statement generation job."""
+import json
+import pytest
+from datetime import date, datetime
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs import statements
+from app.jobs.statements import generate_statements
+from app.models.database import Transaction
+from tests.conftest import TestingSessionLocal
+
+
+async def _seed(db: AsyncSession) -> None:
+    def tx(**kwargs):
+        return Transaction(status="COMPLETED", processed_at=datetime(2024, 1, 10, 9, 30), **kwargs)
+
+    db.add_all([
+        tx(to_account="A", amount=100.0, transaction_type="DEPOSIT"),
+        tx(from_account="A", to_account="B", amount=40.0, transaction_type="TRANSFER"),
+        tx(from_account="C", to_account="C", amount=5.0, transaction_type="WITHDRAW"),
+        tx(to_account="D", amount=1.0, transaction_type="DEPOSIT"),
+        Transaction(to_account="A", amount=7.0, transaction_type="DEPOSIT", status="PENDING"),
+        Transaction(to_account="A", amount=9.0, transaction_type="DEPOSIT", status="COMPLETED",
+                    processed_at=datetime(2024, 2, 1)),
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_generate_statements_inline(db_session: AsyncSession, tmp_path):
+    await _seed(db_session)
+    summary = await generate_statements(
+        db_session, date(2024, 1, 1), date(2024, 2, 1), str(tmp_path), workers=0, batch_accounts=2
+    )
+
+    assert summary["accounts"] == 4
+    assert summary["transactions"] == 5
+    assert sorted(p.name for p in tmp_path.glob("*.txt")) == ["A.txt", "B.txt", "C.txt", "D.txt"]
+
+    text_a = (tmp_path / "A.txt").read_text()
+    assert "Credits: 100.00" in text_a
+    assert "Debits: 40.00" in text_a
+    assert "Net: 60.00" in text_a
+    assert ",TRANSFER,B,-40.00" in text_a
+    assert "Net: -5.00" in (tmp_path / "C.txt").read_text()
+
+    checkpoint = json.loads((tmp_path / statements.CHECKPOINT_FILE).read_text())
+    assert checkpoint == {"period": "2024-01-01..2024-02-01", "last_account": "D"}
+
+
+@pytest.mark.asyncio
+async def test_generate_statements_resumes_from_checkpoint(db_session: AsyncSession, tmp_path):
+    await _seed(db_session)
+    statements._write_checkpoint(str(tmp_path), "2024-01-01..2024-02-01", "B")
+
+    summary = await generate_statements(
+        db_session, date(2024, 1, 1), date(2024, 2, 1), str(tmp_path), workers=0
+    )
+
+    assert summary["accounts"] == 2
+    assert sorted(p.name for p in tmp_path.glob("*.txt")) == ["C.txt", "D.txt"]
+
+
+@pytest.mark.asyncio
+async def test_generate_statements_process_pool(db_session: AsyncSession, tmp_path):
+    await _seed(db_session)
+    summary = await generate_statements(
+        db_session, date(2024, 1, 1), date(2024, 2, 1), str(tmp_path), workers=1, batch_accounts=1
+    )
+    assert summary["accounts"] == 4
+    assert (tmp_path / "B.txt").read_text().count("\n2024-01-10") == 1
+
+
+@pytest.mark.asyncio
+async def test_main(db_session: AsyncSession, tmp_path, capsys):
+    await _seed(db_session)
+    with patch("app.jobs.statements.AsyncSessionLocal", TestingSessionLocal):
+        code = await statements.main([
+            "--start", "2024-01-01", "--end", "2024-02-01", "--out", str(tmp_path), "--workers", "0"
+        ])
+    assert code == 0
+    assert json.loads(capsys.readouterr().out)["accounts"] == 4
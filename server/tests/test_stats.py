@@ -0,0 +1,64 @@
+"""Tests for the /stats endpoint."""
+import pytest
+from datetime import datetime
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import TransactionRollup
+
+
+async def _seed(db: AsyncSession) -> None:
+    def rollup(granularity, minute, tx_type="DEPOSIT", status="COMPLETED", count=1, amount=10.0):
+        return TransactionRollup(
+            granularity=granularity,
+            bucket_start=datetime(2024, 1, 1, 10, minute),
+            transaction_type=tx_type,
+            status=status,
+            count=count,
+            amount=amount,
+        )
+
+    db.add_all([
+        rollup("minute", 0, count=2, amount=20.0),
+        rollup("minute", 1, tx_type="TRANSFER", count=3, amount=30.0),
+        rollup("minute", 2, status="FAILED"),
+        rollup("hour", 0, count=6, amount=60.0),
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_stats_latest_buckets(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    response = await client.get("/stats/", params={"limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [b["bucket_start"] for b in data] == ["2024-01-01T10:01:00", "2024-01-01T10:02:00"]
+
+
+@pytest.mark.asyncio
+async def test_stats_filters(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    response = await client.get("/stats/", params={
+        "since": "2024-01-01T10:00:00",
+        "until": "2024-01-01T10:02:00",
+        "transaction_type": "DEPOSIT",
+        "status": "COMPLETED",
+    })
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["count"] == 2
+    assert data[0]["amount"] == 20.0
+
+
+@pytest.mark.asyncio
+async def test_stats_hourly(client: AsyncClient, db_session: AsyncSession):
+    await _seed(db_session)
+    data = (await client.get("/stats/", params={"granularity": "hour"})).json()
+    assert [(b["granularity"], b["count"]) for b in data] == [("hour", 6)]
+
+
+@pytest.mark.asyncio
+async def test_stats_rejects_unknown_granularity(client: AsyncClient):
+    response = await client.get("/stats/", params={"granularity": "day"})
+    assert response.status_code == 422
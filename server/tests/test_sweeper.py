@@ -0,0 +1,119 @@
+"""Tests for the stuck-transaction sweeper."""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Transaction
+from app.monitoring.metrics import stuck_transactions_gauge
+from app.services import sweeper
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+async def _add(db: AsyncSession, status: str, age_seconds: int) -> int:
+    tx = Transaction(
+        to_account="ACC",
+        amount=1.0,
+        transaction_type="DEPOSIT",
+        status=status,
+        created_at=NOW - timedelta(seconds=age_seconds),
+    )
+    db.add(tx)
+    await db.commit()
+    return tx.id
+
+
+async def _status(db: AsyncSession, tx_id: int) -> str:
+    db.expire_all()
+    return (await db.execute(select(Transaction.status).where(Transaction.id == tx_id))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_sweep_republishes_and_fails(db_session: AsyncSession):
+    fresh = await _add(db_session, "PENDING", 5)
+    stuck = await _add(db_session, "PENDING", sweeper.STUCK_AFTER_SECONDS + 10)
+    expired = await _add(db_session, "PENDING", sweeper.STUCK_FAIL_AFTER_SECONDS + 10)
+    processing = await _add(db_session, "PROCESSING", sweeper.STUCK_FAIL_AFTER_SECONDS + 10)
+    done = await _add(db_session, "COMPLETED", sweeper.STUCK_FAIL_AFTER_SECONDS + 10)
+
+    with patch("app.services.sweeper.republish_transactions", new_callable=AsyncMock) as send:
+        result = await sweeper.sweep_stuck_transactions(db_session, now=NOW)
+
+    assert result["stuck"] == {"PENDING": 2, "PROCESSING": 1}
+    assert result["failed"] == 1
+    assert result["republished"] == 1
+    (published,), = [call.args for call in send.call_args_list]
+    assert [transaction.id for transaction in published] == [stuck]
+    assert stuck_transactions_gauge.labels(status="PENDING")._value.get() == 2
+
+    assert await _status(db_session, fresh) == "PENDING"
+    assert await _status(db_session, stuck) == "PENDING"
+    assert await _status(db_session, expired) == "FAILED"
+    assert await _status(db_session, processing) == "PROCESSING"
+    assert await _status(db_session, done) == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_sweep_fails_in_batches(db_session: AsyncSession):
+    for _ in range(5):
+        await _add(db_session, "PENDING", sweeper.STUCK_FAIL_AFTER_SECONDS + 1)
+
+    with patch("app.services.sweeper.republish_transactions", new_callable=AsyncMock):
+        result = await sweeper.sweep_stuck_transactions(db_session, now=NOW, batch_size=2)
+
+    assert result["failed"] == 5
+    remaining = await db_session.execute(select(Transaction).where(Transaction.status != "FAILED"))
+    assert remaining.scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_sweep_backs_off_between_republishes(db_session: AsyncSession):
+    stuck = await _add(db_session, "PENDING", sweeper.STUCK_AFTER_SECONDS + 10)
+
+    with patch("app.services.sweeper.republish_transactions", new_callable=AsyncMock) as send:
+        first = await sweeper.sweep_stuck_transactions(db_session, now=NOW)
+        again = await sweeper.sweep_stuck_transactions(
+            db_session, now=NOW + timedelta(seconds=sweeper.SWEEP_INTERVAL_SECONDS)
+        )
+        later = await sweeper.sweep_stuck_transactions(
+            db_session, now=NOW + timedelta(seconds=sweeper.REPUBLISH_INTERVAL_SECONDS + 1)
+        )
+
+    assert (first["republished"], again["republished"], later["republished"]) == (1, 0, 1)
+    assert send.await_count == 2
+    db_session.expire_all()
+    stamped = (await db_session.execute(select(Transaction.republished_at).where(Transaction.id == stuck))).scalar_one()
+    assert stamped == NOW + timedelta(seconds=sweeper.REPUBLISH_INTERVAL_SECONDS + 1)
+
+
+@pytest.mark.asyncio
+async def test_sweep_clears_stamp_when_publish_fails(db_session: AsyncSession):
+    stuck = await _add(db_session, "PENDING", sweeper.STUCK_AFTER_SECONDS + 10)
+
+    with patch("app.services.sweeper.republish_transactions", AsyncMock(side_effect=RuntimeError("broker down"))):
+        result = await sweeper.sweep_stuck_transactions(db_session, now=NOW)
+
+    assert result["republished"] == 0
+    db_session.expire_all()
+    stamped = (await db_session.execute(select(Transaction.republished_at).where(Transaction.id == stuck))).scalar_one()
+    assert stamped is None
+
+
+@pytest.mark.asyncio
+async def test_run_sweeper_survives_errors():
+    calls = 0
+
+    async def failing_sweep(db):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise asyncio.CancelledError
+        raise RuntimeError("db down")
+
+    with patch("app.services.sweeper.sweep_stuck_transactions", side_effect=failing_sweep):
+        with pytest.raises(asyncio.CancelledError):
+            await sweeper.run_sweeper(interval=0)
+    assert calls == 2
@@ -0,0 +1,138 @@
+"""Tests for per-account velocity limits."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+
+from app.services.velocity import (
+    LocalVelocityBackend,
+    RedisVelocityBackend,
+    VelocityLimiter,
+    velocity_limiter,
+)
+
+
+@pytest.mark.asyncio
+async def test_local_backend_count_limit_slides():
+    backend = LocalVelocityBackend(window_seconds=60, buckets=6)
+    assert await backend.add_if_within("A", 1.0, 2, 0, now=0.0)
+    assert await backend.add_if_within("A", 1.0, 2, 0, now=15.0)
+    assert not await backend.add_if_within("A", 1.0, 2, 0, now=30.0)
+    # The first bucket has left the window.
+    assert await backend.add_if_within("A", 1.0, 2, 0, now=61.0)
+    assert await backend.add_if_within("B", 1.0, 2, 0, now=61.0)
+
+
+@pytest.mark.asyncio
+async def test_local_backend_amount_limit():
+    backend = LocalVelocityBackend(window_seconds=60, buckets=6)
+    assert await backend.add_if_within("A", 70.0, 0, 100.0, now=0.0)
+    assert not await backend.add_if_within("A", 40.0, 0, 100.0, now=1.0)
+    assert await backend.add_if_within("A", 30.0, 0, 100.0, now=2.0)
+
+
+@pytest.mark.asyncio
+async def test_local_backend_refund_frees_budget():
+    backend = LocalVelocityBackend(window_seconds=60, buckets=6)
+    assert await backend.add_if_within("A", 70.0, 1, 100.0, now=0.0)
+    await backend.refund("A", 70.0, now=0.0)
+    assert await backend.add_if_within("A", 90.0, 1, 100.0, now=1.0)
+    # A late refund for a bucket that has since been reused is ignored.
+    assert await backend.add_if_within("A", 90.0, 1, 100.0, now=61.0)
+    await backend.refund("A", 90.0, now=1.0)
+    assert not await backend.add_if_within("A", 5.0, 1, 100.0, now=62.0)
+
+
+@pytest.mark.asyncio
+async def test_local_backend_evicts_lru_and_idle_accounts():
+    backend = LocalVelocityBackend(window_seconds=60, buckets=6, max_accounts=2)
+    await backend.add_if_within("A", 1.0, 5, 0, now=0.0)
+    await backend.add_if_within("B", 1.0, 5, 0, now=1.0)
+    await backend.add_if_within("C", 1.0, 5, 0, now=2.0)
+    assert len(backend) == 2
+    assert "A" not in backend._windows
+
+    await backend.add_if_within("D", 1.0, 5, 0, now=100.0)
+    assert list(backend._windows) == ["D"]
+
+
+@pytest.mark.asyncio
+async def test_limiter_disabled_by_default():
+    limiter = VelocityLimiter(LocalVelocityBackend(), max_count=0, max_amount=0)
+    assert not limiter.enabled
+    for _ in range(100):
+        assert await limiter.check("A", 1e9, "WITHDRAW")
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_runs_script():
+    script = AsyncMock(side_effect=[1, 0])
+    client = MagicMock()
+    client.register_script.return_value = script
+    backend = RedisVelocityBackend(window_seconds=60, buckets=6, client=client)
+
+    assert await backend.add_if_within("A", 5.0, 3, 0, now=125.0)
+    assert not await backend.add_if_within("A", 5.0, 3, 0, now=126.0)
+    kwargs = script.call_args.kwargs
+    assert kwargs["keys"] == ["velocity:{A}"]
+    assert kwargs["args"] == [12, 6, 5.0, 3, 0, 61]
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_refund_runs_script():
+    scripts = [AsyncMock(), AsyncMock()]
+    client = MagicMock()
+    client.register_script.side_effect = scripts
+    backend = RedisVelocityBackend(window_seconds=60, buckets=6, client=client)
+
+    await backend.refund("A", 5.0, now=125.0)
+    scripts[1].assert_awaited_once_with(keys=["velocity:{A}"], args=[12, -5.0])
+
+
+def test_redis_backend_requires_package():
+    with patch.dict("sys.modules", {"redis": None, "redis.asyncio": None}):
+        with pytest.raises(RuntimeError, match="redis package"):
+            RedisVelocityBackend()
+
+
+@pytest.mark.asyncio
+async def test_create_transaction_rejects_burst(client: AsyncClient):
+    account = (await client.post(
+        "/accounts/", json={"owner_name": "Burst", "initial_balance": 1000.0}
+    )).json()["account_number"]
+    withdraw = {
+        "from_account": account,
+        "to_account": account,
+        "amount": 10.0,
+        "transaction_type": "WITHDRAW",
+    }
+
+    with patch.object(velocity_limiter, "backend", LocalVelocityBackend()), \
+            patch.object(velocity_limiter, "max_count", 2):
+        assert (await client.post("/transactions/", json=withdraw)).status_code == 202
+        assert (await client.post("/transactions/", json=withdraw)).status_code == 202
+        response = await client.post("/transactions/", json=withdraw)
+
+    assert response.status_code == 429
+    assert "Velocity limit" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_refunds_velocity_budget(client: AsyncClient):
+    account = (await client.post(
+        "/accounts/", json={"owner_name": "Refund", "initial_balance": 1000.0}
+    )).json()["account_number"]
+    withdraw = {
+        "from_account": account,
+        "to_account": account,
+        "amount": 10.0,
+        "transaction_type": "WITHDRAW",
+    }
+
+    with patch.object(velocity_limiter, "backend", LocalVelocityBackend()), \
+            patch.object(velocity_limiter, "max_count", 1):
+        with patch("sqlalchemy.ext.asyncio.AsyncSession.commit", AsyncMock(side_effect=RuntimeError("db down"))):
+            with pytest.raises(RuntimeError, match="db down"):
+                await client.post("/transactions/", json=withdraw)
+        response = await client.post("/transactions/", json=withdraw)
+
+    assert response.status_code == 202